@@ -0,0 +1,133 @@
+# app/bundle.py
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import jsonio, seasonpack
+
+
+# Season bundles: many processed weeks in one streamed response.
+# Only one week is ever held in memory; bytes are read straight from disk
+# (loose file or season pack) and yielded as soon as each week is encoded.
+# Bulk readers deliberately bypass weekcache: a season walk would gzip
+# every week for nothing and evict the hot weeks the public route serves.
+
+ARRAYS = {
+    "nfl": {"team": "NFLTeamGameStats", "player": "NFLPlayerGameStats"},
+    "cfb": {"team": "CFBTeamGameStats", "player": "CFBPlayerGameStats"},
+}
+
+
+def season_weeks(
+    sport: str,
+    year: int,
+    from_week: Optional[int] = None,
+    to_week: Optional[int] = None,
+) -> List[Tuple[int, str]]:
+    """Sorted (week, yyww) of processed weeks for a season (loose or packed), optionally clipped."""
+    out = []
+    for base in seasonpack.week_names(sport, year):
+        week = int(base[2:4])
+        if from_week is not None and week < from_week:
+            continue
+        if to_week is not None and week > to_week:
+            continue
+        out.append((week, base))
+    out.sort()
+    return out
+
+
+def week_body(sport: str, year: int, yyww: str) -> Optional[bytes]:
+    """A processed week's bytes for bulk readers (bundles, exports, derived stages); no LRU."""
+    return seasonpack.read_week(sport, year, yyww)
+
+
+def iter_rows(
+    sport: str,
+    year: int,
+    view: str,
+    weeks: Sequence[Tuple[int, str]],
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Yield (week, yyww, row) lazily across weeks for one view ('team'/'player'),
+    projected to `columns` when given (missing columns come back as None).
+    """
+    arr = ARRAYS[sport][view]
+    for week, yyww in weeks:
+        body = week_body(sport, year, yyww)
+        if body is None:
+            continue
+        try:
+            rows = jsonio.loads(body).get(arr) or []
+        except Exception:
+            continue
+        for r in rows:
+            if not isinstance(r, dict):
+                continue
+            if columns:
+                r = {c: r.get(c) for c in columns}
+            yield week, yyww, r
+
+
+def _encode(
+    sport: str,
+    year: int,
+    weeks: Sequence[Tuple[int, str]],
+    view: Optional[str],
+    columns: Optional[Sequence[str]],
+    fmt: str,
+) -> Iterator[bytes]:
+    """One chunk per week (plus array brackets for fmt='json')."""
+    dumps = jsonio.dumps
+
+    if fmt == "json":
+        yield b"["
+    first = True
+    for week, yyww in weeks:
+        if view:
+            rows = [dict(r, _week=w, _yyww=y) for w, y, r in iter_rows(sport, year, view, [(week, yyww)], columns)]
+            if fmt == "ndjson":
+                chunk = b"".join(dumps(r) + b"\n" for r in rows)
+            else:
+                chunk = b",".join(dumps(r) for r in rows)
+                if chunk and not first:
+                    chunk = b"," + chunk
+        else:
+            body = week_body(sport, year, yyww)
+            if body is None:
+                continue
+            head = {"sport": sport, "year": year, "week": week, "yyww": yyww}
+            if fmt == "ndjson":
+                # one line per week: re-encode compactly (stored files are indented)
+                chunk = dumps({**head, "data": jsonio.loads(body)}) + b"\n"
+            else:
+                # splice the stored bytes straight in, no parse
+                chunk = (b"" if first else b",") + dumps(head)[:-1] + b',"data":' + body + b"}"
+        if chunk:
+            first = False
+            yield chunk
+    if fmt == "json":
+        yield b"]"
+
+
+def stream_bundle(
+    sport: str,
+    year: int,
+    from_week: Optional[int] = None,
+    to_week: Optional[int] = None,
+    view: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    fmt: str = "ndjson",
+    gzip_out: bool = False,
+) -> Iterator[bytes]:
+    weeks = season_weeks(sport, year, from_week, to_week)
+    chunks = _encode(sport, year, weeks, view, columns, fmt)
+    if not gzip_out:
+        yield from chunks
+        return
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for c in chunks:
+        out = z.compress(c) + z.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield z.flush()
@@ -0,0 +1,249 @@
+# app/changes.py
+import os, time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+from .util import ensure_dir, atomic_write
+from . import jsonio
+
+try:
+    import fcntl  # POSIX only; on Windows the log is single-writer anyway
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+# Persistent change log of processed weeks.
+#
+#   {DATA_ROOT}/changes/log.jsonl          active segment: one entry per changed week, version-ordered
+#   {DATA_ROOT}/changes/log.{last}.jsonl   sealed segments, named by their last version
+#   {DATA_ROOT}/changes/version            last assigned version (monotonic int)
+#   {DATA_ROOT}/changes/pruned             last version dropped by retention (0 = none)
+#   {DATA_ROOT}/changes/diffs/{v}.json     optional row-level diff for entry v (CHANGES_ROW_DIFFS)
+#
+# Entries are appended by process_one whenever a week's processed bytes
+# change (so sync and reprocess both feed it). Clients keep the last
+# version they saw and ask for /changes?since=N.
+#
+# The active segment is sealed every CHANGES_SEGMENT_ENTRIES entries and
+# only the newest CHANGES_KEEP_SEGMENTS sealed segments (and their diffs)
+# are kept, so since() opens just the segments past the client's version
+# and its cost doesn't grow with the log's history. A client older than
+# the retained history gets reset=True and resyncs from /manifest.
+
+
+def _dir(root: Optional[str] = None) -> str:
+    return os.path.join(root or settings.DATA_ROOT, "changes")
+
+
+@contextmanager
+def _locked(root: Optional[str] = None):
+    d = _dir(root)
+    ensure_dir(d)
+    with open(os.path.join(d, ".lock"), "a+") as lf:
+        if fcntl:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+        try:
+            yield d
+        finally:
+            if fcntl:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+
+def _read_int(path: str) -> int:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except Exception:
+        return 0
+
+
+def latest_version(root: Optional[str] = None) -> int:
+    return _read_int(os.path.join(_dir(root), "version"))
+
+
+def pruned_version(root: Optional[str] = None) -> int:
+    """Entries up to this version were dropped by retention."""
+    return _read_int(os.path.join(_dir(root), "pruned"))
+
+
+def _segments(d: str) -> List[Tuple[int, str]]:
+    """Sealed segments as (last version, path), oldest first."""
+    out = []
+    try:
+        names = os.listdir(d)
+    except OSError:
+        return out
+    for fname in names:
+        parts = fname.split(".")
+        if len(parts) == 3 and parts[0] == "log" and parts[2] == "jsonl" and parts[1].isdigit():
+            out.append((int(parts[1]), os.path.join(d, fname)))
+    return sorted(out)
+
+
+def _rotate_locked(d: str, version: int) -> None:
+    """Seal the active segment once it is full and drop segments past retention."""
+    sealed = _segments(d)
+    first = (sealed[-1][0] if sealed else _read_int(os.path.join(d, "pruned"))) + 1
+    if version - first + 1 < max(1, settings.CHANGES_SEGMENT_ENTRIES):
+        return
+    os.replace(os.path.join(d, "log.jsonl"), os.path.join(d, f"log.{version}.jsonl"))
+    sealed.append((version, os.path.join(d, f"log.{version}.jsonl")))
+    keep = max(1, settings.CHANGES_KEEP_SEGMENTS)
+    if len(sealed) <= keep:
+        return
+    drop = sealed[:-keep]
+    last = drop[-1][0]
+    for _, path in drop:
+        os.remove(path)
+    ddir = os.path.join(d, "diffs")
+    if os.path.isdir(ddir):
+        for fname in os.listdir(ddir):
+            v = fname.split(".")[0]
+            if v.isdigit() and int(v) <= last:
+                try:
+                    os.remove(os.path.join(ddir, fname))
+                except OSError:
+                    pass
+    atomic_write(os.path.join(d, "pruned"), str(last).encode("utf-8"))
+    print(f"[CHANGES] pruned change log up to version {last}")
+
+
+def record(
+    sport: str,
+    year: int,
+    yyww: str,
+    old_sha: Optional[str],
+    new_sha: str,
+    source: str = "process",
+    diff: Optional[Dict[str, Any]] = None,
+    root: Optional[str] = None,
+) -> int:
+    """Append one change entry; returns its version."""
+    with _locked(root) as d:
+        version = latest_version(root) + 1
+        entry = {
+            "version": version,
+            "ts": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+            "sport": sport,
+            "year": int(year),
+            "yyww": yyww,
+            "old_sha256": old_sha,
+            "new_sha256": new_sha,
+            "source": source,
+        }
+        if diff is not None:
+            entry["rows"] = {
+                arr: {k: len(v) for k, v in parts.items() if isinstance(v, list)}
+                for arr, parts in diff.items()
+            }
+            atomic_write(os.path.join(d, "diffs", f"{version}.json"), jsonio.dumps(diff))
+        with open(os.path.join(d, "log.jsonl"), "ab") as f:
+            f.write(jsonio.dumps(entry) + b"\n")
+        atomic_write(os.path.join(d, "version"), str(version).encode("utf-8"))
+        _rotate_locked(d, version)
+    return version
+
+
+def load_diff(version: int, root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    return jsonio.load_file(os.path.join(_dir(root), "diffs", f"{int(version)}.json"))
+
+
+def since(
+    version: int,
+    limit: int = 1000,
+    rows: bool = False,
+    sport: Optional[str] = None,
+    year: Optional[int] = None,
+    root: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Entries with version > `version` (oldest first, at most `limit`).
+    `more` tells the client to call again with the last version returned.
+    `reset` means the client is ahead of the log (log was wiped) or behind
+    its retained history, and should resync from /manifest.
+    """
+    latest = latest_version(root)
+    pruned = pruned_version(root)
+    out: List[Dict[str, Any]] = []
+    more = False
+    files = []
+    if version < latest:
+        # open under the lock: a rotation can't slip entries between the listing and the reads
+        with _locked(root) as d:
+            for last, path in _segments(d) + [(latest, os.path.join(d, "log.jsonl"))]:
+                if last <= version:
+                    continue
+                try:
+                    files.append(open(path, "rb"))
+                except OSError:
+                    continue
+    try:
+        for f in files:
+            for line in f:
+                try:
+                    e = jsonio.loads(line)
+                except Exception:
+                    continue
+                if e.get("version", 0) <= version:
+                    continue
+                if sport and e.get("sport") != sport:
+                    continue
+                if year is not None and e.get("year") != year:
+                    continue
+                if len(out) >= limit:
+                    more = True
+                    break
+                if rows and e.get("rows") is not None:
+                    e["diff"] = load_diff(e["version"], root)
+                out.append(e)
+            if more:
+                break
+    finally:
+        for f in files:
+            f.close()
+    return {
+        "version": latest,
+        "since": version,
+        "reset": version > latest or version < pruned,
+        "more": more,
+        "changes": out,
+    }
+
+
+# ---------- Row-level diff ----------
+
+def _row_key(row: Dict[str, Any], id_key: Optional[str]) -> Tuple:
+    return (row.get(id_key) if id_key else None, row.get("GameID"))
+
+
+def diff_rows(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    keys: Dict[str, Optional[str]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Per array: rows added / changed (full new row) and keys removed.
+    keys maps array name -> the row id column (TeamID, NFLPlayerID, ...);
+    rows are matched on (id, GameID), and "key" echoes the id column so
+    clients can apply the diff.
+    """
+    result: Dict[str, Dict[str, Any]] = {}
+    for arr, id_key in keys.items():
+        old_rows = {_row_key(r, id_key): r for r in (old.get(arr) or []) if isinstance(r, dict)}
+        added: List[Any] = []
+        changed: List[Any] = []
+        seen = set()
+        for r in (new.get(arr) or []):
+            if not isinstance(r, dict):
+                continue
+            k = _row_key(r, id_key)
+            seen.add(k)
+            prev = old_rows.get(k)
+            if prev is None:
+                added.append(r)
+            elif prev != r:
+                changed.append(r)
+        removed = [list(k) for k in old_rows if k not in seen]
+        result[arr] = {"key": id_key, "added": added, "changed": changed, "removed": removed}
+    return result
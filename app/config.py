@@ -34,8 +34,79 @@ class _Settings:
         self.ADMIN_BEARER_TOKEN = os.getenv("ADMIN_BEARER_TOKEN", "")
         self.RUN_TOKEN = os.getenv("RUN_TOKEN")  # optional
 
+        # upstream pacing / circuit breaker for run_sync. A run starts at its
+        # rate_limit_ms (350 by default) and speeds up while upstream stays
+        # fast, but never past one request per SYNC_MIN_DELAY_MS (the default
+        # 200 ms caps it at 5 req/s; lower it only if upstream allows more)
+        self.SYNC_MIN_DELAY_MS = int(os.getenv("SYNC_MIN_DELAY_MS", "200"))
+        self.SYNC_MAX_DELAY_MS = int(os.getenv("SYNC_MAX_DELAY_MS", "30000"))
+        self.SYNC_SLOW_MS = int(os.getenv("SYNC_SLOW_MS", "3000"))
+        self.SYNC_BREAKER_THRESHOLD = int(os.getenv("SYNC_BREAKER_THRESHOLD", "5"))
+        # transient failures of one week before a sync plan gives up on it (until the next plan)
+        self.SYNC_ITEM_MAX_ATTEMPTS = int(os.getenv("SYNC_ITEM_MAX_ATTEMPTS", "3"))
+        self.SYNC_CONNECT_TIMEOUT_S = float(os.getenv("SYNC_CONNECT_TIMEOUT_S", "5"))
+        self.SYNC_READ_TIMEOUT_S = float(os.getenv("SYNC_READ_TIMEOUT_S", "20"))
+
+        # distributed sync / reprocess: lease expiry and heartbeat (see workqueue.py)
+        self.QUEUE_LEASE_TTL_S = float(os.getenv("QUEUE_LEASE_TTL_S", "60"))
+        self.QUEUE_HEARTBEAT_S = float(os.getenv("QUEUE_HEARTBEAT_S", "15"))
+
+        # change log: store row-level diffs alongside each changed week (off:
+        # costs a re-read + parse of the old body on every changed week)
+        self.CHANGES_ROW_DIFFS = os.getenv("CHANGES_ROW_DIFFS", "0").lower() in ("1", "true", "yes")
+        # change log segments: entries per sealed segment, sealed segments kept
+        self.CHANGES_SEGMENT_ENTRIES = int(os.getenv("CHANGES_SEGMENT_ENTRIES", "5000"))
+        self.CHANGES_KEEP_SEGMENTS = int(os.getenv("CHANGES_KEEP_SEGMENTS", "20"))
+
+        # live push (SSE): change-log poll interval, keepalive, per-viewer queue
+        self.LIVE_POLL_S = float(os.getenv("LIVE_POLL_S", "1.0"))
+        self.LIVE_KEEPALIVE_S = float(os.getenv("LIVE_KEEPALIVE_S", "15"))
+        self.LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "100"))
+
+        # in-memory LRU of hot processed weeks (per worker), byte budget
+        self.WEEK_CACHE_BYTES = int(os.getenv("WEEK_CACHE_BYTES", str(64 * 1024 * 1024)))
+        self.WEEK_CACHE_GZIP_LEVEL = int(os.getenv("WEEK_CACHE_GZIP_LEVEL", "6"))
+
+        # tracing (off unless TRACE_ENABLED=1); TRACE_FILE adds a JSONL sink
+        self.TRACE_ENABLED = os.getenv("TRACE_ENABLED", "0").lower() in ("1", "true", "yes")
+        self.TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "5000"))
+        self.TRACE_FILE = os.getenv("TRACE_FILE", "")
+
+        # memory profiling (admin /memory): tracemalloc frames, snapshot files kept per worker
+        self.MEMPROF_FRAMES = int(os.getenv("MEMPROF_FRAMES", "1"))
+        self.MEMPROF_MAX_SNAPSHOTS = int(os.getenv("MEMPROF_MAX_SNAPSHOTS", "8"))
+
+        # cached parsed players/team maps under DATA_ROOT/cache/refmaps
+        self.REF_SNAPSHOT = os.getenv("REF_SNAPSHOT", "1").lower() in ("1", "true", "yes")
+        # poll the reference CSVs every N seconds and hot-reload on change (0 = off;
+        # run_sync and POST /admin/refdata/reload check them regardless)
+        self.REF_WATCH_S = float(os.getenv("REF_WATCH_S", "0"))
+
+        # processed weeks written to one packfile per season (app/seasonpack.py)
+        # instead of {yyww}.json + .meta.json; seasons already packed stay packed
+        self.SEASON_PACKS = os.getenv("SEASON_PACKS", "0").lower() in ("1", "true", "yes")
+
+        # mmap'd packs shared by all workers (ref maps, hot weeks, manifest)
+        self.SHM_ENABLED = os.getenv("SHM_ENABLED", "1").lower() in ("1", "true", "yes")
+        self.SHM_WEEKS_BYTES = int(os.getenv("SHM_WEEKS_BYTES", str(32 * 1024 * 1024)))
+        self.SHM_CHECK_S = float(os.getenv("SHM_CHECK_S", "1.0"))
+
+        # derived stages: positions tracked by defense-vs-position
+        self.DVP_POSITIONS = os.getenv("DVP_POSITIONS", "QB,RB,WR,TE,K")
+
+        # rolling projections: metrics (Calc_* + stat columns) and EWMA weight
+        self.PROJ_METRICS = os.getenv(
+            "PROJ_METRICS",
+            "Calc_TotalPoints,Calc_PassingPoints,Calc_RushingPoints,Calc_ReceivingPoints,Calc_KickingPoints,"
+            "PassingYards,PassingTDs,RushingYards,RushingTDs,Catches,ReceivingYards,ReceivingTDs",
+        )
+        self.PROJ_EWMA_ALPHA = float(os.getenv("PROJ_EWMA_ALPHA", "0.4"))
+
+        # comma-separated CORS origins; empty = no CORS middleware
+        self.CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
+
         print(f"[config] DATA_ROOT = {self.DATA_ROOT}")
         print(f"[config] API_BASE  = {self.API_BASE}")
-        print(f"[config] API_BASE  = {self.DATA_URL_PREFIX}")
+        print(f"[config] DATA_URL_PREFIX = {self.DATA_URL_PREFIX}")
 
 settings = _Settings()
@@ -0,0 +1,212 @@
+# app/dvp.py
+import os, threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+from .util import atomic_write
+from . import bundle, scoring, jsonio, seasonpack
+
+
+# Defense-vs-position: fantasy points each team allows to QB/RB/WR/TE/K.
+#
+# Player rows carry (GameID, TeamID); the week's team rows give the two
+# TeamIDs in each game, so a player's opponent is the other team in that
+# GameID. Each week's contribution is stored on its own:
+#
+#   {DATA_ROOT}/derived/dvp/{sport}/{year}/{yyww}.json
+#     {"teams": {defTeamID: {"team": abbr, "games": n,
+#                            "pos": {pos: [points, player_rows]}}},
+#      "unmatched": n}
+#
+# process_one refreshes a week's contribution when its output changes; the
+# season table just sums contributions. A contribution older than its
+# processed file (or missing) is rebuilt on read, so trees processed before
+# this stage existed fill in on first request.
+
+_lock = threading.Lock()
+_tables: Dict[Tuple[str, int, Optional[int]], Tuple[Tuple, Dict[str, Any]]] = {}
+
+
+def positions() -> List[str]:
+    return [p.strip().upper() for p in settings.DVP_POSITIONS.split(",") if p.strip()]
+
+
+def week_path(sport: str, year: int, yyww: str) -> str:
+    return os.path.join(settings.DATA_ROOT, "derived", "dvp", sport, str(year), f"{yyww}.json")
+
+
+def week_contribution(sport: str, week_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Points allowed by each defense in one processed week, by position."""
+    arrays = bundle.ARRAYS[sport]
+    team_rows = week_doc.get(arrays["team"]) or []
+    player_rows = week_doc.get(arrays["player"]) or []
+    wanted = set(positions())
+
+    games: Dict[Any, List[Any]] = {}
+    names: Dict[str, Any] = {}
+    for t in team_rows:
+        if not isinstance(t, dict) or t.get("GameID") is None or t.get("TeamID") is None:
+            continue
+        games.setdefault(t["GameID"], []).append(t["TeamID"])
+        names[str(t["TeamID"])] = t.get("Team")
+
+    teams: Dict[str, Dict[str, Any]] = {}
+    for gid, tids in games.items():
+        if len(tids) != 2:
+            continue
+        for tid in tids:
+            ent = teams.setdefault(str(tid), {"team": names.get(str(tid)), "games": 0, "pos": {}})
+            ent["games"] += 1
+
+    unmatched = 0
+    for r in player_rows:
+        if not isinstance(r, dict):
+            continue
+        pos = str(r.get("Position") or "").upper()
+        if pos not in wanted:
+            continue
+        tids = games.get(r.get("GameID"))
+        if not tids or len(tids) != 2 or r.get("TeamID") not in tids:
+            unmatched += 1
+            continue
+        opp = str(tids[1] if tids[0] == r["TeamID"] else tids[0])
+        pts = scoring.score_player(dict(r))["Calc_TotalPoints"]
+        acc = teams[opp]["pos"].setdefault(pos, [0, 0])
+        acc[0] += pts
+        acc[1] += 1
+
+    return {"teams": teams, "unmatched": unmatched}
+
+
+def update_week(sport: str, year: int, yyww: str, week_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute and store one week's contribution (called by process_one)."""
+    contrib = week_contribution(sport, week_doc)
+    atomic_write(week_path(sport, year, yyww), jsonio.dumps(contrib))
+    return contrib
+
+
+def _load_week(sport: str, year: int, yyww: str) -> Optional[Dict[str, Any]]:
+    """Stored contribution, rebuilt from the processed week if missing or older than it."""
+    path = week_path(sport, year, yyww)
+    src_m = seasonpack.week_mtime(sport, year, yyww)
+    if src_m is None:
+        return None
+    try:
+        if os.stat(path).st_mtime_ns >= src_m:
+            c = jsonio.load_file(path)
+            if isinstance(c, dict):
+                return c
+    except OSError:
+        pass
+    body = bundle.week_body(sport, year, yyww)
+    if body is None:
+        return None
+    try:
+        doc = jsonio.loads(body)
+    except Exception:
+        return None
+    return update_week(sport, year, yyww, doc if isinstance(doc, dict) else {})
+
+
+def _stamp(sport: str, year: int, weeks: List[Tuple[int, str]]) -> Tuple:
+    out = []
+    for _, yyww in weeks:
+        try:
+            out.append(os.stat(week_path(sport, year, yyww)).st_mtime_ns)
+        except OSError:
+            out.append(None)
+        out.append(seasonpack.week_mtime(sport, year, yyww))
+    return tuple(w for _, w in weeks), tuple(out)
+
+
+def season_table(sport: str, year: int, through_week: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compact columnar table, one row per defense:
+      TeamID, Team, Games, then per position {P}_Pts, {P}_PerGame, {P}_Rank
+    (rank 1 = allows the most per game). Optional through_week clips the season.
+    """
+    weeks = bundle.season_weeks(sport, year, to_week=through_week)
+    key = (sport, int(year), through_week)
+    stamp = _stamp(sport, year, weeks)
+    with _lock:
+        hit = _tables.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+
+    pos_list = positions()
+    totals: Dict[str, Dict[str, Any]] = {}
+    unmatched = 0
+    for _, yyww in weeks:
+        c = _load_week(sport, year, yyww)
+        if not c:
+            continue
+        unmatched += c.get("unmatched", 0)
+        for tid, ent in (c.get("teams") or {}).items():
+            acc = totals.setdefault(tid, {"team": ent.get("team"), "games": 0, "pos": {}})
+            acc["team"] = ent.get("team") or acc["team"]
+            acc["games"] += ent.get("games", 0)
+            for pos, (pts, n) in (ent.get("pos") or {}).items():
+                a = acc["pos"].setdefault(pos, [0, 0])
+                a[0] += pts
+                a[1] += n
+
+    def _tid_sort(t: str):
+        return (0, int(t)) if t.lstrip("-").isdigit() else (1, t)
+
+    tids = sorted(totals, key=_tid_sort)
+    columns = ["TeamID", "Team", "Games"]
+    for p in pos_list:
+        columns += [f"{p}_Pts", f"{p}_PerGame", f"{p}_Rank"]
+
+    per_game = {
+        p: {tid: (round(totals[tid]["pos"].get(p, [0, 0])[0] / totals[tid]["games"], 2) if totals[tid]["games"] else 0)
+            for tid in tids}
+        for p in pos_list
+    }
+    ranks = {}
+    for p in pos_list:
+        order = sorted(tids, key=lambda t: -per_game[p][t])
+        ranks[p] = {t: i + 1 for i, t in enumerate(order)}
+
+    rows = []
+    for tid in tids:
+        acc = totals[tid]
+        row = [int(tid) if tid.lstrip("-").isdigit() else tid, acc["team"], acc["games"]]
+        for p in pos_list:
+            row += [acc["pos"].get(p, [0, 0])[0], per_game[p][tid], ranks[p][tid]]
+        rows.append(row)
+
+    table = {
+        "sport": sport,
+        "year": int(year),
+        "weeks": [w for w, _ in weeks],
+        "positions": pos_list,
+        "columns": columns,
+        "rows": rows,
+        "unmatched_player_rows": unmatched,
+    }
+    with _lock:
+        _tables[key] = (stamp, table)
+    return table
+
+
+def rebuild(sport: Optional[str] = None, year: Optional[int] = None) -> Dict[str, Any]:
+    """Recompute every stored contribution from the processed weeks."""
+    done = 0
+    base = os.path.join(settings.DATA_ROOT, "processed")
+    for sp in ([sport] if sport else ["nfl", "cfb"]):
+        sdir = os.path.join(base, sp)
+        if not os.path.isdir(sdir):
+            continue
+        years = [year] if year is not None else sorted(int(y) for y in os.listdir(sdir) if y.isdigit())
+        for y in years:
+            for _, yyww in bundle.season_weeks(sp, y):
+                body = bundle.week_body(sp, y, yyww)
+                if body is None:
+                    continue
+                doc = jsonio.loads(body)
+                update_week(sp, y, yyww, doc if isinstance(doc, dict) else {})
+                done += 1
+    with _lock:
+        _tables.clear()
+    return {"weeks": done, "sport": sport, "year": year}
@@ -0,0 +1,183 @@
+# app/export.py
+import os, io, csv, tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import bundle, scoring, schema, jsonio
+
+
+# CSV / Parquet exports of processed weeks. Rows are generated lazily one
+# week at a time (bundle.iter_rows), scored with the same Calc_* rules as
+# the viewer, and projected to the viewer's column presets from
+# positions.json, so memory stays flat regardless of the range.
+
+_POSITIONS_JSON = os.path.join(os.path.dirname(__file__), "positions.json")
+_positions_cfg: Optional[Dict[str, Any]] = None
+
+
+def positions_config() -> Dict[str, Any]:
+    global _positions_cfg
+    if _positions_cfg is None:
+        _positions_cfg = jsonio.load_file(_POSITIONS_JSON) or {}
+    return _positions_cfg
+
+
+def export_columns(sport: str, view: str, positions: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Column list for an export, mirroring the viewer:
+      team   -> team.columns (per-sport override wins)
+      player -> union of columnsByPosition for the chosen positions
+                (all positions when none are given)
+    """
+    cfg = positions_config()
+    ov = (cfg.get("overrides") or {}).get(sport) or {}
+    if view == "team":
+        cols = (ov.get("team") or {}).get("columns") or (cfg.get("team") or {}).get("columns") or []
+        return list(cols)
+
+    shared = cfg.get("shared") or {}
+    by_pos = dict(shared.get("columnsByPosition") or {})
+    by_pos.update(ov.get("columnsByPosition") or {})
+    chosen = list(positions) if positions else list(ov.get("positions") or shared.get("positions") or by_pos.keys())
+    out: List[str] = []
+    seen = set()
+    for p in chosen:
+        for c in by_pos.get(p, []):
+            if c not in seen:
+                seen.add(c)
+                out.append(c)
+    return out or list(shared.get("defaultColumns") or [])
+
+
+def iter_export_rows(
+    sport: str,
+    year: int,
+    view: str,
+    weeks: Sequence[Tuple[int, str]],
+    columns: Sequence[str],
+    positions: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[int, str, List[Any]]]:
+    """Yield (week, yyww, values) in `columns` order."""
+    pos_filter = set(positions) if (positions and view == "player") else None
+    for week, yyww, row in bundle.iter_rows(sport, year, view, weeks):
+        if pos_filter is not None and str(row.get("Position") or "") not in pos_filter:
+            continue
+        scoring.score(view, row)
+        yield week, yyww, [row.get(c) for c in columns]
+
+
+def stream_csv(
+    sport: str,
+    year: int,
+    view: str,
+    weeks: Sequence[Tuple[int, str]],
+    columns: Sequence[str],
+    positions: Optional[Sequence[str]] = None,
+    flush_rows: int = 500,
+) -> Iterator[bytes]:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["Year", "Week"] + list(columns))
+    n = 0
+    for week, _, values in iter_export_rows(sport, year, view, weeks, columns, positions):
+        w.writerow([year, week] + ["" if v is None else v for v in values])
+        n += 1
+        if n % flush_rows == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+# ---------- Parquet (optional: needs pyarrow) ----------
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def write_parquet(
+    sport: str,
+    year: int,
+    view: str,
+    weeks: Sequence[Tuple[int, str]],
+    columns: Sequence[str],
+    positions: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Write a Parquet file (one row group per week) to a temp path and return
+    it; the caller streams and deletes it. Parquet needs its footer written
+    last, so it can't be generated straight onto the socket.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fd, path = tempfile.mkstemp(prefix=f"export-{sport}-{year}-", suffix=".parquet")
+    os.close(fd)
+    names = ["Year", "Week"] + list(columns)
+    # column types from the season's schema catalog; only columns it doesn't
+    # know (none, normally) are sniffed from the first week's values
+    known = schema.column_types(sport, year, view)
+    known.update({"Year": "int", "Week": "int"})
+    pa_schema = None
+    writer = None
+    try:
+        for week, yyww in weeks:
+            batch = [[year, week] + vals for _, _, vals in iter_export_rows(sport, year, view, [(week, yyww)], columns, positions)]
+            if not batch:
+                continue
+            if pa_schema is None:
+                fields = []
+                for i, n in enumerate(names):
+                    if n in known:
+                        numeric = known[n] in ("int", "float")
+                    else:
+                        col = [r[i] for r in batch if r[i] is not None]
+                        numeric = bool(col) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in col)
+                    fields.append(pa.field(n, pa.float64() if numeric else pa.string()))
+                pa_schema = pa.schema(fields)
+                writer = pq.ParquetWriter(path, pa_schema, compression="snappy")
+            arrays = []
+            for i, f in enumerate(pa_schema):
+                col = [r[i] for r in batch]
+                if pa.types.is_string(f.type):
+                    col = [None if v is None else str(v) for v in col]
+                else:
+                    col = [v if isinstance(v, (int, float)) and not isinstance(v, bool) else None for v in col]
+                arrays.append(pa.array(col, type=f.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=pa_schema))
+        if writer is None:
+            pq.write_table(pa.table({n: pa.array([], type=pa.string()) for n in names}), path)
+        else:
+            writer.close()
+    except BaseException:
+        # the caller never sees the path, so nobody else would delete it
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def stream_file(path: str, chunk: int = 1024 * 1024, delete: bool = True) -> Iterator[bytes]:
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(chunk), b""):
+                yield block
+    finally:
+        if delete:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,67 @@
+# app/jsonio.py
+import os, json
+from typing import Any, Optional
+
+# Pluggable JSON backend: orjson > msgspec > stdlib json, picked at import.
+# Backends produce the same bytes for our data (UTF-8, no ASCII escaping,
+# indent=2 when asked; only exotic float exponents like 1e20 vs 1e+20
+# differ), so switching backends doesn't churn processed files or their
+# output_sha256.
+#
+# Force one with SIMFBA_JSON=stdlib|orjson|msgspec (benchmarks use this).
+
+_pref = os.getenv("SIMFBA_JSON", "").lower()
+
+BACKEND = "stdlib"
+_orjson: Any = None
+_msgspec: Any = None
+
+if _pref in ("", "orjson"):
+    try:
+        import orjson as _orjson  # type: ignore
+        BACKEND = "orjson"
+    except ImportError:
+        _orjson = None
+if BACKEND == "stdlib" and _pref in ("", "msgspec"):
+    try:
+        import msgspec as _msgspec  # type: ignore
+        BACKEND = "msgspec"
+    except ImportError:
+        _msgspec = None
+
+if BACKEND == "msgspec":
+    _ms_encoder = _msgspec.json.Encoder()
+    _ms_decoder = _msgspec.json.Decoder()
+
+
+def loads(data: Any) -> Any:
+    """Parse bytes/str into Python objects."""
+    if BACKEND == "orjson":
+        return _orjson.loads(data)
+    if BACKEND == "msgspec":
+        return _ms_decoder.decode(data.encode("utf-8") if isinstance(data, str) else data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 bytes; compact, or 2-space indented like json.dump(indent=2)."""
+    if BACKEND == "orjson":
+        opt = _orjson.OPT_NON_STR_KEYS
+        if indent:
+            opt |= _orjson.OPT_INDENT_2
+        return _orjson.dumps(obj, option=opt)
+    if BACKEND == "msgspec":
+        b = _ms_encoder.encode(obj)
+        return _msgspec.json.format(b, indent=2) if indent else b
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_file(path: str) -> Optional[Any]:
+    """Parse a JSON file; None if missing or invalid."""
+    try:
+        with open(path, "rb") as f:
+            return loads(f.read())
+    except Exception:
+        return None
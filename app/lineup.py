@@ -0,0 +1,283 @@
+# app/lineup.py
+import heapq, time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from . import projections
+
+
+# Optimal lineup builder: pick players for roster slots maximizing points
+# (actual Calc_TotalPoints of a processed week, or a projection window
+# entering a week), optionally under a salary cap, returning the best
+# lineup plus the next-best distinct alternatives.
+#
+# Candidate pools come from the per-position index of projections.season()
+# (cached per worker), trimmed to the players that can matter: a player
+# beaten on both points and salary by at least (slots he can fill + top_n - 1)
+# others can't appear in any top-N lineup. The search is depth-first branch
+# and bound over slot groups (QB, RB x2, ..., FLEX last) with candidates in
+# descending value, pruning on an optimistic bound vs the N-th best total
+# found so far and on the cheapest possible remaining salary.
+#
+# Under a salary cap that value bound is far too loose (it ignores the
+# budget, and salaries track points, so dominance trims little), so capped
+# searches also prune on a knapsack bound: the best value the remaining
+# picks can reach within the remaining budget, from a table over budget
+# units (salaries rounded down, so it never underestimates) built once per
+# query by dynamic programming over the groups. It relaxes only player
+# distinctness across groups, so it stays a valid upper bound.
+
+DEFAULT_SLOTS = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "K": 1, "DEF": 1}
+FLEX_POSITIONS = ("RB", "WR", "TE")
+MAX_TOP_N = 50
+BUDGET_UNITS = 1000   # resolution of the salary-cap bound table
+
+
+class LineupError(ValueError):
+    pass
+
+
+def _pareto(cands: List[Tuple[float, float, int]], need: int) -> List[Tuple[float, float, int]]:
+    """Keep candidates (value desc) not dominated on (value, cost) by `need` others."""
+    kept: List[Tuple[float, float, int]] = []
+    for v, c, i in cands:
+        if sum(1 for kv, kc, _ in kept if kc <= c) < need:
+            kept.append((v, c, i))
+    return kept
+
+
+def _budget_bounds(groups: List[Tuple[str, int, List[float], List[float], List[int]]],
+                   cap: float) -> Tuple[List[np.ndarray], float]:
+    """
+    Per group g an array [candidate j, picks t, budget b]: the best value of
+    t more picks from candidates j.. of group g plus full later groups with
+    at most b budget units (rounded-down salaries). -inf = infeasible.
+    """
+    unit = max(cap, 1e-9) / BUDGET_UNITS
+    B = BUDGET_UNITS + 1
+    nxt = np.zeros(B)   # after the last group: nothing left to pick
+    tables: List[np.ndarray] = [np.empty(0)] * len(groups)
+    for g in range(len(groups) - 1, -1, -1):
+        _, k, vals, costs, _ = groups[g]
+        n = len(vals)
+        t_g = np.full((n + 1, k + 1, B), -np.inf)
+        t_g[:, 0, :] = nxt
+        for j in range(n - 1, -1, -1):
+            cu = min(B, int(costs[j] // unit))
+            t_g[j, 1:, :] = t_g[j + 1, 1:, :]
+            if cu < B:
+                np.maximum(t_g[j, 1:, cu:], vals[j] + t_g[j + 1, :-1, :B - cu], out=t_g[j, 1:, cu:])
+        tables[g] = t_g
+        nxt = t_g[0, k, :]
+    return tables, unit
+
+
+def optimize(
+    sport: str,
+    year: int,
+    week: Optional[int] = None,
+    slots: Optional[Dict[str, int]] = None,
+    source: str = "projection",
+    window: str = "ewma",
+    metric: str = "Calc_TotalPoints",
+    top_n: int = 5,
+    salaries: Optional[Dict[str, float]] = None,
+    salary_cap: Optional[float] = None,
+    exclude: Optional[Sequence[str]] = None,
+    lock: Optional[Sequence[str]] = None,
+    teams: Optional[Sequence[str]] = None,
+    flex_positions: Sequence[str] = FLEX_POSITIONS,
+) -> Optional[Dict[str, Any]]:
+    t0 = time.perf_counter()
+    s = projections.season(sport, year)
+    if s is None:
+        return None
+    if metric not in s.metrics:
+        raise LineupError(f"unknown metric {metric!r}; have {s.metrics}")
+    m = s.metrics.index(metric)
+    top_n = max(1, min(int(top_n), MAX_TOP_N))
+    slots = {k.upper(): int(v) for k, v in (slots or DEFAULT_SLOTS).items() if int(v) > 0}
+    flex_positions = tuple(p.upper() for p in flex_positions)
+
+    # ---- per-player values for the chosen source ----
+    week_nums = [w for w, _ in s.weeks]
+    if source == "actual":
+        if week is None or week not in week_nums:
+            raise LineupError(f"source=actual needs a processed week; have {week_nums}")
+        values = s.history[:, week_nums.index(week), m]
+    elif source == "projection":
+        if window not in projections.WINDOWS:
+            raise LineupError(f"window must be one of {projections.WINDOWS}")
+        slot, week = projections.slot_for(s, week)
+        values = s.cubes[window][:, slot, m]
+    else:
+        raise LineupError("source must be 'actual' or 'projection'")
+
+    salaries = {str(k): float(v) for k, v in (salaries or {}).items()}
+    use_salary = salary_cap is not None
+    cap = float(salary_cap) if use_salary else None
+    excluded = {str(x) for x in (exclude or [])}
+    team_set = {t.upper() for t in teams} if teams else None
+
+    def _lookup(pid: str) -> int:
+        p = int(np.searchsorted(s.ids, pid))
+        return p if p < len(s.ids) and s.ids[p] == pid else -1
+
+    def _cost(i: int) -> float:
+        return salaries.get(str(s.ids[i]), 0.0)
+
+    # ---- locked players take their slots up front ----
+    locked: List[Tuple[str, int]] = []
+    remaining = dict(slots)
+    for pid in (lock or []):
+        i = _lookup(str(pid))
+        if i < 0:
+            raise LineupError(f"locked player {pid} not found in {sport} {year}")
+        p = s.pos[i]
+        if remaining.get(p, 0) > 0:
+            label = p
+        elif p in flex_positions and remaining.get("FLEX", 0) > 0:
+            label = "FLEX"
+        else:
+            raise LineupError(f"no open slot for locked player {pid} ({p})")
+        remaining[label] -= 1
+        locked.append((label, i))
+    locked_ids = {i for _, i in locked}
+    base_total = sum(0.0 if np.isnan(values[i]) else float(values[i]) for _, i in locked)
+    base_cost = sum(_cost(i) for _, i in locked)
+    if use_salary and base_cost > cap:
+        raise LineupError("locked players exceed the salary cap")
+
+    # ---- candidate pools from the position index ----
+    flex_n = remaining.get("FLEX", 0)
+    pools: Dict[str, List[Tuple[float, float, int]]] = {}
+    for p in {p for p in remaining if p != "FLEX"} | (set(flex_positions) if flex_n else set()):
+        ix = s.by_pos.get(p)
+        if ix is None or not len(ix):
+            pools[p] = []
+            continue
+        v = values[ix]
+        ok = ~np.isnan(v)
+        cands = []
+        for i, val in zip(ix[ok].tolist(), v[ok].tolist()):
+            pid = str(s.ids[i])
+            if pid in excluded or i in locked_ids:
+                continue
+            if team_set is not None and str(s.team[i]).upper() not in team_set:
+                continue
+            if use_salary and pid not in salaries:
+                continue
+            cands.append((val, _cost(i), i))
+        cands.sort(key=lambda c: (-c[0], c[1]))
+        need = remaining.get(p, 0) + (flex_n if p in flex_positions else 0) + top_n - 1
+        pools[p] = _pareto(cands, need) if use_salary else cands[:need]
+
+    groups: List[Tuple[str, int, List[float], List[float], List[int]]] = []
+    for p, k in remaining.items():
+        if p == "FLEX" or k <= 0:
+            continue
+        c = pools.get(p, [])
+        if len(c) < k:
+            raise LineupError(f"not enough {p} candidates ({len(c)}) for {k} slot(s)")
+        groups.append((p, k, [x[0] for x in c], [x[1] for x in c], [x[2] for x in c]))
+    groups.sort(key=lambda g: len(g[2]))  # tight groups first: prunes earlier
+    if flex_n:
+        fc = sorted({x for p in flex_positions for x in pools.get(p, [])}, key=lambda c: (-c[0], c[1]))
+        groups.append(("FLEX", flex_n, [x[0] for x in fc], [x[1] for x in fc], [x[2] for x in fc]))
+
+    G = len(groups)
+    suffix_best = [0.0] * (G + 1)
+    suffix_cost = [0.0] * (G + 1)
+    for g in range(G - 1, -1, -1):
+        _, k, vals, costs, _ = groups[g]
+        suffix_best[g] = suffix_best[g + 1] + sum(vals[:k])
+        suffix_cost[g] = suffix_cost[g + 1] + (sum(sorted(costs)[:k]) if use_salary else 0.0)
+
+    knap: Optional[List[np.ndarray]] = None
+    if use_salary and G and all(c >= 0 for grp in groups for c in grp[3]):
+        knap, unit = _budget_bounds(groups, cap)
+
+    heap: List[Tuple[float, float, Tuple[Tuple[str, int], ...]]] = []
+    seen: Set[frozenset] = set()
+    nodes = 0
+
+    def _rec(g: int, start: int, left: int, total: float, cost: float,
+             picks: Tuple[Tuple[str, int], ...], used: Set[int]) -> None:
+        nonlocal nodes
+        nodes += 1
+        if left == 0:
+            g += 1
+            if g == G:
+                key = frozenset(i for _, i in picks)
+                if key in seen:
+                    return
+                if len(heap) < top_n:
+                    heapq.heappush(heap, (total, -cost, picks))
+                    seen.add(key)
+                elif total > heap[0][0]:
+                    seen.add(key)
+                    heapq.heapreplace(heap, (total, -cost, picks))
+                return
+            start, left = 0, groups[g][1]
+        label, _, vals, costs, idxs = groups[g]
+        for j in range(start, len(vals) - left + 1):
+            ub = total + sum(vals[j:j + left]) + suffix_best[g + 1]
+            if len(heap) == top_n and ub <= heap[0][0]:
+                break  # values are descending: later j can only be worse
+            i = idxs[j]
+            if i in used:
+                continue
+            c = cost + costs[j]
+            if use_salary and c + suffix_cost[g + 1] > cap:
+                continue
+            if knap is not None and len(heap) == top_n:
+                b = min(BUDGET_UNITS, int((cap - c) // unit))
+                if total + vals[j] + knap[g][j + 1, left - 1, b] <= heap[0][0] + 1e-9:
+                    continue   # not a break: a cheaper later candidate may still fit
+            used.add(i)
+            _rec(g, j + 1, left - 1, total + vals[j], c, picks + ((label, i),), used)
+            used.discard(i)
+
+    if G:
+        _rec(0, 0, groups[0][1], base_total, base_cost, tuple(locked), set(locked_ids))
+    elif locked:
+        heap.append((base_total, -base_cost, tuple(locked)))
+
+    order: Dict[str, int] = {}
+    for p in list(DEFAULT_SLOTS) + sorted(slots):
+        order.setdefault(p, len(order))
+    lineups = []
+    for total, neg_cost, picks in sorted(heap, key=lambda h: (-h[0], -h[1])):
+        players = []
+        for label, i in sorted(picks, key=lambda x: (order.get(x[0], 99), -float(np.nan_to_num(values[x[1]])))):
+            v = values[i]
+            players.append({
+                "slot": label,
+                "id": str(s.ids[i]),
+                "name": s.name[i] or None,
+                "position": s.pos[i] or None,
+                "team": s.team[i] or None,
+                "points": None if np.isnan(v) else round(float(v), 2),
+                "salary": salaries.get(str(s.ids[i])) if salaries else None,
+            })
+        lineups.append({
+            "total": round(total, 2),
+            "salary": round(-neg_cost, 2) if salaries else None,
+            "players": players,
+        })
+
+    return {
+        "sport": sport,
+        "year": int(year),
+        "week": int(week) if week is not None else None,
+        "source": source,
+        "window": window if source == "projection" else None,
+        "metric": metric,
+        "slots": slots,
+        "salary_cap": cap,
+        "pool_sizes": {g[0]: len(g[2]) for g in groups},
+        "nodes": nodes,
+        "lineups": lineups,
+        "ms": round((time.perf_counter() - t0) * 1000.0, 1),
+    }
@@ -0,0 +1,137 @@
+# app/live.py
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from .config import settings
+from . import changes, jsonio
+
+
+# Live push of changed weeks over Server-Sent Events.
+#
+# The change log (changes.py) is the source of truth, so this works across
+# uvicorn workers and separate sync processes: each worker runs ONE hub
+# task that polls changes/version and fans new entries out to its
+# connected viewers. Viewers never poll /manifest or re-download weeks
+# blindly; they get {sport, year, yyww, etag[, rows]} and patch in place.
+# Row diff files are only loaded while some viewer asked for rows, and the
+# change-log reads run off the event loop.
+
+
+class _Hub:
+    def __init__(self):
+        self.subs: Set[asyncio.Queue] = set()
+        self.row_subs: Set[asyncio.Queue] = set()   # subscribers that asked for row diffs
+        self.task: Optional[asyncio.Task] = None
+        self.version = 0
+
+    def subscribe(self, rows: bool = False) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self.subs.add(q)
+        if rows:
+            self.row_subs.add(q)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self.subs.discard(q)
+        self.row_subs.discard(q)
+
+    def _broadcast(self, entry: Dict[str, Any]) -> None:
+        for q in list(self.subs):
+            try:
+                q.put_nowait(entry)
+            except asyncio.QueueFull:
+                # slow consumer: drop its backlog and tell it to refetch
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait({"type": "resync", "version": entry.get("version")})
+
+    async def _run(self) -> None:
+        self.version = await asyncio.to_thread(changes.latest_version)
+        while self.subs:
+            await asyncio.sleep(settings.LIVE_POLL_S)
+            if await asyncio.to_thread(changes.latest_version) <= self.version:
+                continue
+            while True:
+                batch = await asyncio.to_thread(changes.since, self.version, 200, bool(self.row_subs))
+                for e in batch["changes"]:
+                    self._broadcast(e)
+                    self.version = e["version"]
+                if batch["reset"]:
+                    self.version = batch["version"]
+                if not batch["more"]:
+                    break
+
+
+hub = _Hub()
+
+
+def _event_payload(e: Dict[str, Any], rows: bool) -> Dict[str, Any]:
+    msg = {
+        "type": "week",
+        "version": e["version"],
+        "sport": e["sport"],
+        "year": e["year"],
+        "yyww": e["yyww"],
+        "etag": f'"{e["new_sha256"]}"',
+        "new": e.get("old_sha256") is None,
+    }
+    if rows and e.get("diff") is not None:
+        msg["rows"] = e["diff"]
+    return msg
+
+
+def _sse(event: str, data: Dict[str, Any], id_: Optional[int] = None) -> str:
+    head = f"id: {id_}\n" if id_ is not None else ""
+    return f"{head}event: {event}\ndata: {jsonio.dumps(data).decode('utf-8')}\n\n"
+
+
+async def stream(
+    is_disconnected,
+    last_version: Optional[int] = None,
+    sport: Optional[str] = None,
+    year: Optional[int] = None,
+    rows: bool = False,
+) -> AsyncIterator[str]:
+    """
+    SSE generator for one viewer. `last_version` (from Last-Event-ID or
+    ?since=) replays what the client missed before switching to live.
+    """
+    q = hub.subscribe(rows)
+    try:
+        sent = last_version if last_version is not None else await asyncio.to_thread(changes.latest_version)
+        yield "retry: 3000\n\n"
+        yield _sse("hello", {"version": sent})
+
+        if last_version is not None:
+            backlog = await asyncio.to_thread(changes.since, last_version, 200, rows, sport, year)
+            if backlog["reset"] or backlog["more"]:
+                yield _sse("resync", {"version": backlog["version"]})
+                sent = backlog["version"]
+            else:
+                for e in backlog["changes"]:
+                    yield _sse("week", _event_payload(e, rows), e["version"])
+                    sent = e["version"]
+
+        while True:
+            if await is_disconnected():
+                break
+            try:
+                e = await asyncio.wait_for(q.get(), timeout=settings.LIVE_KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if e.get("type") == "resync":
+                yield _sse("resync", e)
+                continue
+            if e["version"] <= sent:
+                continue
+            sent = e["version"]
+            if sport and e["sport"] != sport:
+                continue
+            if year is not None and e["year"] != year:
+                continue
+            yield _sse("week", _event_payload(e, rows), e["version"])
+    finally:
+        hub.unsubscribe(q)
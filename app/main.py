@@ -1,88 +1,58 @@
-from fastapi import FastAPI, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+# app/main.py
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from .config import settings
+
+from .config import settings  # loads .env once
 from .routers import public, admin
-from pathlib import Path
-from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
+from .routes_admin import router as admin_router
 from .startup import seed_reference_files
+from .responses import FastJSONResponse
+from . import sharedmem, refdata
 
 
-from dotenv import load_dotenv; load_dotenv()
-import os
-RUN_TOKEN = os.getenv("RUN_TOKEN")
+# One app, built once. Heavy modules (processor, requests, pyarrow) are
+# imported on first admin/export use, and reference maps load lazily from
+# their cached snapshot (see processor._read_ref_snapshot), so a cold
+# worker is serving /health and /manifest as soon as uvicorn binds.
 
-from fastapi import FastAPI
-from .routes_admin import router as admin_router
+APP_DIR = os.path.dirname(__file__)
 
-app = FastAPI()
-app.add_middleware(HTTPSRedirectMiddleware)
+app = FastAPI(title="SimFBA Python Worker", version="0.2.0", default_response_class=FastJSONResponse)
 
-# Make sure DATA_ROOT exists BEFORE you mount it
-os.makedirs(settings.DATA_ROOT, exist_ok=True)
+if settings.CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-# --- DEBUG: print what we're about to mount
-print("[startup] DATA_ROOT =", settings.DATA_ROOT)
-print("[startup] DATA_URL_PREFIX =", settings.DATA_URL_PREFIX)
-print("[startup] DATA_ROOT exists? ", Path(settings.DATA_ROOT).exists())
 
 @app.on_event("startup")
 def _seed_volume():
-    base_dir = os.path.dirname(__file__)
-    seed_reference_files(settings.DATA_ROOT, base_dir)
-
-
-app.mount(
-    settings.DATA_URL_PREFIX,  # should be "/data"
-    StaticFiles(directory=settings.DATA_ROOT),  # absolute path to the "data" folder
-    name="data",
-)
-app.include_router(public.router)
-app.include_router(admin_router)
+    os.makedirs(settings.DATA_ROOT, exist_ok=True)
+    seed_reference_files(settings.DATA_ROOT, APP_DIR)
+    # first worker to get the lock builds the shared week pack; others just map it
+    sharedmem.publish_weeks_async()
+    refdata.start_watcher()
+    print(f"[startup] DATA_ROOT={settings.DATA_ROOT} PORT={os.getenv('PORT')}")
 
 
-for r in app.routes:
-    try:
-        print("route:", getattr(r, "path", r))
-    except Exception:
-        pass
-
-# (Optional) CORS if your admin page is served from another origin
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # tighten later
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app = FastAPI(title="SimFBA Python Worker", version="0.2.0")
-
-# Health check
-@app.get("/health")
-def health():
-    return {"ok": True}
-
-# Include the admin routes at /admin/...
-app.include_router(admin_router, prefix="/admin")
-
-# Debug: list routes at startup
-@app.on_event("startup")
-async def list_routes():
-    print("== Registered routes ==")
-    for r in app.routes:
-        methods = ",".join(sorted(r.methods)) if hasattr(r, "methods") else ""
-        print(f"{methods:10s} {getattr(r, 'path', getattr(r, 'path_format', ''))}")
-    print("========================")
-
-# APIs
+# APIs. /data/processed and /data/raw are served by routers/public.py (week
+# cache, ETags, gzip); no StaticFiles mount over DATA_ROOT so nothing
+# bypasses them. /health lives in the public router.
 app.include_router(public.router, tags=["public"])
 app.include_router(admin.router, tags=["admin"])
+app.include_router(admin_router, prefix="/admin")  # legacy RUN_TOKEN /admin/run
 
 # Static + Templates
-app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(__file__), "static")), name="static")
-templates = Jinja2Templates(directory="app/templates")
+app.mount("/static", StaticFiles(directory=os.path.join(APP_DIR, "static")), name="static")
+templates = Jinja2Templates(directory=os.path.join(APP_DIR, "templates"))
 
 # Public viewer
 @app.get("/", response_class=HTMLResponse)
@@ -97,11 +67,6 @@ def admin_page(request: Request):
 
 #launch
 if __name__ == "__main__":
-    import os
     import uvicorn
     port = int(os.getenv("PORT", "8000"))  # Railway sets PORT; default 8000 locally
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=False)
-
-import sys
-print(f"[BOOT] PORT={os.getenv('PORT')}", file=sys.stderr)
-print(f"[BOOT] DATA_ROOT={settings.DATA_ROOT} exists={os.path.isdir(settings.DATA_ROOT)}", file=sys.stderr)
@@ -1,6 +1,12 @@
 # app/manifest.py
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from . import seasonpack
+
+# Bump when the manifest gains fields: shared packs (sharedmem.py) holding
+# an older manifest are then treated as stale and rebuilt.
+MANIFEST_FORMAT = 2
 
 def _safe_int(s: str) -> int | None:
     try:
@@ -8,6 +14,10 @@ def _safe_int(s: str) -> int | None:
     except Exception:
         return None
 
+def _etag_from_meta(meta: Any) -> Optional[str]:
+    sha = meta.get("output_sha256") if isinstance(meta, dict) else None
+    return f'"{sha}"' if sha else None
+
 def build_manifest(
     data_root: str,
     data_url_prefix: str = "/data",
@@ -21,15 +31,22 @@ def build_manifest(
         files:  { sport: { year: { "yyww": "<url>" } } },
         years:  { sport: [years...] },
         weeks:  { sport: { year: [weeks...] } },
+        etags:  { sport: { year: { "yyww": "<etag>" } } },
+        schema: { sport: { year: <season schema catalog> } },
         defaults: { sport, view, year, week }
       }
+    etags lets clients reuse a locally cached week without a request;
+    schema (app/schema.py) gives columns, types and ID keys up front.
     """
+    from . import schema  # lazy: schema -> bundle -> weekcache -> manifest
     processed_root = os.path.join(data_root, "processed")
     manifest: Dict[str, Any] = {
         "sports": [],
         "files": {},
         "years": {},
         "weeks": {},
+        "etags": {},
+        "schema": {},
         "defaults": {"sport": default_sport, "view": "team"},
     }
 
@@ -45,6 +62,8 @@ def build_manifest(
         manifest["files"][sport] = {}
         manifest["years"][sport] = []
         manifest["weeks"][sport] = {}
+        manifest["etags"][sport] = {}
+        manifest["schema"][sport] = {}
 
         for name in sorted(os.listdir(sport_dir)):
             if not name.isdigit():
@@ -60,14 +79,11 @@ def build_manifest(
             manifest["years"][sport].append(year_i)
             manifest["files"][sport][year_i] = {}
             manifest["weeks"][sport][year_i] = []
+            manifest["etags"][sport][year_i] = {}
+            catalogs = []
 
-            for fname in sorted(os.listdir(year_dir)):
-                if not fname.endswith(".json"):
-                    continue
-                base = fname[:-5]
-                if len(base) != 4 or not base.isdigit():
-                    continue
-                yyww = base
+            # loose {yyww}.json files and/or the season's packfile index
+            for yyww in seasonpack.week_names(sport, year_i):
                 week = _safe_int(yyww[2:4])
                 if week is None:
                     continue
@@ -81,8 +97,17 @@ def build_manifest(
 
                 manifest["files"][sport][year_i][yyww] = url
                 manifest["weeks"][sport][year_i].append(week)
+                meta = seasonpack.load_meta(sport, year_i, yyww)
+                etag = _etag_from_meta(meta)
+                if etag:
+                    manifest["etags"][sport][year_i][yyww] = etag
+                cat = schema.from_meta(meta)
+                if cat:
+                    catalogs.append((week, cat))
 
             manifest["weeks"][sport][year_i].sort()
+            if catalogs:
+                manifest["schema"][sport][year_i] = schema.merge([c for _, c in sorted(catalogs, key=lambda x: x[0])])
 
         manifest["years"][sport].sort()
 
@@ -101,3 +126,13 @@ def build_manifest(
             manifest["defaults"]["week"] = ws[-1]
 
     return manifest
+
+
+def api_manifest(data_root: str) -> Dict[str, Any]:
+    """The manifest as served by GET /manifest (URLs point at the API routes)."""
+    return build_manifest(
+        data_root=data_root,
+        data_url_prefix="",
+        default_sport="nfl",
+        use_api_routes=True,
+    )
@@ -0,0 +1,286 @@
+# app/memprof.py
+import gc, os, sys, threading, time, tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+from .util import ensure_dir
+
+
+# Memory introspection for the admin routes: process RSS, sizes of the
+# module-level caches, and tracemalloc snapshots / diffs.
+#
+# Snapshots are dumped to {DATA_ROOT}/memprof/{pid}-{n}.snap instead of
+# being kept in memory (a snapshot of a large heap is itself large; holding
+# several would skew what we're measuring). Only the newest
+# MEMPROF_MAX_SNAPSHOTS files per worker are kept. Everything here is per
+# process: with several workers each request lands on one of them, so
+# every response carries the pid and snapshot ids are pid-prefixed.
+#
+# Cache sizes are read through sys.modules, so asking for them never
+# imports (and loads) a module the worker hasn't used yet.
+
+_lock = threading.Lock()
+_seq = 0
+
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+GROUP_BY = {"lineno": "lineno", "line": "lineno", "filename": "filename", "module": "filename", "traceback": "traceback"}
+
+
+# ---------- Process ----------
+
+def rss() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size in bytes (Linux /proc; peak only elsewhere)."""
+    out: Dict[str, Optional[int]] = {"rss_bytes": None, "peak_rss_bytes": None}
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    out["rss_bytes"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    out["peak_rss_bytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            out["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+        except Exception:
+            pass
+    return out
+
+
+def deep_size(obj: Any, limit: int = 200_000) -> int:
+    """Rough recursive sys.getsizeof over dicts / lists / tuples / sets (stops after `limit` objects)."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < limit:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return total
+
+
+def _mapping_info(m: Any) -> Dict[str, Any]:
+    if m is None:
+        return {"loaded": False}
+    info: Dict[str, Any] = {"loaded": True, "type": type(m).__name__, "entries": len(m)}
+    if isinstance(m, dict):
+        info["approx_bytes"] = deep_size(m)
+    else:
+        info["shared"] = True   # SharedMap: entries live in the mmap'd pack (counted under RSS as shared pages)
+        info["generation"] = getattr(m, "generation", None)
+        memo = getattr(m, "_memo", None)
+        if memo is not None:
+            info["decoded"] = len(memo)   # entries this worker has decoded into its own heap (SharedMap._memo)
+    return info
+
+
+def caches() -> Dict[str, Any]:
+    """Entry counts / sizes of the module-level caches this worker has populated."""
+    out: Dict[str, Any] = {}
+    proc = sys.modules.get(f"{__package__}.processor")
+    if proc is not None:
+        ref = getattr(proc, "_players_ref", None)
+        out["players_map"] = _mapping_info(ref[0] if ref else None)
+        out["team_maps"] = {sp: _mapping_info(r[0] if r else None) for sp, r in (getattr(proc, "_team_refs", None) or {}).items()}
+    wc = sys.modules.get(f"{__package__}.weekcache")
+    if wc is not None:
+        st = wc.stats()
+        out["week_cache"] = {k: st[k] for k in ("entries", "bytes", "budget_bytes")}
+    shm = sys.modules.get(f"{__package__}.sharedmem")
+    if shm is not None:
+        packs = getattr(shm, "_packs", {})
+        out["shared_packs"] = {
+            "mapped": len(packs),
+            "mapped_bytes": sum(p.size for p in packs.values()),
+        }
+    sp = sys.modules.get(f"{__package__}.seasonpack")
+    if sp is not None:
+        seasons = dict(getattr(sp, "_seasons", {}))
+        out["season_packs"] = {
+            "mapped": sum(1 for s in seasons.values() if s.mm is not None),
+            "mapped_bytes": sum(len(s.mm) for s in seasons.values() if s.mm is not None),
+        }
+    proj = sys.modules.get(f"{__package__}.projections")
+    if proj is not None:
+        seasons = dict(getattr(proj, "_seasons", {}))
+        nbytes = 0
+        for _, s in seasons.values():
+            for arr in (s.history, s.games, s.ids, *s.cubes.values()):
+                nbytes += getattr(arr, "nbytes", 0)
+        out["projection_seasons"] = {"entries": len(seasons), "array_bytes": nbytes,
+                                     "keys": [f"{sp}/{y}" for sp, y in seasons]}
+    for mod, attr, label in (("dvp", "_tables", "dvp_tables"), ("schema", "_seasons", "schema_seasons")):
+        m = sys.modules.get(f"{__package__}.{mod}")
+        if m is not None:
+            table = dict(getattr(m, attr, {}))
+            out[label] = {"entries": len(table), "approx_bytes": deep_size([v for _, v in table.values()])}
+    tr = sys.modules.get(f"{__package__}.tracing")
+    if tr is not None:
+        buf = getattr(tr, "_buffer", None)
+        out["trace_buffer"] = {"spans": len(buf) if buf is not None else 0, "max": getattr(buf, "maxlen", None)}
+    return out
+
+
+def object_counts(top: int = 25) -> Dict[str, Any]:
+    """gc-tracked objects by type (a full heap walk: slow on big heaps, call on demand)."""
+    objs = gc.get_objects()
+    counts = Counter(type(o).__name__ for o in objs)
+    return {"total": len(objs), "gc_counts": gc.get_count(), "top": counts.most_common(top)}
+
+
+# ---------- tracemalloc ----------
+
+def tracing_status() -> Dict[str, Any]:
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+    cur, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": True,
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": cur,
+        "traced_peak_bytes": peak,
+        "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+    }
+
+
+def start(frames: Optional[int] = None) -> Dict[str, Any]:
+    n = max(1, int(frames if frames is not None else settings.MEMPROF_FRAMES))
+    if tracemalloc.is_tracing() and tracemalloc.get_traceback_limit() != n:
+        tracemalloc.stop()   # the frame limit is fixed for a tracing session
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(n)
+        print(f"[MEMPROF] tracemalloc started (frames={n}, pid={os.getpid()})")
+    return tracing_status()
+
+
+def stop() -> Dict[str, Any]:
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        print(f"[MEMPROF] tracemalloc stopped (pid={os.getpid()})")
+    return tracing_status()
+
+
+def _dir() -> str:
+    return os.path.join(settings.DATA_ROOT, "memprof")
+
+
+def _path(snap_id: str) -> Optional[str]:
+    if not snap_id or "/" in snap_id or "\\" in snap_id or snap_id.startswith("."):
+        return None
+    p = os.path.join(_dir(), f"{snap_id}.snap")
+    return p if os.path.isfile(p) else None
+
+
+def _prune() -> None:
+    prefix = f"{os.getpid()}-"
+    mine = sorted(
+        (f for f in os.listdir(_dir()) if f.startswith(prefix) and f.endswith(".snap")),
+        key=lambda f: int(f[len(prefix):-5]),
+    )
+    for f in mine[:-max(1, settings.MEMPROF_MAX_SNAPSHOTS)]:
+        try:
+            os.remove(os.path.join(_dir(), f))
+        except OSError:
+            pass
+
+
+def _stat_entry(st: Any, key_type: str) -> Dict[str, Any]:
+    tb = st.traceback
+    where = f"{tb[0].filename}:{tb[0].lineno}" if key_type != "filename" else tb[0].filename
+    e: Dict[str, Any] = {"where": where, "size": st.size, "count": st.count}
+    if hasattr(st, "size_diff"):
+        e["size_diff"] = st.size_diff
+        e["count_diff"] = st.count_diff
+    if key_type == "traceback":
+        e["traceback"] = [f"{fr.filename}:{fr.lineno}" for fr in tb]
+    return e
+
+
+def snapshot(group_by: str = "lineno", limit: int = 20) -> Dict[str, Any]:
+    """Take + store a snapshot; returns its id and the top allocation sites."""
+    global _seq
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running; POST /admin/memory/tracemalloc first")
+    key_type = GROUP_BY.get(group_by, "lineno")
+    snap = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+    ensure_dir(_dir())
+    with _lock:
+        _seq += 1
+        snap_id = f"{os.getpid()}-{_seq}"
+    snap.dump(os.path.join(_dir(), f"{snap_id}.snap"))
+    _prune()
+    stats = snap.statistics(key_type)
+    return {
+        "id": snap_id,
+        "pid": os.getpid(),
+        "taken": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+        "traced_bytes": sum(s.size for s in stats),
+        "group_by": key_type,
+        "top": [_stat_entry(s, key_type) for s in stats[:limit]],
+        **rss(),
+    }
+
+
+def snapshots() -> List[Dict[str, Any]]:
+    if not os.path.isdir(_dir()):
+        return []
+    out = []
+    for f in sorted(os.listdir(_dir())):
+        if f.endswith(".snap"):
+            st = os.stat(os.path.join(_dir(), f))
+            out.append({"id": f[:-5], "bytes": st.st_size,
+                        "taken": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(st.st_mtime))})
+    return out
+
+
+def diff(a: str, b: Optional[str] = None, group_by: str = "lineno", limit: int = 30) -> Optional[Dict[str, Any]]:
+    """
+    What grew from snapshot `a` to `b` (b=None: a fresh snapshot of this
+    worker), grouped by line / file (module) / traceback, largest growth
+    first. None when a snapshot id is unknown.
+    """
+    key_type = GROUP_BY.get(group_by, "lineno")
+    pa = _path(a)
+    if pa is None:
+        return None
+    if b is None:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running; pass b= or start tracing")
+        snap_b = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+    else:
+        pb = _path(b)
+        if pb is None:
+            return None
+        snap_b = tracemalloc.Snapshot.load(pb)
+    snap_a = tracemalloc.Snapshot.load(pa)
+    stats = snap_b.compare_to(snap_a, key_type)
+    return {
+        "a": a,
+        "b": b or "now",
+        "pid": os.getpid(),
+        "group_by": key_type,
+        "size_diff": sum(s.size_diff for s in stats),
+        "count_diff": sum(s.count_diff for s in stats),
+        "top": [_stat_entry(s, key_type) for s in stats[:limit]],
+    }
+
+
+def report(objects: int = 0) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"pid": os.getpid(), **rss(), "tracemalloc": tracing_status(), "caches": caches()}
+    if objects > 0:
+        out["objects"] = object_counts(objects)
+    return out
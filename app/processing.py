@@ -2,6 +2,7 @@
 import json, os, hashlib
 from datetime import datetime
 from .config import settings
+from . import schema
 
 PLAYERS_CSV = os.path.join(settings.DATA_ROOT, "players", "playerdetails.csv")
 
@@ -120,14 +121,8 @@ def process_one(sport: str, year: int, yyww: str, raw_path: str) -> str:
 
     # Enrich players
     if out[player_key]:
-        # Try to detect ID key (most cases 'ID')
-        sample = out[player_key][0] if isinstance(out[player_key][0], dict) else {}
-        id_key = "ID"
-        if id_key not in sample:
-            # fallback try common variants
-            for k in sample.keys():
-                if str(k).lower().endswith("id") and "team" not in str(k).lower():
-                    id_key = k; break
+        # Same ID key rule as processor.process_one (recorded in the schema catalog)
+        id_key = schema.id_key(sport, "player", schema.column_names(out[player_key]))
 
         matched = 0
         for row in out[player_key]:
@@ -153,6 +148,7 @@ def process_one(sport: str, year: int, yyww: str, raw_path: str) -> str:
         "players_sha256": players_sha,
         "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
         "source": os.path.relpath(raw_path, settings.DATA_ROOT).replace("\\", "/"),
+        "schema": schema.build(sport, out, id_keys={"player": id_key} if out[player_key] else None),
     }
     try:
         with open(meta_path, "w", encoding="utf-8") as f:
@@ -1,12 +1,14 @@
 # app/processor.py
-import os, json, csv, time, hashlib, re
+import os, csv, time, hashlib
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, Tuple, Any, Optional
-
-import requests
+from typing import Dict, List, Mapping, Tuple, Any, Optional
 
 from .config import settings  # needs DATA_ROOT, optional API_BASE, PLAYERS_CSV
-from .util import ensure_dir  # mkdir -p helper
+from .util import ensure_dir, atomic_write  # mkdir -p helper, temp+rename writer
+from .tracing import span, trace
+from .ratecontrol import AdaptiveRate, CircuitBreaker, parse_retry_after
+from . import rawstore, changes, weekcache, jsonio, sharedmem, schema, dvp, projections, syncplan, workqueue, refdata, seasonpack
 
 
 # ---------- Helpers ----------
@@ -45,17 +47,76 @@ def _team_key_for(sport: str) -> str:
     return "NFLTeamGameStats" if sport == "nfl" else "CFBTeamGameStats"
 
 def _safe_json_load(path: str) -> Optional[dict]:
+    return jsonio.load_file(path)
+
+
+# ---------- Reference map snapshots ----------
+# Parsed players/team maps are cached as compact JSON under
+# {DATA_ROOT}/cache/refmaps/, keyed by the source CSV's (path, size, mtime).
+# A fresh worker then skips both the CSV parse and the sha256 pass; any edit
+# to the CSV changes its stamp and the snapshot is rebuilt on next load.
+
+def _ref_snapshot_path(kind: str) -> str:
+    return os.path.join(settings.DATA_ROOT, "cache", "refmaps", f"{kind}.json")
+
+def _csv_stamp(path: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"source": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _read_ref_snapshot(kind: str, src: str) -> Optional[Dict[str, Any]]:
+    if not settings.REF_SNAPSHOT:
+        return None
+    stamp = _csv_stamp(src)
+    if stamp is None:
+        return None
+    snap = jsonio.load_file(_ref_snapshot_path(kind))
+    if not isinstance(snap, dict) or not isinstance(snap.get("map"), dict):
+        return None
+    if any(snap.get(k) != v for k, v in stamp.items()):
+        return None
+    return snap
+
+def _write_ref_snapshot(kind: str, src: str, sha: Optional[str], mapping: Dict[Any, Any]) -> None:
+    if not settings.REF_SNAPSHOT:
+        return
+    stamp = _csv_stamp(src)
+    if stamp is None:
+        return
+    snap = dict(stamp, sha256=sha, map={k: v for k, v in mapping.items() if isinstance(k, str)})
+    try:
+        path = _ref_snapshot_path(kind)
+        ensure_dir(os.path.dirname(path))
+        atomic_write(path, jsonio.dumps(snap))
+    except Exception as e:
+        print(f"[PROCESSOR] ref snapshot write failed [{kind}]: {e}")
+
+def _shared_ref(kind: str, src: str) -> Optional["sharedmem.SharedMap"]:
+    """Map already published to the shared mmap pack for this CSV stamp, if any."""
+    if not settings.SHM_ENABLED:
         return None
+    return sharedmem.refmap(kind, _csv_stamp(src))
+
+def _publish_shared_ref(kind: str, src: str, sha: Optional[str], mapping: Dict[Any, Any]) -> Any:
+    """Publish to the shared pack and hand back the mmap view (or `mapping` if that fails)."""
+    if not settings.SHM_ENABLED:
+        return mapping
+    try:
+        shared = sharedmem.publish_refmap(kind, _csv_stamp(src), sha, {k: v for k, v in mapping.items() if isinstance(k, str)})
+    except Exception as e:
+        print(f"[PROCESSOR] shared ref publish failed [{kind}]: {e}")
+        shared = None
+    return shared if shared is not None else mapping
 
 
 # ---------- Players CSV path & cache ----------
+# Loaded maps are cached per worker as one (map, csv_sha, csv_stamp) tuple,
+# so a hot reload (reload_reference_maps) swaps map and sha in a single
+# assignment and readers never see one without the other.
 
-_players_cache: Optional[Dict[str, Dict[str, Any]]] = None
-_players_sha: Optional[str] = None
+_players_ref: Optional[Tuple[Mapping[str, Dict[str, Any]], Optional[str], Optional[Dict[str, Any]]]] = None
 
 def _players_csv_path() -> str:
     """
@@ -73,22 +134,13 @@ def _players_csv_path() -> str:
     return os.path.join(settings.DATA_ROOT, "players", "playerdetails.csv")
 
 
-def _load_players_map() -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
-    """
-    Returns (map, csv_sha).
-    map: { "12345": {"FullName": "First Last", "Position": "QB"}, ... }
-    """
-    global _players_cache, _players_sha
-    if _players_cache is not None:
-        return _players_cache, _players_sha
-
-    path = _players_csv_path()
+def _parse_players_csv(path: str) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+    """(map, csv_sha) straight from the CSV; no caches touched."""
     mapping: Dict[str, Dict[str, Any]] = {}
     sha = _sha256_file(path)
 
     if not os.path.isfile(path):
         print(f"[PROCESSOR] players CSV missing: {path}")
-        _players_cache, _players_sha = mapping, sha
         return mapping, sha
 
     with open(path, "r", encoding="utf-8-sig", newline="") as fh:
@@ -96,7 +148,6 @@ def _load_players_map() -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
         try:
             header = next(reader)
         except StopIteration:
-            _players_cache, _players_sha = mapping, sha
             return mapping, sha
 
         norm = [("".join(h.split())).lower() for h in header]
@@ -138,15 +189,47 @@ def _load_players_map() -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
 
             mapping[pid] = {"FullName": full, "Position": pos}
 
+    return mapping, sha
+
+
+def _load_players_map() -> Tuple[Mapping[str, Dict[str, Any]], Optional[str]]:
+    """
+    Returns (map, csv_sha).
+    map: { "12345": {"FullName": "First Last", "Position": "QB"}, ... }
+    """
+    global _players_ref
+    ref = _players_ref
+    if ref is not None:
+        return ref[0], ref[1]
+
+    path = _players_csv_path()
+    stamp = _csv_stamp(path)
+    shared = _shared_ref("players", path)
+    if shared is not None:
+        _players_ref = (shared, shared.sha256, stamp)
+        print(f"[PROCESSOR] players map size: {len(shared)}, sha: {shared.sha256} (shared gen {shared.generation})")
+        return shared, shared.sha256
+
+    snap = _read_ref_snapshot("players", path)
+    if snap is not None:
+        mapping = _publish_shared_ref("players", path, snap.get("sha256"), snap["map"])
+        _players_ref = (mapping, snap.get("sha256"), stamp)
+        print(f"[PROCESSOR] players map size: {len(mapping)}, sha: {snap.get('sha256')} (snapshot)")
+        return mapping, snap.get("sha256")
+
+    mapping, sha = _parse_players_csv(path)
     print(f"[PROCESSOR] players map size: {len(mapping)}, sha: {sha}")
-    _players_cache, _players_sha = mapping, sha
+    if os.path.isfile(path):
+        _write_ref_snapshot("players", path, sha, mapping)
+        _players_ref = (_publish_shared_ref("players", path, sha, mapping), sha, stamp)
+    else:
+        _players_ref = (mapping, sha, stamp)
     return mapping, sha
 
 
 # ---------- Team CSVs (NEW) ----------
 
-_team_maps: Dict[str, Dict[str, Optional[str]]] = {"nfl": None, "cfb": None}  # type: ignore
-_team_shas: Dict[str, Optional[str]] = {"nfl": None, "cfb": None}
+_team_refs: Dict[str, Optional[Tuple[Mapping[Any, Optional[str]], Optional[str], Optional[Dict[str, Any]]]]] = {"nfl": None, "cfb": None}
 
 def _team_csv_path(sport: str) -> str:
     """
@@ -162,26 +245,13 @@ def _team_csv_path(sport: str) -> str:
     return os.path.join(settings.DATA_ROOT, "teams", filename)
 
 
-def _load_team_map(sport: str) -> Tuple[Dict[Any, Optional[str]], Optional[str]]:
-    """
-    Load team_id -> team_abbr/abbrev for the given sport.
-    Returns a mapping that supports BOTH str and int keys, e.g. mapping['110'] and mapping[110].
-    """
-    sport = sport.lower()
-    if sport not in ("nfl", "cfb"):
-        return {}, None
-
-    # per-run cache
-    if _team_maps[sport] is not None:
-        return _team_maps[sport], _team_shas[sport]
-
-    path = _team_csv_path(sport)
+def _parse_team_csv(sport: str, path: str) -> Tuple[Dict[Any, Optional[str]], Optional[str]]:
+    """(map with str + int keys, csv_sha) straight from the CSV; no caches touched."""
     mapping: Dict[Any, Optional[str]] = {}
     sha = _sha256_file(path)
 
     if not os.path.isfile(path):
         print(f"[PROCESSOR] team CSV missing for {sport}: {path}")
-        _team_maps[sport], _team_shas[sport] = mapping, sha
         return mapping, sha
 
     def _add_row(tid_raw, abbr_raw):
@@ -229,44 +299,339 @@ def _load_team_map(sport: str) -> Tuple[Dict[Any, Optional[str]], Optional[str]]
                 abbr = row[1] if len(row) > 1 else ""
                 _add_row(tid, abbr)
 
+    return mapping, sha
+
+
+def _load_team_map(sport: str) -> Tuple[Mapping[Any, Optional[str]], Optional[str]]:
+    """
+    Load team_id -> team_abbr/abbrev for the given sport.
+    Returns a mapping that supports BOTH str and int keys, e.g. mapping['110'] and mapping[110].
+    """
+    sport = sport.lower()
+    if sport not in ("nfl", "cfb"):
+        return {}, None
+
+    # per-worker cache (swapped by reload_reference_maps)
+    ref = _team_refs[sport]
+    if ref is not None:
+        return ref[0], ref[1]
+
+    path = _team_csv_path(sport)
+    stamp = _csv_stamp(path)
+
+    shared = _shared_ref(f"teams_{sport}", path)
+    if shared is not None:
+        print(f"[PROCESSOR] team map [{sport}] size: {len(shared)}, sha: {shared.sha256} (shared gen {shared.generation})")
+        _team_refs[sport] = (shared, shared.sha256, stamp)
+        return shared, shared.sha256
+
+    snap = _read_ref_snapshot(f"teams_{sport}", path)
+    if snap is not None:
+        mapping = _team_map_from_snapshot(snap)
+        sha = snap.get("sha256")
+        print(f"[PROCESSOR] team map [{sport}] size: {len(mapping)}, sha: {sha} (snapshot)")
+        mapping = _publish_shared_ref(f"teams_{sport}", path, sha, mapping)
+        _team_refs[sport] = (mapping, sha, stamp)
+        return mapping, sha
+
+    mapping, sha = _parse_team_csv(sport, path)
     print(f"[PROCESSOR] team map [{sport}] size: {len(mapping)}, sha: {sha}")
-    _team_maps[sport], _team_shas[sport] = mapping, sha
+    if os.path.isfile(path):
+        _write_ref_snapshot(f"teams_{sport}", path, sha, mapping)
+        mapping = _publish_shared_ref(f"teams_{sport}", path, sha, mapping)
+    _team_refs[sport] = (mapping, sha, stamp)
     return mapping, sha
 
 
+def _team_map_from_snapshot(snap: Dict[str, Any]) -> Dict[Any, Optional[str]]:
+    # snapshot keeps the string keys only; restore the int aliases
+    mapping: Dict[Any, Optional[str]] = {}
+    for tid_s, abbr in snap["map"].items():
+        mapping[tid_s] = abbr
+        try:
+            mapping[int(tid_s)] = abbr
+        except ValueError:
+            pass
+    return mapping
+
+
+# ---------- Reference data hot reload ----------
+
+def _ref_path(kind: str) -> str:
+    return _players_csv_path() if kind == "players" else _team_csv_path(kind.split("_", 1)[1])
+
+
+def reference_stamps() -> Dict[str, Optional[Dict[str, Any]]]:
+    """(path, size, mtime) of each reference CSV as it is on disk now."""
+    return {kind: _csv_stamp(_ref_path(kind)) for kind, _ in refdata.KINDS}
+
+
+def _current_ref(kind: str):
+    return _players_ref if kind == "players" else _team_refs[kind.split("_", 1)[1]]
+
+
+def _swap_ref(kind: str, ref) -> None:
+    global _players_ref
+    if kind == "players":
+        _players_ref = ref
+    else:
+        _team_refs[kind.split("_", 1)[1]] = ref
+
+
+def reload_reference_maps(force: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Hot reload of the reference CSVs. For each CSV whose stamp differs from
+    the map this worker has loaded (all of them with force=True):
+      1. parse the new CSV and diff it against the loaded map (or the
+         on-disk snapshot when this worker hasn't loaded one) -> changed IDs;
+      2. swap the worker's cached map (one assignment) and republish the
+         snapshot + shared pack;
+      3. reprocess only the processed weeks containing a changed ID (via
+         the refdata ID -> weeks index), and point the other weeks' meta at
+         the new CSV sha so later runs don't rebuild them.
+    Step 3 runs once per CSV change across workers (flock + reload state);
+    a worker arriving later only swaps its cache. Without a baseline map
+    to diff against, every week built from another sha is reprocessed.
+    dry_run=True reports the diff and affected weeks and changes nothing.
+    """
+    t0 = time.perf_counter()
+    report: Dict[str, Any] = {"kinds": {}, "reprocessed": {}, "restamped": 0, "dry_run": dry_run}
+    plans: List[Tuple[str, Optional[str], Optional[str], Optional[Dict[str, List[str]]]]] = []
+
+    with trace("ref_reload", force=force, dry_run=dry_run), refdata.reload_lock():
+        state = refdata.load_state()
+        for kind, sport in refdata.KINDS:
+            path = _ref_path(kind)
+            stamp = _csv_stamp(path)
+            cur = _current_ref(kind)
+            if cur is None:
+                # not loaded by this worker: the snapshot is the last map anyone parsed
+                snap = jsonio.load_file(_ref_snapshot_path(kind))
+                if isinstance(snap, dict) and isinstance(snap.get("map"), dict):
+                    old_map = snap["map"] if kind == "players" else _team_map_from_snapshot(snap)
+                    old_sha, old_stamp = snap.get("sha256"), {k: snap.get(k) for k in ("source", "size", "mtime_ns")}
+                else:
+                    old_map, old_sha, old_stamp = None, None, None
+            else:
+                old_map, old_sha, old_stamp = cur
+            if not force and old_stamp == stamp:
+                report["kinds"][kind] = {"status": "unchanged", "sha": old_sha}
+                continue
+
+            with span("ref_reload.parse", kind=kind):
+                new_map, new_sha = _parse_players_csv(path) if kind == "players" else _parse_team_csv(sport, path)
+            entry: Dict[str, Any] = {"old_sha": old_sha, "new_sha": new_sha, "entries": sum(1 for k in new_map if isinstance(k, str))}
+            if new_sha == old_sha:
+                entry["status"] = "same_content"
+                diff = {"added": [], "removed": [], "changed": []}
+            elif old_map is None:
+                entry["status"] = "no_baseline"
+                diff = None
+            else:
+                with span("ref_reload.diff", kind=kind):
+                    diff = refdata.diff_maps(old_map, new_map)
+                entry["status"] = "changed"
+                entry.update({k: len(v) for k, v in diff.items()})
+                entry["sample"] = {k: v[:10] for k, v in diff.items() if v}
+            handled = (state.get(kind) or {}).get("sha") == new_sha
+            entry["handled_elsewhere"] = handled and new_sha != old_sha
+            report["kinds"][kind] = entry
+
+            if dry_run:
+                if diff is not None and new_sha != old_sha:
+                    ids = diff["added"] + diff["removed"] + diff["changed"]
+                    field = "players" if kind == "players" else "teams"
+                    entry["affected_weeks"] = {
+                        sp: len(refdata.affected_weeks(sp, field, ids))
+                        for sp in (("nfl", "cfb") if kind == "players" else (sport,))
+                    }
+                continue
+
+            if os.path.isfile(path):
+                _write_ref_snapshot(kind, path, new_sha, new_map)
+                installed = _publish_shared_ref(kind, path, new_sha, new_map)
+            else:
+                installed = new_map
+            _swap_ref(kind, (installed, new_sha, stamp))
+            print(f"[PROCESSOR] reloaded {kind}: {entry['status']} sha {old_sha} -> {new_sha}")
+            if new_sha != old_sha and not handled:
+                plans.append((kind, old_sha, new_sha, diff))
+
+        if dry_run:
+            report["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            return report
+
+        # targeted reprocess, once all maps are swapped (a week may need both)
+        todo: Dict[Tuple[str, int, str], None] = {}
+        for kind, old_sha, new_sha, diff in plans:
+            field = "players" if kind == "players" else "teams"
+            for sp in (("nfl", "cfb") if kind == "players" else (kind.split("_", 1)[1],)):
+                if diff is None:
+                    meta_field = "players_sha256" if kind == "players" else "teams_sha256"
+                    weeks = [w for w in refdata.processed_weeks(sp) if _meta_field(sp, *w, meta_field) != new_sha]
+                else:
+                    weeks = refdata.affected_weeks(sp, field, diff["added"] + diff["removed"] + diff["changed"])
+                for y, w in weeks:
+                    todo[(sp, y, w)] = None
+
+        counts: Dict[str, int] = {}
+        processed = 0
+        for sp, y, w in todo:
+            raw_path = rawstore.week_path(settings.DATA_ROOT, sp, y, w)
+            with span("ref_reload.week", sport=sp, year=y, yyww=w) as wsp:
+                st = process_one(sp, y, w, raw_path, force=True, source="refdata")
+                wsp.set(status=st)
+            counts[st] = counts.get(st, 0) + 1
+            processed += 1 if st == "processed" else 0
+        report["reprocessed"] = {"weeks": len(todo), **counts}
+
+        # untouched weeks: same output under the new CSV, only the sha moves
+        for kind, old_sha, new_sha, diff in plans:
+            if diff is None:
+                continue
+            meta_field = "players_sha256" if kind == "players" else "teams_sha256"
+            for sp in (("nfl", "cfb") if kind == "players" else (kind.split("_", 1)[1],)):
+                report["restamped"] += refdata.restamp(sp, meta_field, old_sha, new_sha,
+                                                       skip=[(y, w) for s2, y, w in todo if s2 == sp])
+        for kind, _, new_sha, _ in plans:
+            state[kind] = {"sha": new_sha, "at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}
+        report["shared_generation"] = _republish_shared_weeks(processed)
+        report["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        if plans or any(e.get("status") != "unchanged" for e in report["kinds"].values()):
+            state["last_report"] = {k: v for k, v in report.items() if k != "kinds"}
+            state["last_report"]["kinds"] = {k: {kk: vv for kk, vv in v.items() if kk != "sample"} for k, v in report["kinds"].items()}
+            refdata.save_state(state)
+    return report
+
+
+def _meta_field(sport: str, year: int, yyww: str, field: str) -> Any:
+    meta = seasonpack.load_meta(sport, year, yyww)
+    return meta.get(field) if isinstance(meta, dict) else None
+
+
+def reference_status() -> Dict[str, Any]:
+    """Loaded vs on-disk reference CSVs of this worker, plus the last reload."""
+    out: Dict[str, Any] = {"pid": os.getpid(), "watcher": refdata.watcher_running(), "kinds": {}}
+    disk = reference_stamps()
+    for kind, _ in refdata.KINDS:
+        cur = _current_ref(kind)
+        out["kinds"][kind] = {
+            "path": _ref_path(kind),
+            "loaded": cur is not None,
+            "sha": cur[1] if cur else None,
+            "stale": bool(cur) and cur[2] != disk[kind],
+        }
+    out["last_reload"] = refdata.load_state().get("last_report")
+    return out
+
+
+# ---------- Shared week pack ----------
+
+def _republish_shared_weeks(changed: int) -> Optional[int]:
+    """
+    Rebuild the shared mmap week pack after a batch that changed outputs
+    (or if none exists yet). Returns the new generation, None if skipped.
+    """
+    if not settings.SHM_ENABLED:
+        return None
+    if not changed and os.path.isfile(sharedmem.pack_path("weeks")):
+        return None
+    try:
+        with span("shm.publish_weeks"):
+            res = sharedmem.publish_weeks(wait=True)
+        return res["generation"] if res else None
+    except Exception as e:
+        print(f"[PROCESSOR] shared week pack publish failed: {e}")
+        return None
+
 
 # ---------- Process one raw file into processed ----------
 
-def process_one(sport: str, year: int, yyww: str, raw_path: str, force: bool = False) -> str:
+def _ref_key(v: Any) -> Optional[str]:
+    s = str(v).strip() if v is not None else None
+    return s or None
+
+def _resolved(m: Mapping[str, Any], keys: List[Optional[str]]) -> Mapping[str, Any]:
+    """`m` itself, or for a SharedMap the plain dict of its decoded entries covering `keys`."""
+    if isinstance(m, sharedmem.SharedMap):
+        return m.resolve(keys)
+    return m
+
+def _enrich_players(player_rows: List[Any], id_key: str, players_map: Mapping[str, Any], teams_map: Mapping[str, Any]) -> None:
+    """
+    FullName/Position from players_map via `id_key`, Team from teams_map via
+    TeamID, in place. Ids are collected first so the per-row lookups are
+    dict.get whether the maps are dicts or mmap'd SharedMaps.
+    """
+    pids = [_ref_key(row.get(id_key)) if isinstance(row, dict) else None for row in player_rows]
+    tids = [_ref_key(row.get("TeamID")) if isinstance(row, dict) else None for row in player_rows]
+    players = _resolved(players_map, pids)
+    teams = _resolved(teams_map, tids)
+
+    for row, pid, tid in zip(player_rows, pids, tids):
+        if not isinstance(row, dict):
+            continue
+
+        # Player name/position
+        pinfo = players.get(pid) if pid else None
+        if pinfo is not None:
+            row["FullName"] = pinfo["FullName"]
+            row["Position"] = pinfo["Position"]
+        else:
+            row.setdefault("FullName", None)
+            row.setdefault("Position", None)
+
+        # Team name on player row (if TeamID present)
+        if row.get("TeamID") is not None:
+            row["Team"] = teams.get(tid) if tid else None
+        else:
+            row.setdefault("Team", None)
+
+def process_one(sport: str, year: int, yyww: str, raw_path: str, force: bool = False, source: str = "process") -> str:
     """
-    Build processed/{sport}/{year}/{yyww}.json from raw JSON.
-    Returns: 'processed' | 'unchanged' | 'error'
+    Build processed/{sport}/{year}/{yyww}.json (or its record in the
+    season packfile, see seasonpack.py) from raw JSON.
+    Returns: 'processed' | 'identical' | 'unchanged' | 'error'
     Skips only when processed exists AND both raw hash and CSV hash(es) match,
-    unless force=True.
+    unless force=True ('unchanged').
+    When rebuilt output is byte-identical to what is on disk (output_sha256
+    in meta), the processed file is left alone and only meta is refreshed
+    ('identical'). All writes are atomic (temp file + rename, or pack
+    append + index swap).
+    Every 'processed' week is appended to the change log (changes.py),
+    tagged with `source` ('sync' / 'reprocess').
     """
-    if not os.path.isfile(raw_path):
+    if not rawstore.exists(raw_path):
         return "error"
 
-    raw_sha = _sha256_file(raw_path)
-    players_map, players_sha = _load_players_map()
-    teams_map, teams_sha = _load_team_map(sport)
+    with span("process.raw_hash", sport=sport, year=year, yyww=yyww):
+        raw_sha = rawstore.raw_sha(raw_path)
+    with span("process.reference_maps", sport=sport):
+        players_map, players_sha = _load_players_map()
+        teams_map, teams_sha = _load_team_map(sport)
 
-    proc_dir  = os.path.join(settings.DATA_ROOT, "processed", sport, str(year))
-    proc_path = os.path.join(proc_dir, f"{yyww}.json")
-    meta_path = os.path.join(proc_dir, f"{yyww}.meta.json")
-    _ensure_dir(proc_dir)
+    # loose {yyww}.json + .meta.json, or the season's packfile (seasonpack.py)
+    exists = seasonpack.week_stamp(sport, year, yyww) is not None
+    old_meta = seasonpack.load_meta(sport, year, yyww) if exists else None
+    old_meta = old_meta if isinstance(old_meta, dict) else {}
 
     # Skip only if not forcing and meta matches
-    if (not force) and os.path.isfile(proc_path) and os.path.isfile(meta_path):
-        meta = _safe_json_load(meta_path) or {}
-        if (
-            meta.get("source_sha256") == raw_sha and
-            meta.get("players_sha256") == players_sha and
-            meta.get("teams_sha256") == teams_sha
-        ):
+    if (not force) and exists and old_meta:
+        with span("process.meta_check", sport=sport, year=year, yyww=yyww):
+            meta = old_meta
+            fresh = (
+                meta.get("source_sha256") == raw_sha and
+                meta.get("players_sha256") == players_sha and
+                meta.get("teams_sha256") == teams_sha
+            )
+        if fresh:
             return "unchanged"
 
-    raw = _safe_json_load(raw_path)
+    with span("process.json_load", sport=sport, year=year, yyww=yyww):
+        try:
+            raw = jsonio.loads(rawstore.read_bytes(raw_path) or b"null")
+        except Exception:
+            raw = None
     if not isinstance(raw, dict):
         return "error"
 
@@ -282,117 +647,111 @@ def process_one(sport: str, year: int, yyww: str, raw_path: str, force: bool = F
     # --- Enrich TEAM rows with Team name from teams_map via TeamID ---
     team_rows = out[team_key]
     if team_rows and isinstance(team_rows, list):
-        for trow in team_rows:
-            if not isinstance(trow, dict):
-                continue
-            tid_val = trow.get("TeamID")
-            if tid_val is None:
-                trow.setdefault("Team", None)
-                continue
-            tid = str(tid_val).strip()
-            trow["Team"] = teams_map.get(tid)  # could be None if not found
+        with span("process.enrich_teams", sport=sport, year=year, yyww=yyww, rows=len(team_rows)):
+            for trow in team_rows:
+                if not isinstance(trow, dict):
+                    continue
+                tid_val = trow.get("TeamID")
+                if tid_val is None:
+                    trow.setdefault("Team", None)
+                    continue
+                tid = str(tid_val).strip()
+                trow["Team"] = teams_map.get(tid)  # could be None if not found
 
     # --- Enrich PLAYER rows with FullName/Position; also Team from TeamID if present ---
     player_rows = out[player_key]
+    id_key = None
     if player_rows and isinstance(player_rows, list):
-        # choose ID key differently for nfl/cfb (you already asked for NFLPlayerID preference)
-        if sport == "nfl":
-            preferred = ["NFLPlayerID"]
-        else:
-            preferred = ["CollegePlayerID"]
-
-        # detect fallbacks from actual data
-        id_key = None
-        if isinstance(player_rows[0], dict):
-            for k in preferred:
-                if k in player_rows[0]:
-                    id_key = k
-                    break
-            if not id_key:
-                for k in player_rows[0].keys():
-                    kl = str(k).lower()
-                    if kl.endswith("id") and not any(x in kl for x in ["team", "game", "season"]):
-                        id_key = k
-                        break
-        if not id_key:
-            id_key = "ID"  # last resort
-
-        for row in player_rows:
-            if not isinstance(row, dict):
-                continue
-
-            # Player name/position
-            pid_val = row.get(id_key)
-            pid = str(pid_val).strip() if pid_val is not None else None
-            if pid and pid in players_map:
-                row["FullName"] = players_map[pid]["FullName"]
-                row["Position"] = players_map[pid]["Position"]
-            else:
-                row.setdefault("FullName", None)
-                row.setdefault("Position", None)
-
-            # Team name on player row (if TeamID present)
-            tid_val = row.get("TeamID")
-            if tid_val is not None:
-                tid = str(tid_val).strip()
-                row["Team"] = teams_map.get(tid)
-            else:
-                row.setdefault("Team", None)
-
-    # Write processed content
-    try:
-        with open(proc_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
-    except Exception:
-        return "error"
+        with span("process.enrich_players", sport=sport, year=year, yyww=yyww, rows=len(player_rows)):
+            # NFLPlayerID / CollegePlayerID, else first non team/game/season *ID
+            # column, over every row's columns (the key the schema catalog records)
+            id_key = schema.id_key(sport, "player", schema.column_names(player_rows))
+            _enrich_players(player_rows, id_key, players_map, teams_map)
+
+    # Schema catalog of the output (stored in meta, served via the manifest)
+    with span("process.schema", sport=sport, year=year, yyww=yyww):
+        catalog = schema.build(sport, out, id_keys={"player": id_key} if id_key else None)
+
+    # Serialize + hash; only replace the processed file when the bytes differ
+    with span("process.dump", sport=sport, year=year, yyww=yyww) as dsp:
+        try:
+            data = jsonio.dumps(out, indent=True)
+        except Exception:
+            return "error"
+        out_sha = _sha256_bytes(data)
+
+        old_out_sha = old_meta.get("output_sha256")
+        old_body = None
+        if exists and (old_out_sha is None or settings.CHANGES_ROW_DIFFS):
+            old_body = seasonpack.read_week(sport, year, yyww)
+        if old_out_sha is None and old_body is not None:
+            old_out_sha = _sha256_bytes(old_body)   # trees written before output_sha256 existed
+        identical = (old_out_sha == out_sha) and exists
+
+        old_out = None
+        if not identical and settings.CHANGES_ROW_DIFFS and old_body is not None:
+            try:
+                old_out = jsonio.loads(old_body)
+            except Exception:
+                old_out = None
+        dsp.set(bytes=len(data), identical=identical)
 
-    # Write meta (best effort)
     meta = {
         "source_sha256": raw_sha,
         "players_sha256": players_sha,
         "teams_sha256": teams_sha,
         "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
         "source": os.path.relpath(raw_path, settings.DATA_ROOT).replace("\\", "/"),
+        "output_sha256": out_sha,
+        "output_bytes": len(data),
         "enriched": {
             "team_rows": len(team_rows) if isinstance(team_rows, list) else 0,
             "player_rows": len(player_rows) if isinstance(player_rows, list) else 0,
             "player_with_fullname": sum(1 for r in player_rows if isinstance(r, dict) and r.get("FullName")) if isinstance(player_rows, list) else 0,
             "with_team_name_on_team_rows": sum(1 for r in team_rows if isinstance(r, dict) and r.get("Team")) if isinstance(team_rows, list) else 0,
-        }
+        },
+        "schema": catalog,
+        "ref_ids": refdata.week_ids(sport, out, id_key),
     }
-    try:
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(meta, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+    # Body (unless identical) + meta in one write: one append + index swap when packed
+    with span("process.write", sport=sport, year=year, yyww=yyww, identical=identical):
+        try:
+            seasonpack.write_week(sport, year, yyww, None if identical else data, meta)
+        except Exception as e:
+            if not identical:
+                print(f"[PROCESSOR] write failed for {sport}/{year}/{yyww}: {e}")
+                return "error"
+            print(f"[PROCESSOR] meta write failed for {sport}/{year}/{yyww}: {e}")   # best effort, as before
+    if not identical:
+        weekcache.invalidate(sport, year, yyww)
+
+    if identical:
+        return "identical"
+
+    with span("process.changelog", sport=sport, year=year, yyww=yyww):
+        diff = None
+        if isinstance(old_out, dict):
+            diff = changes.diff_rows(old_out, out, {team_key: "TeamID", player_key: id_key})
+        try:
+            changes.record(sport, year, yyww, old_out_sha, out_sha, source=source, diff=diff)
+        except Exception as e:
+            print(f"[PROCESSOR] change log append failed for {sport}/{year}/{yyww}: {e}")
 
+    _update_derived(sport, year, yyww, out, id_key)
     return "processed"
 
 
-# ---------- Write-if-changed for raw ----------
-
-def _write_if_changed(path: str, content_bytes: bytes) -> Tuple[str, Optional[str]]:
-    """
-    Writes content if hash changed.
-    Returns (status, sha256) where status in {'new','updated','unchanged','error'}.
-    """
-    sha_remote = _sha256_bytes(content_bytes)
-    existed = os.path.isfile(path)
-    sha_local = _sha256_file(path) if existed else None
-
-    if sha_local and sha_local == sha_remote:
-        return ("unchanged", sha_remote)
-
-    try:
-        _ensure_dir(os.path.dirname(path))
-        with open(path, "wb") as f:
-            f.write(content_bytes)
-    except Exception:
-        return ("error", None)
-
-    return ("updated" if existed else "new", sha_remote)
-
-
+def _update_derived(sport: str, year: int, yyww: str, out: Dict[str, Any], id_key: Optional[str] = None) -> None:
+    """Refresh per-week derived stages (best effort; readers rebuild stale ones)."""
+    with span("process.derived", sport=sport, year=year, yyww=yyww):
+        try:
+            dvp.update_week(sport, year, yyww, out)
+        except Exception as e:
+            print(f"[PROCESSOR] dvp update failed for {sport}/{year}/{yyww}: {e}")
+        try:
+            projections.update_week(sport, year, yyww, out, id_key=id_key)
+        except Exception as e:
+            print(f"[PROCESSOR] projections update failed for {sport}/{year}/{yyww}: {e}")
 
 
 # app/processor.py (helpers)
@@ -423,57 +782,69 @@ def reprocess_raw(
     sport: str | None = None,    # 'nfl' | 'cfb' | None=both
     year: int | None = None,     # specific year or None=all
     force: bool = True,
+    queue: str | None = None,    # shared work-queue id for multi-worker runs
 ) -> Dict[str, Any]:
     """
     Walks data/raw and re-runs process_one() to generate data/processed.
     If force=True, meta is ignored via 'force' flag (no skip).
-    Returns counts: processed, unchanged, errors.
+    Returns counts: processed (output changed), identical (rebuilt, same
+    bytes, file not rewritten), unchanged (skipped by meta), errors.
+
+    Workers started with the same `queue` id split the weeks between them
+    through workqueue leases (each week processed once); use a new id per
+    run, since weeks a queue has finished are skipped.
     """
     root = data_root or settings.DATA_ROOT
     raw_root = os.path.join(root, "raw")
     processed = 0
+    identical = 0
     unchanged = 0
     errors = 0
 
     sports = [sport] if sport in ("nfl", "cfb") else ["nfl", "cfb"]
+    wq = workqueue.WorkQueue(f"reprocess-{queue}", root=root) if queue else None
 
-    for sp in sports:
-        sp_dir = os.path.join(raw_root, sp)
-        if not os.path.isdir(sp_dir):
-            continue
-
-        for yname in sorted(os.listdir(sp_dir)):
-            if not yname.isdigit():
-                continue
-            y = int(yname)
-            if year is not None and y != year:
+    with trace("reprocess_raw", sport=sport, year=year, force=force, queue=queue), \
+            (wq.worker() if wq else nullcontext()):
+        for sp in sports:
+            sp_dir = os.path.join(raw_root, sp)
+            if not os.path.isdir(sp_dir):
                 continue
 
-            y_dir = os.path.join(sp_dir, yname)
-            if not os.path.isdir(y_dir):
-                continue
-
-            for fname in sorted(os.listdir(y_dir)):
-                if not fname.endswith(".json"):
+            for yname in sorted(os.listdir(sp_dir)):
+                if not yname.isdigit():
                     continue
-                m = re.match(r"^(\d{4})\.json$", fname)
-                if not m:
+                y = int(yname)
+                if year is not None and y != year:
                     continue
-                yyww = m.group(1)
-                raw_path = os.path.join(y_dir, fname)
-
-                st = process_one(sp, y, yyww, raw_path, force=force)
-                if st == "processed":
-                    processed += 1
-                elif st == "unchanged":
-                    unchanged += 1
-                else:
-                    errors += 1
+
+                for yyww, raw_path in rawstore.iter_weeks(raw_root, sp, y):
+                    lease = wq.claim(f"{sp}/{y}/{yyww}") if wq else None
+                    if wq and lease is None:
+                        continue
+                    with span("reprocess.week", sport=sp, year=y, yyww=yyww) as wsp:
+                        st = process_one(sp, y, yyww, raw_path, force=force, source="reprocess")
+                        wsp.set(status=st)
+                    if lease is not None:
+                        lease.complete({"status": st})
+                    if st == "processed":
+                        processed += 1
+                    elif st == "identical":
+                        identical += 1
+                    elif st == "unchanged":
+                        unchanged += 1
+                    else:
+                        errors += 1
+
+        shared_gen = _republish_shared_weeks(processed)
 
     return {
         "processed": processed,
+        "identical": identical,
         "unchanged": unchanged,
         "errors": errors,
+        "shared_generation": shared_gen,
+        "queue": wq.stats() if wq else None,
         "force": force,
         "sport": sport,
         "year": year,
@@ -483,12 +854,127 @@ def reprocess_raw(
 
 # ---------- Run sync (download raw + process) ----------
 
-def run_sync(start_year=None, years_ahead=None, max_week=None, api_base=None, data_root=None, rate_limit_ms=350) -> dict:
+_RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+def _fetch_week(
+    session: "requests.Session",
+    url: str,
+    rate: AdaptiveRate,
+    breaker: CircuitBreaker,
+) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    GET one week from upstream, paced by `rate`.
+    Retries transport errors, 429 and 5xx (honouring Retry-After); feeds
+    every attempt into the rate controller, and the week's final outcome
+    into the circuit breaker (one failure per week, however many retries).
+    Returns (body, None) on 200, else (None, reason).
+    """
+    import requests  # only sync needs it; keeps app import light
+
+    reason = None
+    failed = False   # a retry failed in a way that counts against the breaker (not a bare 429)
+    for attempt in range(3):
+        if breaker.open:
+            return None, "circuit_open"
+        rate.wait()
+        t0 = time.monotonic()
+        try:
+            with span("sync.fetch", url=url, attempt=attempt) as sp:
+                r = session.get(
+                    url,
+                    headers={"Accept": "application/json"},
+                    timeout=(settings.SYNC_CONNECT_TIMEOUT_S, settings.SYNC_READ_TIMEOUT_S),
+                )
+                sp.set(status=r.status_code, bytes=len(r.content))
+        except requests.Timeout:
+            reason, failed = "timeout", True
+            rate.on_throttle()
+            continue
+        except requests.RequestException as e:
+            reason, failed = f"connection_error:{type(e).__name__}", True
+            rate.on_throttle()
+            continue
+
+        latency = time.monotonic() - t0
+        if r.status_code == 200:
+            breaker.record_success()
+            rate.on_success(latency)
+            return r.content, None
+
+        reason = f"http_{r.status_code}"
+        if r.status_code in _RETRYABLE_STATUS:
+            failed = failed or r.status_code != 429
+            rate.on_throttle(parse_retry_after(r.headers.get("Retry-After")))
+            continue
+
+        # 404 and friends: upstream is healthy, the week just isn't there
+        breaker.record_success()
+        rate.on_success(latency)
+        return None, reason
+
+    if failed:
+        breaker.record_failure(reason)
+    return None, reason
+
+
+def _sync_week(
+    sport: str,
+    year: int,
+    week: int,
+    api: str,
+    root: str,
+    session: "requests.Session",
+    rate: AdaptiveRate,
+    breaker: CircuitBreaker,
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
-    Downloads raw JSONs into {DATA_ROOT}/raw/{sport}/{year}/{yyww}.json
+    Fetch + store + process a single week.
+    Returns (raw_status, processed_status, skip_reason); raw_status is None
+    when nothing was fetched, in which case skip_reason says why.
+    """
+    yyww = _yyww(year, week)
+
+    raw_dir = os.path.join(root, "raw", sport, str(year))
+    _ensure_dir(raw_dir)
+    raw_path = os.path.join(raw_dir, f"{yyww}.json")
+
+    url = f"{api}/{sport}/{year}/{yyww}/WEEK/2"
+
+    body, reason = _fetch_week(session, url, rate, breaker)
+    if body is None:
+        return None, None, reason
+
+    with span("sync.write_raw", sport=sport, year=year, yyww=yyww):
+        status, sha = rawstore.store(raw_path, body)
+    if status not in ("new", "updated", "unchanged"):
+        return status, None, "write_error"
+
+    with span("sync.process", sport=sport, year=year, yyww=yyww):
+        pst = process_one(sport, year, yyww, raw_path, source="sync")
+    return status, pst, None
+
+
+def run_sync(start_year=None, years_ahead=None, max_week=None, api_base=None, data_root=None, rate_limit_ms=350, fresh=False, distributed=False) -> dict:
+    """
+    Downloads raw JSONs into the content-addressed store under {DATA_ROOT}/raw
+    (see rawstore: per-week {yyww}.ref pointer -> gzip blob).
     Uses hash to avoid rewriting unchanged files.
     Always attempts to process into {DATA_ROOT}/processed/... afterwards.
-    Returns a summary dict.
+    rate_limit_ms is the starting delay between requests; pacing then adapts
+    to upstream latency / 429 / 5xx, and the run aborts if the circuit
+    breaker opens.
+
+    The (sport, year, week) items are checkpointed in a sync plan (see
+    syncplan): an interrupted or cancelled run with the same parameters
+    resumes with the items not yet done; fresh=True starts a new plan.
+    Raises syncplan.SyncBusy if another run is in progress. Returns a
+    summary dict (incl. skipped URLs + reasons) covering every segment of
+    the plan.
+
+    distributed=True lets several workers sharing DATA_ROOT run the same
+    plan at once: each week is claimed through a workqueue lease, so no
+    week is fetched twice (short of an expired lease being taken over).
+    Pacing is per worker, so N workers put N times the load on upstream.
     """
     SPORTS = ["nfl", "cfb"]
 
@@ -508,78 +994,96 @@ def run_sync(start_year=None, years_ahead=None, max_week=None, api_base=None, da
 
     end_year = cy + ahead
 
-    # reset caches per run
-    global _players_cache, _players_sha, _team_maps, _team_shas
-    _players_cache, _players_sha = None, None
-    _team_maps = {"nfl": None, "cfb": None}   # type: ignore
-    _team_shas = {"nfl": None, "cfb": None}
-
-    new = updated = unchanged = 0
-    proc_new = proc_unchanged = proc_err = 0
-    touched_endpoints = []
-
-    for sport in SPORTS:
-        for year in range(sy, end_year + 1):
-            start_wk = _start_week_for(sport)
-            for week in range(start_wk, mw + 1):
+    items = [
+        (sport, year, week)
+        for sport in SPORTS
+        for year in range(sy, end_year + 1)
+        for week in range(_start_week_for(sport), mw + 1)
+    ]
+    plan, resumed = syncplan.open_plan(
+        {"api": api, "start_year": sy, "end_year": end_year, "max_week": mw}, items, fresh=fresh, root=root,
+    )
+
+    # pick up edited reference CSVs (targeted reprocess) instead of dropping
+    # and re-hashing every map each run
+    reload_reference_maps()
+
+    proc_new = 0
+    aborted = None
+    cancelled = False
+
+    rate = AdaptiveRate(
+        initial_delay_s=rate_limit_ms / 1000.0,
+        min_delay_s=settings.SYNC_MIN_DELAY_MS / 1000.0,
+        max_delay_s=settings.SYNC_MAX_DELAY_MS / 1000.0,
+        slow_s=settings.SYNC_SLOW_MS / 1000.0,
+    )
+    breaker = CircuitBreaker(threshold=settings.SYNC_BREAKER_THRESHOLD)
+    queue = workqueue.WorkQueue(syncplan.queue_name(plan), root=root) if distributed else None
+    import requests
+    session = requests.Session()
+
+    with syncplan.segment(plan, root=root, shared=distributed) as seg, \
+            (queue.worker() if queue else nullcontext()), \
+            trace("run_sync", start_year=sy, end_year=end_year, max_week=mw, plan=plan["id"], segment=seg.number) as run_span:
+        todo = syncplan.pending(plan, root=root)
+        if resumed:
+            print(f"[SYNC] resuming plan {plan['id']} (segment {seg.number}): {len(todo)}/{len(items)} items left")
+        try:
+            for sport, year, week in todo:
                 yyww = _yyww(year, week)
-
-                raw_dir = os.path.join(root, "raw", sport, str(year))
-                _ensure_dir(raw_dir)
-                raw_path = os.path.join(raw_dir, f"{yyww}.json")
-
-                url = f"{api}/{sport}/{year}/{yyww}/WEEK/2"
-
-                body = None
-                for attempt in range(3):
-                    try:
-                        r = requests.get(url, headers={"Accept": "application/json"}, timeout=20)
-                        if r.status_code == 200:
-                            body = r.content
-                            break
-                        else:
-                            body = None
-                            break
-                    except requests.RequestException:
-                        time.sleep(0.7 * (2 ** attempt))
-                        continue
-
-                if body is None:
-                    continue
-
-                status, sha = _write_if_changed(raw_path, body)
-                if status == "new":
-                    new += 1
-                    touched_endpoints.append(f"/{sport}/{year}/{yyww}/WEEK/2")
-                elif status == "updated":
-                    updated += 1
-                    touched_endpoints.append(f"/{sport}/{year}/{yyww}/WEEK/2")
-                elif status == "unchanged":
-                    unchanged += 1
-                else:
-                    continue
-
-                pst = process_one(sport, year, yyww, raw_path)
-                if pst == "processed":
+                if seg.cancelled():
+                    cancelled = True
+                    print(f"[SYNC] cancelled before {sport} {year} {yyww}")
+                    break
+                if breaker.open:
+                    aborted = f"circuit breaker open after {breaker.failures} consecutive failures ({breaker.last_reason}) at {sport} {year} {yyww}"
+                    print(f"[SYNC] aborting: {aborted}")
+                    break
+                lease = None
+                if queue is not None:
+                    lease = queue.claim(syncplan.item_key(sport, year, yyww))
+                    if lease is None:
+                        continue   # done or being fetched by another worker
+
+                with span("sync.url", sport=sport, year=year, yyww=yyww) as sp:
+                    status, pst, reason = _sync_week(sport, year, week, api, root, session, rate, breaker)
+                    sp.set(raw=status, processed=pst, skipped=reason, delay_ms=round(rate.delay_s * 1000.0, 1))
+                finished = seg.record(sport, year, yyww, status, pst, reason)
+                if lease is not None:
+                    if not finished:
+                        lease.release()   # let a later pass retry it
+                    else:
+                        lease.complete({"raw": status, "processed": pst, "reason": reason})
+                if status in ("new", "updated", "unchanged") and pst == "processed":
                     proc_new += 1
-                elif pst == "unchanged":
-                    proc_unchanged += 1
-                else:
-                    proc_err += 1
-
-                time.sleep(rate_limit_ms / 1000.0)
-
-    stamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    return {
-        "stamp": stamp,
-        "new": new,
-        "updated": updated,
-        "unchanged": unchanged,
-        "processed_new": proc_new,
-        "processed_unchanged": proc_unchanged,
-        "processed_error": proc_err,
-        "updated_endpoints": touched_endpoints,
+            if breaker.open and not aborted:
+                aborted = f"circuit breaker open after {breaker.failures} consecutive failures ({breaker.last_reason})"
+        finally:
+            # also on exceptions, so an interrupted segment says how far it got
+            seg.outcome = {
+                "status": "cancelled" if cancelled else ("aborted" if aborted else "finished"),
+                "abort_reason": aborted,
+                "rate": rate.stats(),
+                "circuit": breaker.stats(),
+            }
+        run_span.set(items=seg.recorded, cancelled=cancelled, aborted=bool(aborted))
+        shared_gen = _republish_shared_weeks(proc_new)
+    session.close()
+
+    out = syncplan.summary(plan, root=root)
+    out.update({
+        "stamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "aborted": aborted is not None,
+        "abort_reason": aborted,
+        "cancelled": cancelled,
+        "resumed": resumed,
+        "queue": queue.stats() if queue else None,
+        "rate": rate.stats(),
+        "circuit": breaker.stats(),
+        "shared_generation": shared_gen,
         "start_year": sy,
         "end_year": end_year,
         "max_week": mw,
-    }
+    })
+    return out
@@ -0,0 +1,343 @@
+# app/projections.py
+import os, threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import settings
+from .util import ensure_dir
+from . import bundle, scoring, schema, jsonio, seasonpack
+
+
+# Rolling-form projections for every player in a season.
+#
+# Each processed week is reduced once to a columnar extract
+#   {DATA_ROOT}/derived/proj/{sport}/{year}/{yyww}.npz
+#     ids (str), vals (float64, rows x METRICS), name / pos / team (str)
+# Team defenses ride along as pseudo-players "DEF:{TeamID}" (position DEF)
+# whose Calc_TotalPoints is the team row's Calc_TotalTeamScore.
+# written by process_one when the week changes (or rebuilt on read when
+# missing / older than the processed file). The season is then a dense
+# players x weeks x metrics cube, and every window is computed with array
+# ops over the whole cube:
+#   l3 / l5   mean of the player's last 3 / 5 games
+#   season    mean of all games so far
+#   ewma      exponentially weighted mean over games (PROJ_EWMA_ALPHA)
+# Projections for week w use only games before w; the slot after the last
+# processed week is "next week".
+
+WINDOWS = ("l3", "l5", "season", "ewma")
+EXTRACT_FORMAT = 2  # bump when extract_week changes shape; older extracts are rebuilt
+
+_lock = threading.Lock()
+_seasons: Dict[Tuple[str, int], Tuple[Tuple, "Season"]] = {}
+
+
+def metrics() -> List[str]:
+    return [m.strip() for m in settings.PROJ_METRICS.split(",") if m.strip()]
+
+
+def week_path(sport: str, year: int, yyww: str) -> str:
+    return os.path.join(settings.DATA_ROOT, "derived", "proj", sport, str(year), f"{yyww}.npz")
+
+
+# ---------- Per-week extract ----------
+
+def _float(v: Any) -> float:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if f != f else f
+
+def extract_week(sport: str, week_doc: Dict[str, Any], id_key: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Columnar per-player values for one week (rows for the same player are
+    summed). id_key comes from the week's schema catalog when known.
+    """
+    rows = [r for r in (week_doc.get(bundle.ARRAYS[sport]["player"]) or []) if isinstance(r, dict)]
+    teams = [t for t in (week_doc.get(bundle.ARRAYS[sport]["team"]) or []) if isinstance(t, dict)]
+    mets = metrics()
+    id_key = id_key or schema.id_key(sport, "player", schema.column_names(rows))
+    i_total = mets.index("Calc_TotalPoints") if "Calc_TotalPoints" in mets else -1
+
+    ids: List[str] = []
+    meta: List[Tuple[str, str, str]] = []
+    vals = np.zeros((len(rows) + len(teams), len(mets)), dtype=np.float64)
+    n = 0
+    for r in rows:
+        pid = r.get(id_key)
+        if pid is None or str(pid).strip() == "":
+            continue
+        s = scoring.score_player(dict(r))
+        vals[n] = [_float(s.get(m)) for m in mets]
+        ids.append(str(pid).strip())
+        meta.append((str(r.get("FullName") or ""), str(r.get("Position") or ""), str(r.get("Team") or "")))
+        n += 1
+    for t in teams:
+        if t.get("TeamID") is None:
+            continue
+        if i_total >= 0:
+            vals[n, i_total] = _float(scoring.score_team(dict(t))["Calc_TotalTeamScore"])
+        ids.append(f"DEF:{t['TeamID']}")
+        abbr = str(t.get("Team") or "")
+        meta.append((f"{abbr} DEF" if abbr else "", "DEF", abbr))
+        n += 1
+    vals = vals[:n]
+
+    ids_a = np.array(ids, dtype=str)
+    uniq, first, inv = np.unique(ids_a, return_index=True, return_inverse=True)
+    summed = np.zeros((len(uniq), len(mets)), dtype=np.float64)
+    np.add.at(summed, inv, vals)
+    meta_a = np.array(meta, dtype=str).reshape(-1, 3)
+    return {
+        "ids": uniq,
+        "vals": summed,
+        "name": meta_a[first, 0] if n else np.array([], dtype=str),
+        "pos": meta_a[first, 1] if n else np.array([], dtype=str),
+        "team": meta_a[first, 2] if n else np.array([], dtype=str),
+        "metrics": np.array(mets, dtype=str),
+        "format": np.array(EXTRACT_FORMAT),
+    }
+
+
+def update_week(sport: str, year: int, yyww: str, week_doc: Dict[str, Any], id_key: Optional[str] = None) -> None:
+    """Write one week's extract (called by process_one when the week changes)."""
+    ext = extract_week(sport, week_doc, id_key)
+    path = week_path(sport, year, yyww)
+    ensure_dir(os.path.dirname(path))
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    try:
+        np.savez(tmp, **ext)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _load_week(sport: str, year: int, yyww: str) -> Optional[Dict[str, np.ndarray]]:
+    path = week_path(sport, year, yyww)
+    src_m = seasonpack.week_mtime(sport, year, yyww)
+    if src_m is None:
+        return None
+    try:
+        if os.stat(path).st_mtime_ns >= src_m:
+            with np.load(path, allow_pickle=False) as z:
+                ext = {k: z[k] for k in z.files}
+            if list(ext.get("metrics", [])) == metrics() and int(ext.get("format", 0)) == EXTRACT_FORMAT:
+                return ext
+    except (OSError, ValueError):
+        pass
+    body = bundle.week_body(sport, year, yyww)
+    if body is None:
+        return None
+    try:
+        doc = jsonio.loads(body)
+    except Exception:
+        return None
+    update_week(sport, year, yyww, doc if isinstance(doc, dict) else {}, schema.stored_id_key(sport, year, yyww, "player"))
+    with np.load(path, allow_pickle=False) as z:
+        return {k: z[k] for k in z.files}
+
+
+# ---------- Season cube + rolling windows ----------
+
+def rolling(
+    week_ids: Sequence[np.ndarray],
+    week_vals: Sequence[np.ndarray],
+    alpha: float,
+    windows: Sequence[int] = (3, 5),
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Vectorized rolling stats over a season.
+    Returns (ids, games_before, {window: cube}) where games_before and every
+    cube are indexed [player, slot]; slot w = entering the w-th listed week
+    (slot len(weeks) = next week). Cubes are [player, slot, metric], NaN for
+    players with no games yet.
+    """
+    W = len(week_ids)
+    M = week_vals[0].shape[1] if W else 0
+    ids = np.unique(np.concatenate(week_ids)) if W else np.array([], dtype=str)
+    P = len(ids)
+
+    X = np.zeros((P, W, M), dtype=np.float64)
+    played = np.zeros((P, W), dtype=bool)
+    for w in range(W):
+        idx = np.searchsorted(ids, week_ids[w])
+        X[idx, w, :] = week_vals[w]
+        played[idx, w] = True
+
+    # games played before each slot, and game-indexed cumulative sums:
+    # C[p, g] = sum of the player's first g games
+    cnt = played.cumsum(axis=1)
+    G = np.zeros((P, W + 1), dtype=np.int64)
+    G[:, 1:] = cnt
+    C = np.zeros((P, W + 1, M), dtype=np.float64)
+    pi, wi = np.nonzero(played)
+    C[pi, cnt[pi, wi], :] = X.cumsum(axis=1)[pi, wi, :]
+
+    def _csum(g: np.ndarray) -> np.ndarray:
+        return np.take_along_axis(C, g[:, :, None], axis=1)
+
+    out: Dict[str, np.ndarray] = {}
+    total = _csum(G)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for k in windows:
+            lo = np.maximum(G - k, 0)
+            n = np.minimum(G, k)[:, :, None]
+            out[f"l{k}"] = np.where(n > 0, (total - _csum(lo)) / n, np.nan)
+        out["season"] = np.where(G[:, :, None] > 0, total / G[:, :, None], np.nan)
+
+        # EWMA over games (adjusted weights), carried across byes; the time
+        # axis is short (<= ~21 weeks) so it steps over weeks, vectorized
+        # across all players and metrics at once
+        decay = 1.0 - alpha
+        num = np.zeros((P, M), dtype=np.float64)
+        den = np.zeros((P, 1), dtype=np.float64)
+        ew = np.full((P, W + 1, M), np.nan, dtype=np.float64)
+        for w in range(W):
+            ew[:, w, :] = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+            m = played[:, w][:, None]
+            num = np.where(m, X[:, w, :] + decay * num, num)
+            den = np.where(m, 1.0 + decay * den, den)
+        ew[:, W, :] = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+        out["ewma"] = ew
+    return ids, G, out
+
+
+class Season:
+    """
+    One computed season. `history` is [player, week, metric] with NaN for
+    weeks a player didn't play (the simulator and lineup builder sample /
+    rank from it); `cubes` hold the rolling windows; `by_pos` maps each
+    position to its player indices (the lineup builder's candidate pools).
+    """
+    __slots__ = ("weeks", "ids", "games", "cubes", "history", "name", "pos", "team", "metrics", "by_pos")
+
+    def __init__(self, weeks, ids, games, cubes, history, name, pos, team, metrics):
+        self.weeks = weeks
+        self.ids = ids
+        self.games = games
+        self.cubes = cubes
+        self.history = history
+        self.name = name
+        self.pos = pos
+        self.team = team
+        self.metrics = metrics
+        self.by_pos: Dict[str, np.ndarray] = {}
+        for i, p in enumerate(pos):
+            self.by_pos.setdefault(p, []).append(i)
+        self.by_pos = {p: np.array(ix, dtype=np.int64) for p, ix in self.by_pos.items()}
+
+
+def _stamp(sport: str, year: int, weeks: List[Tuple[int, str]]) -> Tuple:
+    out = []
+    for _, yyww in weeks:
+        try:
+            out.append(os.stat(week_path(sport, year, yyww)).st_mtime_ns)
+        except OSError:
+            out.append(None)
+        out.append(seasonpack.week_mtime(sport, year, yyww))
+    return tuple(w for _, w in weeks), tuple(out), settings.PROJ_METRICS, settings.PROJ_EWMA_ALPHA
+
+
+def season(sport: str, year: int) -> Optional[Season]:
+    """Computed season (cached per worker until a week's extract or output changes)."""
+    weeks = bundle.season_weeks(sport, year)
+    key = (sport, int(year))
+    stamp = _stamp(sport, year, weeks)
+    with _lock:
+        hit = _seasons.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+
+    exts, used = [], []
+    for wk in weeks:
+        e = _load_week(sport, year, wk[1])
+        if e is not None:
+            exts.append(e)
+            used.append(wk)
+    if not exts:
+        return None
+
+    ids, games, cubes = rolling([e["ids"] for e in exts], [e["vals"] for e in exts], settings.PROJ_EWMA_ALPHA)
+
+    # per-week history + latest known name / position / team per player
+    history = np.full((len(ids), len(exts), len(metrics())), np.nan, dtype=np.float64)
+    name = np.full(len(ids), "", dtype=object)
+    pos = np.full(len(ids), "", dtype=object)
+    team = np.full(len(ids), "", dtype=object)
+    for w, e in enumerate(exts):
+        idx = np.searchsorted(ids, e["ids"])
+        history[idx, w, :] = e["vals"]
+        name[idx], pos[idx], team[idx] = e["name"], e["pos"], e["team"]
+
+    s = Season(used, ids, games, cubes, history, name, pos, team, metrics())
+    with _lock:
+        _seasons[key] = (_stamp(sport, year, weeks), s)
+    return s
+
+
+def slot_for(s: Season, week: Optional[int]) -> Tuple[int, int]:
+    """(slot, week): the first listed week >= `week`; None or past the end = next week."""
+    week_nums = [w for w, _ in s.weeks]
+    if week is None:
+        return len(week_nums), week_nums[-1] + 1
+    return next((i for i, w in enumerate(week_nums) if w >= week), len(week_nums)), week
+
+
+def week_table(
+    sport: str,
+    year: int,
+    week: Optional[int] = None,
+    metric_filter: Optional[Sequence[str]] = None,
+    window_filter: Optional[Sequence[str]] = None,
+    positions: Optional[Sequence[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Compact {columns, rows} of projected_{metric}_{window} entering `week`
+    (default: the week after the last processed one), for every player with
+    at least one earlier game.
+    """
+    s = season(sport, year)
+    if s is None:
+        return None
+    week_nums = [w for w, _ in s.weeks]
+    slot, week = slot_for(s, week)
+
+    mets = [m for m in s.metrics if not metric_filter or m in metric_filter]
+    wins = [w for w in WINDOWS if not window_filter or w in window_filter]
+    mi = [s.metrics.index(m) for m in mets]
+
+    games = s.games[:, slot]
+    keep = games > 0
+    if positions:
+        keep &= np.isin(s.pos.astype(str), list(positions))
+    rows_idx = np.nonzero(keep)[0]
+
+    columns = ["PlayerID", "FullName", "Position", "Team", "Games"]
+    block = []
+    for m_i, m in zip(mi, mets):
+        for win in wins:
+            columns.append(f"projected_{m}_{win}")
+            block.append(np.round(s.cubes[win][rows_idx, slot, m_i], 2))
+    mat = np.stack(block, axis=1) if block else np.zeros((len(rows_idx), 0))
+
+    rows = []
+    for j, p in enumerate(rows_idx):
+        rows.append(
+            [str(s.ids[p]), s.name[p] or None, s.pos[p] or None, s.team[p] or None, int(games[p])]
+            + [None if np.isnan(v) else float(v) for v in mat[j]]
+        )
+    return {
+        "sport": sport,
+        "year": int(year),
+        "week": int(week),
+        "based_on_weeks": week_nums[:slot],
+        "ewma_alpha": settings.PROJ_EWMA_ALPHA,
+        "columns": columns,
+        "rows": rows,
+    }
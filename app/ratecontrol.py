@@ -0,0 +1,123 @@
+# app/ratecontrol.py
+import time
+from typing import Any, Dict, Optional
+from email.utils import parsedate_to_datetime
+
+
+# ---------- Adaptive pacing (AIMD) ----------
+
+class AdaptiveRate:
+    """
+    Paces upstream requests with additive-increase / multiplicative-decrease.
+
+    - healthy response (fast 2xx/404)  -> rate += step          (speed up slowly)
+    - slow response (> slow_s)         -> rate *= slow_factor   (ease off)
+    - 429 / 5xx / timeout              -> rate *= backoff       (back off hard)
+    - Retry-After                      -> no request before that time
+
+    rate is requests/second; wait() sleeps until the next slot.
+    """
+
+    def __init__(
+        self,
+        initial_delay_s: float = 0.35,
+        min_delay_s: float = 0.05,
+        max_delay_s: float = 30.0,
+        step: float = 0.25,
+        backoff: float = 0.5,
+        slow_s: float = 3.0,
+        slow_factor: float = 0.8,
+    ):
+        self.min_rate = 1.0 / max_delay_s
+        self.max_rate = 1.0 / max(min_delay_s, 0.001)
+        self.rate = self._clamp(1.0 / max(initial_delay_s, 0.001))
+        self.step = step
+        self.backoff = backoff
+        self.slow_s = slow_s
+        self.slow_factor = slow_factor
+        self._next_at = 0.0
+        self.slept_s = 0.0
+        self.throttled = 0
+
+    def _clamp(self, r: float) -> float:
+        return max(self.min_rate, min(self.max_rate, r))
+
+    @property
+    def delay_s(self) -> float:
+        return 1.0 / self.rate
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        if self._next_at > now:
+            d = self._next_at - now
+            time.sleep(d)
+            self.slept_s += d
+            now = self._next_at
+        self._next_at = now + self.delay_s
+
+    def on_success(self, latency_s: float) -> None:
+        if latency_s > self.slow_s:
+            self.rate = self._clamp(self.rate * self.slow_factor)
+        else:
+            self.rate = self._clamp(self.rate + self.step)
+
+    def on_throttle(self, retry_after_s: Optional[float] = None) -> None:
+        self.throttled += 1
+        self.rate = self._clamp(self.rate * self.backoff)
+        if retry_after_s:
+            self._next_at = max(self._next_at, time.monotonic() + retry_after_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delay_ms": round(self.delay_s * 1000.0, 1),
+            "slept_s": round(self.slept_s, 2),
+            "throttled": self.throttled,
+        }
+
+
+# ---------- Circuit breaker ----------
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive upstream failures (timeouts,
+    connection errors, 5xx), counted once per week rather than per retry.
+    A sync run checks `.open` and stops instead of grinding through the
+    remaining weeks.
+    """
+
+    def __init__(self, threshold: int = 5):
+        self.threshold = max(1, int(threshold))
+        self.failures = 0
+        self.open = False
+        self.last_reason: Optional[str] = None
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self, reason: str) -> None:
+        self.failures += 1
+        self.last_reason = reason
+        if self.failures >= self.threshold:
+            self.open = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": self.open,
+            "consecutive_failures": self.failures,
+            "last_reason": self.last_reason,
+        }
+
+
+def parse_retry_after(value: Optional[str], cap_s: float = 120.0) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date), capped; None if absent/bad."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            secs = parsedate_to_datetime(value).timestamp() - time.time()
+        except Exception:
+            return None
+    return max(0.0, min(cap_s, secs))
@@ -0,0 +1,214 @@
+# app/rawstore.py
+import os, gzip, hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .util import atomic_write
+from . import jsonio
+
+
+# Content-addressed raw archive.
+#
+#   raw/_blobs/{sha[:2]}/{sha}.json.gz      gzip'd upstream payload, stored once
+#   raw/{sport}/{year}/{yyww}.ref           {"sha256", "size", "codec", "stored_at"}
+#
+# Identical payloads (e.g. empty off-season weeks) share one blob. Older
+# trees with plain raw/{sport}/{year}/{yyww}.json are still read, and are
+# replaced by a pointer the next time that week is stored (or via migrate()).
+#
+# Callers keep passing the legacy week path (.../{yyww}.json); everything
+# here resolves the sibling .ref first.
+
+BLOB_DIR = "_blobs"
+CODEC = "gzip"
+
+
+def _sha256_bytes(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+
+def _raw_root_of(week_path: str) -> str:
+    # .../raw/{sport}/{year}/{yyww}.json -> .../raw
+    return os.path.dirname(os.path.dirname(os.path.dirname(week_path)))
+
+
+def ref_path(week_path: str) -> str:
+    base, _ = os.path.splitext(week_path)
+    return base + ".ref"
+
+
+def blob_path(raw_root: str, sha: str) -> str:
+    return os.path.join(raw_root, BLOB_DIR, sha[:2], f"{sha}.json.gz")
+
+
+def week_path(root: str, sport: str, year: int, yyww: str) -> str:
+    """Canonical (legacy-shaped) week path under {root}/raw."""
+    return os.path.join(root, "raw", sport, str(year), f"{yyww}.json")
+
+
+def read_ref(week_path: str) -> Optional[Dict[str, Any]]:
+    ref = jsonio.load_file(ref_path(week_path))
+    return ref if isinstance(ref, dict) and ref.get("sha256") else None
+
+
+def exists(week_path: str) -> bool:
+    return os.path.isfile(ref_path(week_path)) or os.path.isfile(week_path)
+
+
+def raw_sha(week_path: str) -> Optional[str]:
+    """SHA-256 of the raw payload; free when a pointer exists (no re-hash)."""
+    ref = read_ref(week_path)
+    if ref:
+        return ref["sha256"]
+    try:
+        h = hashlib.sha256()
+        with open(week_path, "rb", buffering=1024 * 1024) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+    except Exception:
+        return None
+
+
+def read_bytes(week_path: str) -> Optional[bytes]:
+    """Decompressed raw payload for a week, or None."""
+    ref = read_ref(week_path)
+    if ref:
+        try:
+            with open(blob_path(_raw_root_of(week_path), ref["sha256"]), "rb") as f:
+                return gzip.decompress(f.read())
+        except Exception:
+            return None
+    try:
+        with open(week_path, "rb") as f:
+            return f.read()
+    except Exception:
+        return None
+
+
+def compressed_blob(week_path: str) -> Optional[str]:
+    """Path of the gzip blob backing a week (for serving with Content-Encoding: gzip)."""
+    ref = read_ref(week_path)
+    if not ref:
+        return None
+    p = blob_path(_raw_root_of(week_path), ref["sha256"])
+    return p if os.path.isfile(p) else None
+
+
+def store(week_path: str, content_bytes: bytes) -> Tuple[str, Optional[str]]:
+    """
+    Store a week's payload. Returns (status, sha256): 'new' (no earlier
+    payload), 'updated' (payload changed), 'unchanged' (same bytes as
+    before, including a legacy file migrated to a pointer) or 'error'
+    (nothing could be written; sha256 is None).
+    """
+    sha = _sha256_bytes(content_bytes)
+    old_ref = read_ref(week_path)
+    legacy = os.path.isfile(week_path)
+    old_sha = old_ref["sha256"] if old_ref else (raw_sha(week_path) if legacy else None)
+    raw_root = _raw_root_of(week_path)
+
+    if old_ref and old_sha == sha and os.path.isfile(blob_path(raw_root, sha)):
+        return ("unchanged", sha)
+
+    try:
+        bp = blob_path(raw_root, sha)
+        if not os.path.isfile(bp):
+            atomic_write(bp, gzip.compress(content_bytes, compresslevel=6, mtime=0))
+        ref = {
+            "sha256": sha,
+            "size": len(content_bytes),
+            "codec": CODEC,
+            "stored_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        }
+        atomic_write(ref_path(week_path), jsonio.dumps(ref))
+        if legacy:
+            os.remove(week_path)
+    except Exception:
+        return ("error", None)
+
+    if old_sha == sha:
+        return ("unchanged", sha)   # legacy file migrated or lost blob rewritten, payload same
+    return ("updated" if old_sha else "new", sha)
+
+
+def iter_weeks(raw_root: str, sport: str, year: int) -> Iterator[Tuple[str, str]]:
+    """Yield (yyww, week_path) for every stored week (pointer or legacy file), sorted."""
+    y_dir = os.path.join(raw_root, sport, str(year))
+    if not os.path.isdir(y_dir):
+        return
+    seen = set()
+    for fname in os.listdir(y_dir):
+        base, ext = os.path.splitext(fname)
+        if ext not in (".ref", ".json") or len(base) != 4 or not base.isdigit():
+            continue
+        seen.add(base)
+    for yyww in sorted(seen):
+        yield yyww, os.path.join(y_dir, f"{yyww}.json")
+
+
+def migrate(root: str) -> Dict[str, int]:
+    """Move legacy plain raw files into the blob store."""
+    raw_root = os.path.join(root, "raw")
+    moved = errors = 0
+    for sport in ("nfl", "cfb"):
+        sp_dir = os.path.join(raw_root, sport)
+        if not os.path.isdir(sp_dir):
+            continue
+        for yname in sorted(os.listdir(sp_dir)):
+            if not yname.isdigit():
+                continue
+            for yyww, wp in iter_weeks(raw_root, sport, int(yname)):
+                if not os.path.isfile(wp) or read_ref(wp):
+                    continue
+                try:
+                    with open(wp, "rb") as f:
+                        body = f.read()
+                except Exception:
+                    errors += 1
+                    continue
+                st, _ = store(wp, body)
+                if st == "error":
+                    errors += 1
+                else:
+                    moved += 1
+    return {"migrated": moved, "errors": errors}
+
+
+def gc(root: str) -> Dict[str, int]:
+    """Delete blobs no week pointer references any more (run while no sync is in progress)."""
+    raw_root = os.path.join(root, "raw")
+    live = set()
+    for sport in ("nfl", "cfb"):
+        sp_dir = os.path.join(raw_root, sport)
+        if not os.path.isdir(sp_dir):
+            continue
+        for yname in os.listdir(sp_dir):
+            if not yname.isdigit():
+                continue
+            for _, wp in iter_weeks(raw_root, sport, int(yname)):
+                ref = read_ref(wp)
+                if ref:
+                    live.add(ref["sha256"])
+
+    removed = kept = freed = 0
+    bdir = os.path.join(raw_root, BLOB_DIR)
+    if os.path.isdir(bdir):
+        for sub in os.listdir(bdir):
+            sd = os.path.join(bdir, sub)
+            if not os.path.isdir(sd):
+                continue
+            for fname in os.listdir(sd):
+                if not fname.endswith(".json.gz"):
+                    continue
+                if fname[:-8] in live:
+                    kept += 1
+                    continue
+                p = os.path.join(sd, fname)
+                try:
+                    freed += os.path.getsize(p)
+                    os.remove(p)
+                    removed += 1
+                except OSError:
+                    pass
+    return {"blobs_kept": kept, "blobs_removed": removed, "bytes_freed": freed}
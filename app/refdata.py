@@ -0,0 +1,218 @@
+# app/refdata.py
+import os, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .config import settings
+from .util import ensure_dir, atomic_write
+from . import bundle, schema, jsonio, seasonpack
+
+try:
+    import fcntl  # POSIX only
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+# Reference data (players CSV, team CSVs) hot reload support:
+#
+#   - which player / team IDs each processed week contains ("ref_ids" in
+#     the week's meta, written by process_one; older weeks are backfilled
+#     from the processed file), inverted into an ID -> weeks index;
+#   - diffing an old and a new reference map into changed IDs;
+#   - reload state under {DATA_ROOT}/cache/refmaps/ (which CSV sha has
+#     been handled, the last report) and the flock that keeps workers from
+#     reprocessing the same change twice;
+#   - the optional watcher thread (REF_WATCH_S > 0).
+#
+# processor.reload_reference_maps() ties these together.
+
+KINDS: Tuple[Tuple[str, Optional[str]], ...] = (("players", None), ("teams_nfl", "nfl"), ("teams_cfb", "cfb"))
+
+_lock = threading.Lock()
+_indexes: Dict[str, Tuple[Tuple, Dict[str, Dict[str, List[Tuple[int, str]]]]]] = {}
+_watcher: Optional[threading.Thread] = None
+
+
+# ---------- Week IDs ----------
+
+def week_ids(sport: str, doc: Dict[str, Any], player_id_key: Optional[str] = None) -> Dict[str, List[str]]:
+    """Sorted player IDs (by the week's ID key) and TeamIDs present in a processed document."""
+    arrays = bundle.ARRAYS[sport]
+    players, teams = set(), set()
+    for row in doc.get(arrays["team"]) or []:
+        if isinstance(row, dict) and row.get("TeamID") is not None:
+            teams.add(str(row["TeamID"]).strip())
+    prows = doc.get(arrays["player"]) or []
+    key = player_id_key or schema.id_key(sport, "player", schema.column_names(prows))
+    for row in prows:
+        if not isinstance(row, dict):
+            continue
+        if row.get(key) is not None:
+            players.add(str(row[key]).strip())
+        if row.get("TeamID") is not None:
+            teams.add(str(row["TeamID"]).strip())
+    return {"players": sorted(players), "teams": sorted(teams)}
+
+
+def stored_ids(sport: str, year: int, yyww: str) -> Optional[Dict[str, List[str]]]:
+    """IDs from the week's meta; weeks processed before ref_ids existed are filled in."""
+    meta = seasonpack.load_meta(sport, year, yyww)
+    ids = meta.get("ref_ids") if isinstance(meta, dict) else None
+    if isinstance(ids, dict):
+        return ids
+    body = bundle.week_body(sport, year, yyww)
+    if body is None:
+        return None
+    try:
+        doc = jsonio.loads(body)
+    except Exception:
+        return None
+    ids = week_ids(sport, doc if isinstance(doc, dict) else {}, schema.stored_id_key(sport, year, yyww, "player"))
+    if isinstance(meta, dict):
+        meta["ref_ids"] = ids
+        try:
+            seasonpack.write_meta(sport, year, yyww, meta)
+        except Exception as e:
+            print(f"[REFDATA] could not store ref_ids for {sport}/{year}/{yyww}: {e}")
+    return ids
+
+
+def processed_weeks(sport: str) -> List[Tuple[int, str]]:
+    """(year, yyww) of every processed week of a sport, oldest first."""
+    base = os.path.join(settings.DATA_ROOT, "processed", sport)
+    if not os.path.isdir(base):
+        return []
+    out = []
+    for y in sorted(int(d) for d in os.listdir(base) if d.isdigit()):
+        out.extend((y, yyww) for _, yyww in bundle.season_weeks(sport, y))
+    return out
+
+
+def index(sport: str) -> Dict[str, Dict[str, List[Tuple[int, str]]]]:
+    """{"players": {id: [(year, yyww), ...]}, "teams": {...}} over every processed week (cached on meta mtimes)."""
+    weeks = processed_weeks(sport)
+    stamp = tuple((y, w, seasonpack.meta_mtime(sport, y, w)) for y, w in weeks)
+    with _lock:
+        hit = _indexes.get(sport)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+    idx: Dict[str, Dict[str, List[Tuple[int, str]]]] = {"players": {}, "teams": {}}
+    for y, w in weeks:
+        ids = stored_ids(sport, y, w) or {}
+        for kind in ("players", "teams"):
+            for i in ids.get(kind) or []:
+                idx[kind].setdefault(i, []).append((y, w))
+    stamp = tuple((y, w, seasonpack.meta_mtime(sport, y, w)) for y, w in weeks)   # backfill touched metas
+    with _lock:
+        _indexes[sport] = (stamp, idx)
+    return idx
+
+
+def affected_weeks(sport: str, kind: str, ids: Sequence[str]) -> List[Tuple[int, str]]:
+    """Weeks of `sport` containing any of `ids` (kind: players | teams)."""
+    idx = index(sport)[kind]
+    out = set()
+    for i in ids:
+        out.update(idx.get(i, ()))
+    return sorted(out)
+
+
+# ---------- Map diff ----------
+
+def diff_maps(old: Mapping[Any, Any], new: Mapping[Any, Any]) -> Dict[str, List[str]]:
+    """Added / removed / changed str keys between two reference maps (team maps' int aliases ignored)."""
+    old_keys = {k for k in old.keys() if isinstance(k, str)}
+    new_keys = {k for k in new.keys() if isinstance(k, str)}
+    changed = [k for k in old_keys & new_keys if old[k] != new[k]]
+    return {
+        "added": sorted(new_keys - old_keys),
+        "removed": sorted(old_keys - new_keys),
+        "changed": sorted(changed),
+    }
+
+
+# ---------- Reload state ----------
+
+def _state_path() -> str:
+    return os.path.join(settings.DATA_ROOT, "cache", "refmaps", "reload.json")
+
+
+def load_state() -> Dict[str, Any]:
+    st = jsonio.load_file(_state_path())
+    return st if isinstance(st, dict) else {}
+
+
+def save_state(st: Dict[str, Any]) -> None:
+    ensure_dir(os.path.dirname(_state_path()))
+    atomic_write(_state_path(), jsonio.dumps(st, indent=True))
+
+
+@contextmanager
+def reload_lock() -> Iterator[None]:
+    """Serializes reloads across workers; the second one finds the change handled."""
+    d = os.path.dirname(_state_path())
+    ensure_dir(d)
+    fd = os.open(os.path.join(d, ".reload.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def restamp(sport: str, field: str, old_sha: Optional[str], new_sha: Optional[str],
+            skip: Sequence[Tuple[int, str]] = ()) -> int:
+    """
+    Point metas that were built from `old_sha` at `new_sha` without
+    reprocessing (their output can't change: none of the changed IDs occur
+    in them). Weeks in `skip` were reprocessed and already carry new_sha.
+    """
+    skip_set = set(skip)
+    n = 0
+    for y, w in processed_weeks(sport):
+        if (y, w) in skip_set:
+            continue
+        meta = seasonpack.load_meta(sport, y, w)
+        if not isinstance(meta, dict) or meta.get(field) != old_sha:
+            continue
+        meta[field] = new_sha
+        try:
+            seasonpack.write_meta(sport, y, w, meta)
+            n += 1
+        except Exception as e:
+            print(f"[REFDATA] restamp failed for {sport}/{y}/{w}: {e}")
+    return n
+
+
+# ---------- Watcher ----------
+
+def start_watcher() -> bool:
+    """Poll the reference CSVs every REF_WATCH_S and hot-reload on change (off when 0)."""
+    global _watcher
+    if settings.REF_WATCH_S <= 0 or (_watcher is not None and _watcher.is_alive()):
+        return False
+    _watcher = threading.Thread(target=_watch, name="refdata-watcher", daemon=True)
+    _watcher.start()
+    return True
+
+
+def _watch() -> None:
+    from . import processor   # lazy: only workers that watch pay for it
+    last = processor.reference_stamps()
+    while True:
+        time.sleep(settings.REF_WATCH_S)
+        try:
+            cur = processor.reference_stamps()
+            if cur != last:
+                print(f"[REFDATA] reference CSV changed: {[k for k in cur if cur[k] != last.get(k)]}")
+                processor.reload_reference_maps()
+                last = cur
+        except Exception as e:
+            print(f"[REFDATA] watcher reload failed: {e}")
+
+
+def watcher_running() -> bool:
+    return _watcher is not None and _watcher.is_alive()
@@ -0,0 +1,17 @@
+# app/responses.py
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from . import jsonio
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class for the app: renders through jsonio (orjson /
+    msgspec when installed, stdlib otherwise) instead of json.dumps.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return jsonio.dumps(content)
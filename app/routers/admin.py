@@ -1,8 +1,9 @@
 # app/routers/admin.py (snippet)
+import os
 from fastapi import APIRouter, HTTPException, Depends, Header
 from pydantic import BaseModel
 from ..config import settings
-from ..processor import run_sync, reprocess_raw
+from .. import tracing, rawstore, weekcache, sharedmem, dvp, schema, syncplan, workqueue, seasonpack
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -26,6 +27,9 @@ class RunParams(BaseModel):
     start_year: int | None = None
     years_ahead: int | None = None
     max_week: int | None = None
+    rate_limit_ms: int | None = None   # starting delay; adapts during the run
+    fresh: bool = False                # ignore an unfinished plan instead of resuming it
+    distributed: bool = False          # share the plan with other workers via leases
 
 @router.post("/write-test")
 def write_test(_: None = Depends(require_admin)):
@@ -41,17 +45,20 @@ class ReprocessParams(BaseModel):
     sport: str | None = None    # 'nfl' | 'cfb' | None (both)
     year: int | None = None
     force: bool = True
+    queue: str | None = None    # same id on several workers = split the weeks between them
 
 @router.post("/reprocess")
 def reprocess_endpoint(body: ReprocessParams, _: None = Depends(require_admin)):
     """
     Re-run processing against existing raw files.
     """
+    from ..processor import reprocess_raw  # lazy: keeps worker startup light
     result = reprocess_raw(
         data_root=settings.DATA_ROOT,
         sport=body.sport,
         year=body.year,
         force=body.force,
+        queue=body.queue,
     )
     return result
 
@@ -59,11 +66,235 @@ def reprocess_endpoint(body: ReprocessParams, _: None = Depends(require_admin)):
 @router.post("/run-sync")
 def run_sync_endpoint(body: RunParams, _: None = Depends(require_admin)):
     print(f"[admin] run-sync params: {body.dict()}")
-    summary = run_sync(
-        start_year=body.start_year,
-        years_ahead=body.years_ahead,
-        max_week=body.max_week,
-        api_base=settings.API_BASE,
-        data_root=settings.DATA_ROOT,
-    )
-    return summary
\ No newline at end of file
+    from ..processor import run_sync  # lazy: processor pulls in numpy (via projections)
+    try:
+        summary = run_sync(
+            start_year=body.start_year,
+            years_ahead=body.years_ahead,
+            max_week=body.max_week,
+            api_base=settings.API_BASE,
+            data_root=settings.DATA_ROOT,
+            rate_limit_ms=body.rate_limit_ms if body.rate_limit_ms is not None else 350,
+            fresh=body.fresh,
+            distributed=body.distributed,
+        )
+    except syncplan.SyncBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return summary
+
+@router.get("/sync/plan")
+def sync_plan(history: int = 0, _: None = Depends(require_admin)):
+    """
+    Progress of the current sync plan: items done / remaining, segments
+    (one per run_sync that worked on it) and whether a run is active.
+    history=N adds the last N finished plans.
+    """
+    out = syncplan.status()
+    if history > 0:
+        out["history"] = syncplan.history(limit=history)
+    return out
+
+@router.post("/sync/cancel")
+def sync_cancel(_: None = Depends(require_admin)):
+    """
+    Ask the running sync to stop after the week in flight. The plan keeps
+    its progress; the next run-sync with the same parameters resumes it.
+    """
+    return {"requested": syncplan.request_cancel(), "running": syncplan.running()}
+
+@router.get("/queues")
+def queues(_: None = Depends(require_admin)):
+    """Lease queues on the volume: done / leased / expired items and live owners."""
+    return {"queues": workqueue.queues()}
+
+# ---------- Tracing ----------
+
+@router.get("/traces")
+def traces_endpoint(
+    limit: int = 500,
+    trace: str | None = None,
+    name: str | None = None,
+    _: None = Depends(require_admin),
+):
+    """
+    Recent spans from the in-memory ring buffer (newest last), plus a
+    per-phase summary. Filter by trace id (one run_sync / reprocess) or
+    span-name prefix, e.g. name=process.
+    """
+    return {
+        "summary": tracing.summarize(trace_id=trace),
+        "spans": tracing.recent(limit=limit, trace_id=trace, name=name),
+    }
+
+class TraceToggle(BaseModel):
+    enabled: bool = True
+    clear: bool = False
+
+@router.post("/traces")
+def traces_toggle(body: TraceToggle, _: None = Depends(require_admin)):
+    tracing.set_enabled(body.enabled)
+    if body.clear:
+        tracing.clear()
+    return {"ok": True, "enabled": tracing.enabled()}
+
+
+# ---------- Memory ----------
+
+@router.get("/memory")
+def memory_report(objects: int = 0, _: None = Depends(require_admin)):
+    """
+    RSS of this worker, tracemalloc state and the size of each populated
+    cache (players / team maps, week cache, shared packs, projection,
+    dvp and schema seasons). objects=N adds the N most common object
+    types (walks the whole heap).
+    """
+    from .. import memprof
+    return memprof.report(objects=objects)
+
+class TracemallocToggle(BaseModel):
+    enabled: bool = True
+    frames: int | None = None   # traceback depth; 1 is enough for group_by=lineno
+
+@router.post("/memory/tracemalloc")
+def memory_tracemalloc(body: TracemallocToggle, _: None = Depends(require_admin)):
+    from .. import memprof
+    return {"pid": os.getpid(), **(memprof.start(body.frames) if body.enabled else memprof.stop())}
+
+@router.post("/memory/snapshot")
+def memory_snapshot(group_by: str = "lineno", limit: int = 20, _: None = Depends(require_admin)):
+    """Store a tracemalloc snapshot of this worker; returns its id and top allocation sites."""
+    from .. import memprof
+    try:
+        return memprof.snapshot(group_by=group_by, limit=limit)
+    except RuntimeError as e:
+        raise HTTPException(409, detail=str(e))
+
+@router.get("/memory/snapshots")
+def memory_snapshots(_: None = Depends(require_admin)):
+    from .. import memprof
+    return {"pid": os.getpid(), "snapshots": memprof.snapshots()}
+
+@router.get("/memory/diff")
+def memory_diff(a: str, b: str | None = None, group_by: str = "lineno", limit: int = 30,
+                _: None = Depends(require_admin)):
+    """
+    Allocation growth from snapshot a to b (default: now), grouped by
+    lineno | module | traceback, largest growth first.
+    """
+    from .. import memprof
+    try:
+        res = memprof.diff(a, b, group_by=group_by, limit=limit)
+    except RuntimeError as e:
+        raise HTTPException(409, detail=str(e))
+    if res is None:
+        raise HTTPException(404, detail="unknown snapshot id")
+    return res
+
+
+# ---------- Reference data ----------
+
+@router.get("/refdata")
+def refdata_status(_: None = Depends(require_admin)):
+    """Players / team maps loaded by this worker vs the CSVs on disk, watcher state, last reload."""
+    from ..processor import reference_status  # lazy: processor pulls in numpy (via projections)
+    return reference_status()
+
+class RefReloadParams(BaseModel):
+    force: bool = False     # re-parse and diff even if the CSV stamps are unchanged
+    dry_run: bool = False   # report changed IDs and affected weeks only
+
+@router.post("/refdata/reload")
+def refdata_reload(body: RefReloadParams, _: None = Depends(require_admin)):
+    """
+    Reload edited reference CSVs: swap the maps, reprocess only the weeks
+    containing a changed player / team ID, restamp the rest.
+    """
+    from ..processor import reload_reference_maps  # lazy: processor pulls in numpy (via projections)
+    return reload_reference_maps(force=body.force, dry_run=body.dry_run)
+
+
+# ---------- Raw archive ----------
+
+@router.post("/raw/migrate")
+def raw_migrate(_: None = Depends(require_admin)):
+    """Move legacy plain raw/{sport}/{year}/{yyww}.json files into the gzip blob store."""
+    return rawstore.migrate(settings.DATA_ROOT)
+
+@router.post("/raw/gc")
+def raw_gc(_: None = Depends(require_admin)):
+    """Remove blobs no week pointer references. Don't run during a sync."""
+    return rawstore.gc(settings.DATA_ROOT)
+
+
+# ---------- Week cache ----------
+
+@router.get("/cache")
+def cache_stats(_: None = Depends(require_admin)):
+    """Hit/miss/eviction counters for this worker's processed-week LRU."""
+    return weekcache.stats()
+
+@router.post("/cache/clear")
+def cache_clear(_: None = Depends(require_admin)):
+    weekcache.clear()
+    return {"ok": True, **weekcache.stats()}
+
+# ---------- Season packfiles ----------
+
+@router.get("/packs")
+def packs_stats(sport: str | None = None, year: int | None = None, _: None = Depends(require_admin)):
+    """Per season: packed or loose, weeks, pack bytes (live / superseded), generation."""
+    return seasonpack.stats(sport, year)
+
+class PackParams(BaseModel):
+    sport: str | None = None    # 'nfl' | 'cfb' | None (both)
+    year: int | None = None     # None = every season
+
+def _each_season(body: PackParams, fn):
+    res = [fn(sp, y) for sp, y in seasonpack.seasons(body.sport, body.year)]
+    sharedmem.publish_weeks(wait=True)   # packed / loose weeks get new stamps
+    return {"ok": True, "seasons": [r for r in res if r is not None]}
+
+@router.post("/packs/build")
+def packs_build(body: PackParams, _: None = Depends(require_admin)):
+    """Move loose {yyww}.json + .meta.json files into each season's packfile."""
+    return _each_season(body, seasonpack.pack_season)
+
+@router.post("/packs/compact")
+def packs_compact(body: PackParams, _: None = Depends(require_admin)):
+    """Rewrite packs without superseded week records (also runs on its own once they outweigh live ones)."""
+    return _each_season(body, seasonpack.compact)
+
+@router.post("/packs/unpack")
+def packs_unpack(body: PackParams, _: None = Depends(require_admin)):
+    """Back to loose files (set SEASON_PACKS=0 first, or new writes re-create packs)."""
+    return _each_season(body, seasonpack.unpack_season)
+
+
+# ---------- Shared mmap packs ----------
+
+@router.get("/shm")
+def shm_stats(_: None = Depends(require_admin)):
+    """Generation / size of each shared pack as mapped by this worker, plus hit counters."""
+    return sharedmem.stats()
+
+@router.post("/shm/publish")
+def shm_publish(_: None = Depends(require_admin)):
+    """Rebuild the shared week pack (hot weeks + manifest) from disk now."""
+    res = sharedmem.publish_weeks(wait=True)
+    if res is None:
+        raise HTTPException(status_code=409, detail="shared packs disabled (SHM_ENABLED=0)")
+    return {"ok": True, **res}
+
+# ---------- Derived stages ----------
+
+@router.post("/dvp/rebuild")
+def dvp_rebuild(sport: str | None = None, year: int | None = None, _: None = Depends(require_admin)):
+    """Recompute defense-vs-position week contributions from processed weeks."""
+    return {"ok": True, **dvp.rebuild(sport, year)}
+
+@router.post("/schema/rebuild")
+def schema_rebuild(sport: str | None = None, year: int | None = None, _: None = Depends(require_admin)):
+    """Recompute the schema catalog stored in each processed week's meta."""
+    res = schema.rebuild(sport, year)
+    sharedmem.publish_weeks(wait=True)   # the published manifest carries the season catalogs
+    return {"ok": True, **res}
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pathlib import Path
+from pydantic import BaseModel
 from ..config import settings
-from ..manifest import build_manifest
+from ..manifest import api_manifest
+from .. import rawstore, changes, live, weekcache, bundle, export, sharedmem, dvp, schema, seasonpack
 
 router = APIRouter()
 
@@ -12,33 +14,295 @@ def health():
 
 @router.get("/manifest")
 def get_manifest():
-    # Build URLs that match the routes below (NOT the StaticFiles mount)
-    # If you prefer StaticFiles under /data, say so and I’ll give that variant.
-    return build_manifest(
-        data_root=settings.DATA_ROOT,
-        data_url_prefix="",               # we’ll generate /data/processed/... manually below
-        default_sport="nfl",
-        use_api_routes=True               # <-- we’ll implement this next in manifest.py
+    # URLs match the /data/processed/... routes below (no StaticFiles mount).
+    # Served from the shared pack while no week has changed since it was built.
+    body = sharedmem.manifest_bytes()
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return api_manifest(settings.DATA_ROOT)
+
+@router.get("/changes")
+def get_changes(
+    since: int = 0,
+    limit: int = Query(1000, ge=1, le=10000),
+    rows: bool = False,
+    sport: str | None = Query(None, regex="^(nfl|cfb)$"),
+    year: int | None = None,
+):
+    """
+    Weeks whose processed output changed after version `since`, oldest first.
+    Keep the returned `version` and pass it as `since` next time; if `more`
+    is true, call again with the last entry's version. rows=true inlines
+    row-level diffs (added / changed rows, removed keys) where the server
+    stores them (CHANGES_ROW_DIFFS).
+    """
+    return changes.since(since, limit=limit, rows=rows, sport=sport, year=year)
+
+@router.get("/live")
+async def live_updates(
+    request: Request,
+    since: int | None = None,
+    rows: bool = False,
+    sport: str | None = Query(None, regex="^(nfl|cfb)$"),
+    year: int | None = None,
+):
+    """
+    Server-Sent Events stream of changed weeks: event "week" carries
+    {version, sport, year, yyww, etag[, rows]}; "resync" means refetch
+    /manifest. Reconnects resume from Last-Event-ID.
+    """
+    last = request.headers.get("last-event-id")
+    last_version = int(last) if last and last.isdigit() else since
+    return StreamingResponse(
+        live.stream(request.is_disconnected, last_version, sport=sport, year=year, rows=rows),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+def _accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
 @router.get("/data/processed/{sport}/{year}/{yyww}.json")
-def get_processed(sport: str, year: int, yyww: str):
+def get_processed(sport: str, year: int, yyww: str, request: Request):
     if sport not in ("nfl", "cfb"):
         raise HTTPException(404, detail="bad sport")
-    path = Path(settings.DATA_ROOT) / "processed" / sport / str(year) / f"{yyww}.json"
-    if not path.is_file():
+    e = weekcache.get(sport, year, yyww)
+    if e is None:
         # include the resolved path in the detail for easy debugging
-        raise HTTPException(404, detail=f"missing: {path}")
-    return FileResponse(path)
+        raise HTTPException(404, detail=f"missing: {weekcache.processed_path(sport, year, yyww)}")
+    headers = {"ETag": e.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == e.etag:
+        return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=e.gz, media_type="application/json", headers=headers)
+    return Response(content=e.body, media_type="application/json", headers=headers)
+
+@router.get("/bundle/{sport}/{year}")
+def get_bundle(
+    sport: str,
+    year: int,
+    request: Request,
+    from_week: int | None = None,
+    to_week: int | None = None,
+    view: str | None = Query(None, regex="^(team|player)$"),
+    columns: str | None = None,
+    format: str = Query("ndjson", regex="^(ndjson|json)$"),
+):
+    """
+    A whole season (or week range) in one streamed response.
+    Without `view`: one object per week {sport, year, week, yyww, data}.
+    With `view`: flat rows of that array tagged _week/_yyww, optionally
+    projected to `columns` (comma-separated). format=ndjson|json.
+    """
+    if sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    if not bundle.season_weeks(sport, year, from_week, to_week):
+        raise HTTPException(404, detail=f"no processed weeks for {sport} {year}")
+    cols = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    gz = _accepts_gzip(request)
+    headers = {"Vary": "Accept-Encoding"}
+    if gz:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        bundle.stream_bundle(sport, year, from_week, to_week, view=view, columns=cols, fmt=format, gzip_out=gz),
+        media_type="application/x-ndjson" if format == "ndjson" else "application/json",
+        headers=headers,
+    )
+
+@router.get("/export/{sport}/{year}")
+def get_export(
+    sport: str,
+    year: int,
+    format: str = Query("csv", regex="^(csv|parquet)$"),
+    view: str = Query("player", regex="^(team|player)$"),
+    week: int | None = None,
+    from_week: int | None = None,
+    to_week: int | None = None,
+    positions: str | None = None,
+    columns: str | None = None,
+):
+    """
+    Spreadsheet export of a week (week=), a range (from_week/to_week) or the
+    whole season. Columns follow positions.json (team.columns, or the
+    union of columnsByPosition for `positions`); `columns` overrides.
+    Calc_* points are computed with the viewer's scoring rules.
+    """
+    if sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    if week is not None:
+        from_week = to_week = week
+    weeks = bundle.season_weeks(sport, year, from_week, to_week)
+    if not weeks:
+        raise HTTPException(404, detail=f"no processed weeks for {sport} {year}")
+    pos = [p.strip() for p in positions.split(",") if p.strip()] if positions else None
+    cols = [c.strip() for c in columns.split(",") if c.strip()] if columns else export.export_columns(sport, view, pos)
+
+    span = f"w{weeks[0][0]:02d}" if len(weeks) == 1 else f"w{weeks[0][0]:02d}-{weeks[-1][0]:02d}"
+    fname = f"simfba-{sport}-{year}-{span}-{view}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{fname}"'}
+
+    if format == "parquet":
+        if not export.parquet_available():
+            raise HTTPException(501, detail="Parquet export needs pyarrow installed on the server")
+        path = export.write_parquet(sport, year, view, weeks, cols, pos)
+        return StreamingResponse(export.stream_file(path), media_type="application/vnd.apache.parquet", headers=headers)
+
+    return StreamingResponse(
+        export.stream_csv(sport, year, view, weeks, cols, pos),
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
+    )
+
+@router.get("/schema/{sport}/{year}")
+def get_schema(sport: str, year: int, yyww: str | None = None):
+    """
+    Schema catalog (columns, types, null counts, numeric ranges, ID key per
+    array) of one week (yyww=) or the whole season.
+    """
+    if sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    cat = schema.week_catalog(sport, year, yyww) if yyww else schema.season_catalog(sport, year)
+    if cat is None:
+        raise HTTPException(404, detail=f"no processed weeks for {sport} {year}" + (f" {yyww}" if yyww else ""))
+    return cat
+
+@router.get("/dvp/{sport}/{year}")
+def get_dvp(sport: str, year: int, through_week: int | None = None):
+    """
+    Defense-vs-position: fantasy points each team allowed per position this
+    season (optionally through `through_week`), as {columns, rows}.
+    Rank 1 = allows the most per game.
+    """
+    if sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    table = dvp.season_table(sport, year, through_week)
+    if not table["weeks"]:
+        raise HTTPException(404, detail=f"no processed weeks for {sport} {year}")
+    return table
+
+@router.get("/projections/{sport}/{year}")
+def get_projections(
+    sport: str,
+    year: int,
+    week: int | None = None,
+    metrics: str | None = None,
+    windows: str | None = None,
+    positions: str | None = None,
+):
+    """
+    Rolling-form projections entering `week` (default: next week) as
+    {columns, rows}: projected_{metric}_{l3|l5|season|ewma}, computed from
+    earlier games only. `metrics`, `windows`, `positions` are comma lists.
+    """
+    if sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    from .. import projections  # lazy: numpy stays out of worker startup
+
+    def _csv(v: str | None):
+        return [x.strip() for x in v.split(",") if x.strip()] if v else None
+
+    table = projections.week_table(sport, year, week, _csv(metrics), _csv(windows), _csv(positions))
+    if table is None:
+        raise HTTPException(404, detail=f"no processed weeks for {sport} {year}")
+    return table
+
+class SimulateParams(BaseModel):
+    sport: str = "nfl"
+    year: int
+    team_a: list[str]                 # player IDs
+    team_b: list[str]
+    trials: int = 100_000
+    method: str = "empirical"         # 'empirical' (resample history) | 'normal' (fitted)
+    metric: str = "Calc_TotalPoints"
+    before_week: int | None = None    # only use games before this week
+    seed: int | None = None
+
+@router.post("/simulate")
+def post_simulate(body: SimulateParams):
+    """
+    Monte Carlo head-to-head: win probabilities and score distributions for
+    two lineups, sampling each player's points from their season history.
+    """
+    if body.sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    if body.method not in ("empirical", "normal"):
+        raise HTTPException(400, detail="method must be 'empirical' or 'normal'")
+    if not body.team_a or not body.team_b:
+        raise HTTPException(400, detail="team_a and team_b need at least one player")
+    from .. import simulate  # lazy: numpy stays out of worker startup
+    try:
+        res = simulate.simulate(
+            body.sport, body.year, body.team_a, body.team_b,
+            trials=body.trials, method=body.method, metric=body.metric,
+            before_week=body.before_week, seed=body.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    if res is None:
+        raise HTTPException(404, detail=f"no processed weeks for {body.sport} {body.year}")
+    return res
+
+class LineupParams(BaseModel):
+    sport: str = "nfl"
+    year: int
+    week: int | None = None                  # default: next week after the latest processed
+    slots: dict[str, int] | None = None      # e.g. {"QB":1,"RB":2,"WR":2,"TE":1,"FLEX":1,"K":1,"DEF":1}
+    source: str = "projection"               # 'projection' (entering week) | 'actual' (processed week)
+    window: str = "ewma"                     # projection window: l3 | l5 | season | ewma
+    metric: str = "Calc_TotalPoints"
+    top_n: int = 5
+    salaries: dict[str, float] | None = None # player ID -> salary (DEF:{TeamID} for defenses)
+    salary_cap: float | None = None
+    exclude: list[str] = []
+    lock: list[str] = []
+    teams: list[str] | None = None           # restrict to these team abbreviations (slate)
+
+@router.post("/lineup/optimize")
+def post_lineup(body: LineupParams):
+    """
+    Best lineup (plus next-best alternatives) for the given roster slots,
+    from projections or a processed week's actual points, optionally under
+    a salary cap.
+    """
+    if body.sport not in ("nfl", "cfb"):
+        raise HTTPException(404, detail="bad sport")
+    if body.salary_cap is not None and not body.salaries:
+        raise HTTPException(400, detail="salary_cap needs salaries")
+    from .. import lineup  # lazy: numpy stays out of worker startup
+    try:
+        res = lineup.optimize(
+            body.sport, body.year, week=body.week, slots=body.slots,
+            source=body.source, window=body.window, metric=body.metric,
+            top_n=body.top_n, salaries=body.salaries, salary_cap=body.salary_cap,
+            exclude=body.exclude, lock=body.lock, teams=body.teams,
+        )
+    except lineup.LineupError as e:
+        raise HTTPException(400, detail=str(e))
+    if res is None:
+        raise HTTPException(404, detail=f"no processed weeks for {body.sport} {body.year}")
+    return res
 
 @router.get("/data/raw/{sport}/{year}/{yyww}.json")
-def get_raw(sport: str, year: int, yyww: str):
+def get_raw(sport: str, year: int, yyww: str, request: Request):
     if sport not in ("nfl", "cfb"):
         raise HTTPException(404, detail="bad sport")
-    path = Path(settings.DATA_ROOT) / sport / str(year) / f"{yyww}.json"
-    if not path.is_file():
+    path = rawstore.week_path(settings.DATA_ROOT, sport, year, yyww)
+    if not rawstore.exists(path):
         raise HTTPException(404, detail=f"missing: {path}")
-    return FileResponse(path)
+
+    # Blob is already gzip: hand it over as-is when the client accepts gzip
+    blob = rawstore.compressed_blob(path)
+    if blob and _accepts_gzip(request):
+        return FileResponse(
+            blob,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    body = rawstore.read_bytes(path)
+    if body is None:
+        raise HTTPException(500, detail=f"unreadable: {path}")
+    return Response(content=body, media_type="application/json")
 
 @router.get("/debug/which-file")
 def which_file(
@@ -48,8 +312,14 @@ def which_file(
     yyww: str = "2503",
 ):
     base = Path(settings.DATA_ROOT)
-    path = (base / "processed" / sport / str(year) / f"{yyww}.json") if kind == "processed" \
-           else (base / sport / str(year) / f"{yyww}.json")
+    if kind == "raw":
+        path = rawstore.week_path(str(base), sport, year, yyww)
+        return {"path": path, "exists": rawstore.exists(path), "ref": rawstore.read_ref(path)}
+    path = base / "processed" / sport / str(year) / f"{yyww}.json"
+    if seasonpack.is_packed(sport, year) and not path.is_file():
+        stamp = seasonpack.week_stamp(sport, year, yyww)
+        return {"path": seasonpack.index_path(sport, year), "packed": True, "exists": stamp is not None,
+                "record": {"offset": stamp[1], "bytes": stamp[2]} if stamp else None}
     return {"path": str(path), "exists": path.is_file()}
 
 @router.get("/debug/ls")
@@ -58,5 +328,6 @@ def debug_ls():
     return {
         "DATA_ROOT": settings.DATA_ROOT,
         "exists": p.exists(),
+        "packed": seasonpack.is_packed("nfl", 2025),
         "listed": sorted([f.name for f in p.glob("*.json")])[:10]
     }
\ No newline at end of file
@@ -0,0 +1,292 @@
+# app/schema.py
+import os, threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import settings
+from . import bundle, scoring, jsonio, seasonpack
+
+
+# Schema catalog of processed weeks: per array (team / player rows) the
+# column names in first-seen order, an inferred type, null counts, numeric
+# min/max and the ID key used to identify a row. Calc_* columns from
+# scoring.py are included (marked "computed") since every consumer shows
+# them next to the raw stats.
+#
+# process_one computes the week catalog from its output and stores it in
+# the week's meta ("schema"); season catalogs are merged from those. The
+# manifest serves the season catalog, so the viewer, exports and derived
+# stages read column lists, types and the ID key instead of guessing from
+# the first rows.
+#
+#   {"version": 1,
+#    "arrays": {"NFLPlayerGameStats": {"view": "player", "rows": n, "id_key": "NFLPlayerID",
+#                                      "columns": [{"name", "type", "nulls", "min", "max"[, "computed"]}]},
+#               ...}}
+#
+# Types: int | float | bool | str | json (objects/lists) | null (never set),
+# "mixed" when a column holds more than one of those (int + float is float).
+
+SCHEMA_VERSION = 1
+
+_lock = threading.Lock()
+_seasons: Dict[Tuple[str, int], Tuple[Tuple, Dict[str, Any]]] = {}
+
+
+# ---------- ID keys ----------
+
+def id_key(sport: str, view: str, columns: Iterable[str]) -> str:
+    """
+    The one rule for which column identifies a row: TeamID for team rows;
+    for player rows NFLPlayerID / CollegePlayerID when present, else the
+    first *ID column that isn't a team/game/season id, else "ID". Pass the
+    week's full column list (column_names), not one row's keys.
+    """
+    if view == "team":
+        return "TeamID"
+    cols = list(columns)
+    preferred = "NFLPlayerID" if sport == "nfl" else "CollegePlayerID"
+    if preferred in cols:
+        return preferred
+    for k in cols:
+        kl = str(k).lower()
+        if kl.endswith("id") and not any(x in kl for x in ["team", "game", "season"]):
+            return k
+    return "ID"
+
+
+def column_names(rows: Sequence[Any]) -> List[str]:
+    """Union of row keys in first-seen order."""
+    seen: Dict[str, None] = {}
+    for r in rows:
+        if isinstance(r, dict):
+            for k in r:
+                if k not in seen:
+                    seen[k] = None
+    return list(seen)
+
+
+# ---------- Week catalog ----------
+
+def _kind(v: Any) -> str:
+    if isinstance(v, bool):
+        return "bool"
+    if isinstance(v, int):
+        return "int"
+    if isinstance(v, float):
+        return "float"
+    if isinstance(v, str):
+        return "str"
+    return "json"
+
+
+def _merge_type(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    if a is None or a == "null":
+        return b
+    if b is None or b == "null" or a == b:
+        return a
+    if {a, b} == {"int", "float"}:
+        return "float"
+    return "mixed"
+
+
+class _Col:
+    __slots__ = ("name", "type", "present", "min", "max", "computed")
+
+    def __init__(self, name: str, computed: bool = False):
+        self.name = name
+        self.type: Optional[str] = None
+        self.present = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.computed = computed
+
+    def add(self, v: Any) -> None:
+        if v is None:
+            return
+        self.present += 1
+        k = _kind(v)
+        if k != self.type:
+            self.type = _merge_type(self.type, k)
+        if k == "int" or k == "float":
+            if self.min is None or v < self.min:
+                self.min = v
+            if self.max is None or v > self.max:
+                self.max = v
+
+    def entry(self, rows: int) -> Dict[str, Any]:
+        e: Dict[str, Any] = {"name": self.name, "type": self.type or "null", "nulls": rows - self.present}
+        if self.min is not None and self.type in ("int", "float"):
+            e["min"] = self.min
+            e["max"] = self.max
+        if self.computed:
+            e["computed"] = True
+        return e
+
+
+def array_catalog(sport: str, view: str, rows: Sequence[Any], key: Optional[str] = None) -> Dict[str, Any]:
+    rows = [r for r in rows if isinstance(r, dict)]
+    names = column_names(rows)
+    cols = {n: _Col(n) for n in names}
+    for r in rows:
+        for k, v in r.items():
+            cols[k].add(v)
+    # computed columns: score a copy of each row, keep only what scoring added
+    for r in rows:
+        for k, v in scoring.score(view, dict(r)).items():
+            if k in r:
+                continue
+            c = cols.get(k)
+            if c is None:
+                c = cols[k] = _Col(k, computed=True)
+            c.add(v)
+    return {
+        "view": view,
+        "rows": len(rows),
+        "id_key": key or id_key(sport, view, names),
+        "columns": [c.entry(len(rows)) for c in cols.values()],
+    }
+
+
+def build(sport: str, doc: Dict[str, Any], id_keys: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Week catalog of a processed document; id_keys overrides the key per view."""
+    arrays = bundle.ARRAYS[sport]
+    out: Dict[str, Any] = {}
+    for view in ("team", "player"):
+        name = arrays[view]
+        rows = doc.get(name)
+        out[name] = array_catalog(sport, view, rows if isinstance(rows, list) else [], (id_keys or {}).get(view))
+    return {"version": SCHEMA_VERSION, "arrays": out}
+
+
+# ---------- Season catalog ----------
+
+def merge(catalogs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Season catalog from week catalogs (oldest first): columns in first-seen
+    order, types merged, nulls summed (a column missing from a week counts
+    that week's rows as null), min/max over the season, the latest week's
+    ID key.
+    """
+    arrays: Dict[str, Dict[str, Any]] = {}
+    for cat in catalogs:
+        for name, a in ((cat or {}).get("arrays") or {}).items():
+            acc = arrays.setdefault(name, {"view": a.get("view"), "rows": 0, "weeks": 0, "id_key": None, "cols": {}})
+            n = int(a.get("rows") or 0)
+            acc["weeks"] += 1
+            acc["id_key"] = a.get("id_key") or acc["id_key"]
+            seen = set()
+            for c in a.get("columns") or []:
+                seen.add(c["name"])
+                m = acc["cols"].get(c["name"])
+                if m is None:
+                    m = acc["cols"][c["name"]] = dict(c)
+                    m["nulls"] = acc["rows"] + int(c.get("nulls") or 0)   # earlier weeks lacked it
+                    continue
+                m["type"] = _merge_type(m.get("type"), c.get("type")) or "null"
+                m["nulls"] += int(c.get("nulls") or 0)
+                if "min" in c:
+                    m["min"] = c["min"] if m.get("min") is None else min(m["min"], c["min"])
+                    m["max"] = c["max"] if m.get("max") is None else max(m["max"], c["max"])
+            for cname, m in acc["cols"].items():
+                if cname not in seen:
+                    m["nulls"] += n
+            acc["rows"] += n
+    out = {}
+    for name, acc in arrays.items():
+        cols = []
+        for m in acc["cols"].values():
+            if m.get("type") not in ("int", "float"):
+                m.pop("min", None)
+                m.pop("max", None)
+            cols.append(m)
+        out[name] = {"view": acc["view"], "rows": acc["rows"], "weeks": acc["weeks"], "id_key": acc["id_key"], "columns": cols}
+    return {"version": SCHEMA_VERSION, "arrays": out}
+
+
+# ---------- Stored catalogs (week meta) ----------
+
+def from_meta(meta: Any) -> Optional[Dict[str, Any]]:
+    cat = meta.get("schema") if isinstance(meta, dict) else None
+    if isinstance(cat, dict) and cat.get("version") == SCHEMA_VERSION:
+        return cat
+    return None
+
+
+def week_catalog(sport: str, year: int, yyww: str, backfill: bool = True) -> Optional[Dict[str, Any]]:
+    """Stored week catalog; weeks processed before catalogs existed are filled in (backfill=True)."""
+    meta = seasonpack.load_meta(sport, year, yyww)
+    cat = from_meta(meta)
+    if cat is not None or not backfill:
+        return cat
+    body = bundle.week_body(sport, year, yyww)
+    if body is None:
+        return None
+    try:
+        doc = jsonio.loads(body)
+    except Exception:
+        return None
+    cat = build(sport, doc if isinstance(doc, dict) else {})
+    if isinstance(meta, dict):
+        meta["schema"] = cat
+        try:
+            seasonpack.write_meta(sport, year, yyww, meta)
+        except Exception as e:
+            print(f"[SCHEMA] could not store catalog for {sport}/{year}/{yyww}: {e}")
+    return cat
+
+
+def stored_id_key(sport: str, year: int, yyww: str, view: str) -> Optional[str]:
+    cat = from_meta(seasonpack.load_meta(sport, year, yyww))
+    a = ((cat or {}).get("arrays") or {}).get(bundle.ARRAYS[sport][view])
+    return a.get("id_key") if a else None
+
+
+def season_catalog(sport: str, year: int, backfill: bool = True) -> Optional[Dict[str, Any]]:
+    """Merged catalog of every processed week in the season (cached on meta mtimes)."""
+    weeks = bundle.season_weeks(sport, year)
+    if not weeks:
+        return None
+    stamp = [seasonpack.meta_mtime(sport, year, yyww) for _, yyww in weeks]
+    key, st = (sport, int(year)), (tuple(yyww for _, yyww in weeks), tuple(stamp))
+    with _lock:
+        hit = _seasons.get(key)
+        if hit is not None and hit[0] == st:
+            return hit[1]
+    cats = [c for c in (week_catalog(sport, year, yyww, backfill=backfill) for _, yyww in weeks) if c]
+    cat = merge(cats)
+    if backfill:
+        # backfilled metas changed mtimes; stamp again so the next call hits
+        st = (st[0], tuple(seasonpack.meta_mtime(sport, year, yyww) for _, yyww in weeks))
+    with _lock:
+        _seasons[key] = (st, cat)
+    return cat
+
+
+def column_types(sport: str, year: int, view: str) -> Dict[str, str]:
+    """name -> type for one view over the season (used by exports)."""
+    cat = season_catalog(sport, year) or {}
+    a = (cat.get("arrays") or {}).get(bundle.ARRAYS[sport][view]) or {}
+    return {c["name"]: c.get("type") or "null" for c in a.get("columns") or []}
+
+
+def rebuild(sport: Optional[str] = None, year: Optional[int] = None) -> Dict[str, Any]:
+    """Recompute and store the catalog of every processed week."""
+    done = 0
+    base = os.path.join(settings.DATA_ROOT, "processed")
+    for sp in ([sport] if sport else ["nfl", "cfb"]):
+        sdir = os.path.join(base, sp)
+        if not os.path.isdir(sdir):
+            continue
+        years = [year] if year is not None else sorted(int(y) for y in os.listdir(sdir) if y.isdigit())
+        for y in years:
+            for _, yyww in bundle.season_weeks(sp, y):
+                meta = seasonpack.load_meta(sp, y, yyww)
+                if not isinstance(meta, dict):
+                    continue
+                meta.pop("schema", None)
+                seasonpack.write_meta(sp, y, yyww, meta)
+                if week_catalog(sp, y, yyww) is not None:
+                    done += 1
+    with _lock:
+        _seasons.clear()
+    return {"weeks": done, "sport": sport, "year": year}
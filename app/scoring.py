@@ -0,0 +1,104 @@
+# app/scoring.py
+import math
+from typing import Any, Dict
+
+
+# Server-side port of computePlayer / computeTeam in static/js/viewer.js.
+# Keep the two in step: the viewer shows these numbers, exports and the
+# derived stages (defense-vs-position, projections, ...) reuse them.
+
+def _num(v: Any) -> float:
+    if v is None or v == "":
+        return 0
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return 0
+    if math.isnan(f):
+        return 0
+    return int(f) if f.is_integer() else f
+
+
+def _first(row: Dict[str, Any], *keys: str) -> float:
+    # mirrors `row.A ?? row.B ?? 0`
+    for k in keys:
+        v = row.get(k)
+        if v is not None:
+            return _num(v)
+    return 0
+
+
+def _js_round(x: float) -> int:
+    # Math.round: half rounds up (toward +inf), unlike Python's round()
+    return int(math.floor(x + 0.5))
+
+
+def score_player(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds Calc_* fantasy points to a player row (in place) and returns it."""
+    pyds = _first(row, "PassingYards", "PassingYds")
+    ptd  = _first(row, "PassingTDs", "PassingTouchdowns")
+    pint = _first(row, "Interceptions", "PassingInterceptions")
+
+    ryds = _first(row, "RushingYards")
+    rtd  = _first(row, "RushingTDs", "RushingTouchdowns")
+    rff  = _first(row, "Fumbles", "RushingFumbles")
+
+    rec   = _first(row, "Catches", "ReceivingCatches")
+    recyd = _first(row, "ReceivingYards")
+    rectd = _first(row, "ReceivingTDs", "ReceivingTouchdowns")
+    recff = _first(row, "ReceivingFumbles")
+
+    fg = _first(row, "FGMade")
+    xp = _first(row, "ExtraPointsMade")
+
+    row["Calc_PassingPoints"]   = _js_round(pyds / 25) + (ptd * 4) + (pint * -2)
+    row["Calc_RushingPoints"]   = _js_round(ryds / 10) + (rtd * 6) + (rff * -2)
+    row["Calc_KickingPoints"]   = (fg * 3) + (xp * 1)
+    row["Calc_ReceivingPoints"] = rec + _js_round(recyd / 10) + (rectd * 6) + (recff * -2)
+    row["Calc_TotalPoints"] = (
+        row["Calc_PassingPoints"] + row["Calc_RushingPoints"] +
+        row["Calc_ReceivingPoints"] + row["Calc_KickingPoints"]
+    )
+    return row
+
+
+def points_allowed_score(pts_allowed: float) -> int:
+    if pts_allowed == 0:
+        return 10
+    if pts_allowed <= 6:
+        return 7
+    if pts_allowed <= 13:
+        return 4
+    if pts_allowed <= 20:
+        return 1
+    if pts_allowed <= 27:
+        return 0
+    if pts_allowed <= 34:
+        return -1
+    return -4
+
+
+def score_team(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds Calc_* team defense / return points to a team row (in place) and returns it."""
+    sacks = _first(row, "SacksMade")
+    ints  = _first(row, "InterceptionsCaught")
+    f_rec = _first(row, "RecoveredFumbles")
+    saf   = _first(row, "Safeties")
+    dtd   = _first(row, "DefensiveTDs")
+    ktd   = _first(row, "KickReturnTDs")
+    ptd   = _first(row, "PuntReturnTDs")
+
+    pts_allowed = sum(
+        _first(row, k) for k in
+        ("Score1Q", "Score2Q", "Score3Q", "Score4Q", "Score5Q", "Score6Q", "Score7Q", "ScoreOT")
+    )
+
+    row["Calc_DefensiveScore"] = (sacks * 1) + (ints * 2) + (f_rec * 2) + (saf * 2) + (dtd * 6)
+    row["Calc_ReturnScore"]    = (ktd + ptd) * 6
+    row["Calc_PointsScore"]    = points_allowed_score(pts_allowed)
+    row["Calc_TotalTeamScore"] = row["Calc_DefensiveScore"] + row["Calc_ReturnScore"] + row["Calc_PointsScore"]
+    return row
+
+
+def score(view: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    return score_player(row) if view == "player" else score_team(row)
@@ -0,0 +1,435 @@
+# app/seasonpack.py
+import mmap, os, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config import settings
+from .util import ensure_dir, atomic_write
+from . import jsonio
+
+try:
+    import fcntl  # POSIX only
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+# Season packfiles: an optional layout for processed weeks. Instead of
+# {yyww}.json + {yyww}.meta.json per week, a packed season directory holds
+#
+#   processed/{sport}/{year}/season-{gen}.pack   week bodies + metas, append-only
+#   processed/{sport}/{year}/season.index.json   {yyww: offsets/lengths}, replaced atomically
+#
+# Replacing a week appends its new body (and meta) to the pack, fsyncs,
+# then swaps in a new index with os.replace: readers see the old week or
+# the new one, never a mix, and bytes an old index points at are never
+# overwritten. Readers map the pack (mmap, shared page cache across
+# workers) when the index changes and slice weeks out of it; the index is
+# re-validated with one stat() per lookup, like a loose week file is.
+# Superseded records are dropped by compaction (a new season-{gen+1}.pack)
+# once they outweigh the live ones.
+#
+# A season is packed when its index exists; with SEASON_PACKS=1 every
+# season written by process_one is. The module-level functions below
+# (week_names, week_stamp, read_week, load_meta, write_week, ...) work for
+# both layouts, so callers don't care which one a season uses. A week in
+# the pack wins over a leftover loose file of the same week.
+
+INDEX_NAME = "season.index.json"
+FORMAT = 1
+
+_lock = threading.Lock()
+_seasons: Dict[Tuple[str, int], "_Season"] = {}
+
+
+# ---------- Layout ----------
+
+def year_dir(sport: str, year: int) -> str:
+    return os.path.join(settings.DATA_ROOT, "processed", sport, str(year))
+
+
+def index_path(sport: str, year: int) -> str:
+    return os.path.join(year_dir(sport, year), INDEX_NAME)
+
+
+def _loose(sport: str, year: int, yyww: str) -> str:
+    return os.path.join(year_dir(sport, year), f"{yyww}.json")
+
+
+def _loose_meta(sport: str, year: int, yyww: str) -> str:
+    return os.path.join(year_dir(sport, year), f"{yyww}.meta.json")
+
+
+def is_packed(sport: str, year: int) -> bool:
+    return os.path.isfile(index_path(sport, year))
+
+
+# ---------- Reading ----------
+
+class _Season:
+    """One index version of a packed season plus a read-only map of its pack."""
+
+    __slots__ = ("stamp", "index", "weeks", "data_ino", "mm")
+
+    def __init__(self, stamp: Tuple[int, int, int], index: Dict[str, Any], ydir: str):
+        self.stamp = stamp
+        self.index = index
+        self.weeks: Dict[str, Dict[str, Any]] = index.get("weeks") or {}
+        self.data_ino = 0
+        self.mm: Optional[mmap.mmap] = None
+        try:
+            with open(os.path.join(ydir, index["data"]), "rb") as f:
+                st = os.fstat(f.fileno())
+                self.data_ino = st.st_ino
+                if st.st_size:
+                    # everything this index points at was fsync'd before it was written
+                    self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[PACK] cannot map {ydir}/{index.get('data')}: {e}")
+
+    def read(self, off: int, n: int) -> Optional[bytes]:
+        if self.mm is None or off + n > len(self.mm):
+            return None
+        return self.mm[off:off + n]
+
+
+def _season(sport: str, year: int) -> Optional[_Season]:
+    """Current index of a packed season (cached on the index file's stat), None if not packed."""
+    key = (sport, int(year))
+    try:
+        st = os.stat(index_path(sport, year))
+    except OSError:
+        with _lock:
+            _seasons.pop(key, None)
+        return None
+    stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _lock:
+        s = _seasons.get(key)
+        if s is not None and s.stamp == stamp:
+            return s
+    index = jsonio.load_file(index_path(sport, year))
+    if not isinstance(index, dict) or index.get("format") != FORMAT:
+        return None
+    s = _Season(stamp, index, year_dir(sport, year))
+    with _lock:
+        _seasons[key] = s
+    return s
+
+
+def week_names(sport: str, year: int) -> List[str]:
+    """Sorted yyww of every processed week of a season (packed and loose)."""
+    names = set()
+    s = _season(sport, year)
+    if s is not None:
+        names.update(s.weeks)
+    ydir = year_dir(sport, year)
+    if os.path.isdir(ydir):
+        for fname in os.listdir(ydir):
+            base, ext = os.path.splitext(fname)
+            if ext == ".json" and len(base) == 4 and base.isdigit():
+                names.add(base)
+    return sorted(names)
+
+
+def week_stamp(sport: str, year: int, yyww: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Changes whenever the week's bytes do; None if the week doesn't exist.
+    Loose: (inode, mtime_ns, size). Packed: (pack inode, offset, length).
+    The last element is the body size in both.
+    """
+    s = _season(sport, year)
+    ent = s.weeks.get(yyww) if s is not None else None
+    if ent is not None:
+        return (s.data_ino, ent["off"], ent["len"])
+    try:
+        st = os.stat(_loose(sport, year, yyww))
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def read_week(sport: str, year: int, yyww: str) -> Optional[bytes]:
+    s = _season(sport, year)
+    ent = s.weeks.get(yyww) if s is not None else None
+    if ent is not None:
+        return s.read(ent["off"], ent["len"])
+    try:
+        with open(_loose(sport, year, yyww), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def week_mtime(sport: str, year: int, yyww: str) -> Optional[int]:
+    """When the week's body was last written (ns), for derived files rebuilt when older."""
+    s = _season(sport, year)
+    ent = s.weeks.get(yyww) if s is not None else None
+    if ent is not None:
+        return ent.get("mtime_ns")
+    try:
+        return os.stat(_loose(sport, year, yyww)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_meta(sport: str, year: int, yyww: str) -> Any:
+    """The week's meta dict (None if missing / unreadable)."""
+    s = _season(sport, year)
+    ent = s.weeks.get(yyww) if s is not None else None
+    if ent is not None:
+        if "meta_off" not in ent:
+            return None
+        raw = s.read(ent["meta_off"], ent["meta_len"])
+        try:
+            return jsonio.loads(raw) if raw is not None else None
+        except Exception:
+            return None
+    return jsonio.load_file(_loose_meta(sport, year, yyww))
+
+
+def meta_mtime(sport: str, year: int, yyww: str) -> Optional[int]:
+    """Changes whenever the week's meta is rewritten (cache stamps)."""
+    s = _season(sport, year)
+    ent = s.weeks.get(yyww) if s is not None else None
+    if ent is not None:
+        return ent.get("meta_mtime_ns")
+    try:
+        return os.stat(_loose_meta(sport, year, yyww)).st_mtime_ns
+    except OSError:
+        return None
+
+
+# ---------- Writing ----------
+
+@contextmanager
+def _locked(sport: str, year: int) -> Iterator[None]:
+    """One writer per season directory across processes."""
+    ydir = year_dir(sport, year)
+    ensure_dir(ydir)
+    fd = os.open(os.path.join(ydir, ".season.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _read_index(sport: str, year: int) -> Optional[Dict[str, Any]]:
+    index = jsonio.load_file(index_path(sport, year))
+    return index if isinstance(index, dict) and index.get("format") == FORMAT else None
+
+
+def _commit(sport: str, year: int, index: Dict[str, Any]) -> None:
+    atomic_write(index_path(sport, year), jsonio.dumps(index))
+
+
+def _remove_loose(sport: str, year: int, yyww: str) -> None:
+    p = _loose(sport, year, yyww)
+    for path in (p, p + ".sha", _loose_meta(sport, year, yyww)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _live_bytes(index: Dict[str, Any]) -> int:
+    return sum(e["len"] + e.get("meta_len", 0) for e in (index.get("weeks") or {}).values())
+
+
+def _append(sport: str, year: int, records: List[Tuple[str, Optional[bytes], Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """
+    Append (yyww, body or None = keep, meta or None = keep) records to the
+    season's pack and commit one new index for all of them. Caller holds
+    the season lock.
+    """
+    index = _read_index(sport, year) or {"format": FORMAT, "generation": 1, "data": "season-1.pack", "weeks": {}}
+    weeks = index["weeks"]
+    data_path = os.path.join(year_dir(sport, year), index["data"])
+    with open(data_path, "ab") as f:
+        off = f.seek(0, os.SEEK_END)
+        for yyww, body, meta in records:
+            ent = dict(weeks.get(yyww) or {})
+            now = time.time_ns()
+            if body is not None:
+                f.write(body)
+                ent.update(off=off, len=len(body), mtime_ns=now)
+                off += len(body)
+            if meta is not None:
+                mb = jsonio.dumps(meta)
+                f.write(mb)
+                ent.update(meta_off=off, meta_len=len(mb), meta_mtime_ns=now)
+                off += len(mb)
+            if "off" not in ent:
+                raise ValueError(f"{sport}/{year}/{yyww}: no body in the pack to attach meta to")
+            weeks[yyww] = ent
+        f.flush()
+        os.fsync(f.fileno())
+    index["data_bytes"] = off
+    _commit(sport, year, index)
+    for yyww, _, _ in records:
+        _remove_loose(sport, year, yyww)
+    if off - _live_bytes(index) > max(_live_bytes(index), 1 << 20):
+        index = _compact_locked(sport, year, index)
+    return index
+
+
+def write_week(sport: str, year: int, yyww: str, body: Optional[bytes], meta: Dict[str, Any]) -> None:
+    """
+    Store a processed week (body=None: the body is unchanged, only meta).
+    Goes to the season pack when the season is packed or SEASON_PACKS is on,
+    else to the loose {yyww}.json / {yyww}.meta.json files. Raises on failure.
+    """
+    if settings.SEASON_PACKS or is_packed(sport, year):
+        with _locked(sport, year):
+            if body is None and yyww not in ((_read_index(sport, year) or {}).get("weeks") or {}):
+                body = read_week(sport, year, yyww)   # loose week moving into the pack
+            _append(sport, year, [(yyww, body, meta)])
+        return
+    if body is not None:
+        atomic_write(_loose(sport, year, yyww), body)
+    atomic_write(_loose_meta(sport, year, yyww), jsonio.dumps(meta, indent=True))
+
+
+def write_meta(sport: str, year: int, yyww: str, meta: Dict[str, Any]) -> None:
+    """Rewrite only the week's meta (restamps, backfilled catalogs)."""
+    if is_packed(sport, year):
+        with _locked(sport, year):
+            if yyww in ((_read_index(sport, year) or {}).get("weeks") or {}):
+                _append(sport, year, [(yyww, None, meta)])
+                return
+    atomic_write(_loose_meta(sport, year, yyww), jsonio.dumps(meta, indent=True))
+
+
+# ---------- Maintenance ----------
+
+def _compact_locked(sport: str, year: int, index: Dict[str, Any]) -> Dict[str, Any]:
+    ydir = year_dir(sport, year)
+    old = _season(sport, year)
+    if old is None:
+        return index
+    gen = int(index.get("generation", 1)) + 1
+    name = f"season-{gen}.pack"
+    weeks: Dict[str, Dict[str, Any]] = {}
+    off = 0
+    with open(os.path.join(ydir, name), "wb") as f:
+        for yyww in sorted(old.weeks):
+            ent = dict(old.weeks[yyww])
+            for o, n in (("off", "len"), ("meta_off", "meta_len")):
+                if o not in ent:
+                    continue
+                b = old.read(ent[o], ent[n])
+                if b is None:
+                    raise OSError(f"{sport}/{year}/{yyww}: pack record unreadable")
+                f.write(b)
+                ent[o] = off
+                off += len(b)
+            weeks[yyww] = ent
+        f.flush()
+        os.fsync(f.fileno())
+    prev = index["data"]
+    index = {**index, "generation": gen, "data": name, "weeks": weeks, "data_bytes": off}
+    _commit(sport, year, index)
+    try:
+        os.remove(os.path.join(ydir, prev))   # mapped readers keep their view until they re-stat
+    except OSError:
+        pass
+    print(f"[PACK] compacted {sport}/{year} -> {name} ({off} bytes)")
+    return index
+
+
+def compact(sport: str, year: int) -> Optional[Dict[str, Any]]:
+    if not is_packed(sport, year):
+        return None
+    with _locked(sport, year):
+        index = _read_index(sport, year)
+        if index is None:
+            return None
+        before = index.get("data_bytes", 0)
+        index = _compact_locked(sport, year, index)
+    return {"sport": sport, "year": int(year), "bytes_before": before, "bytes_after": index["data_bytes"]}
+
+
+def pack_season(sport: str, year: int) -> Dict[str, Any]:
+    """Move a season's loose week files into its pack (one index commit)."""
+    records = []
+    with _locked(sport, year):
+        index = _read_index(sport, year)
+        in_pack = set((index or {}).get("weeks") or {})
+        for yyww in week_names(sport, year):
+            path = _loose(sport, year, yyww)
+            if not os.path.isfile(path):
+                continue
+            if yyww in in_pack:
+                _remove_loose(sport, year, yyww)   # leftover: the packed copy is the one served
+                continue
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+            except OSError:
+                continue
+            meta = jsonio.load_file(_loose_meta(sport, year, yyww))
+            records.append((yyww, body, meta if isinstance(meta, dict) else None))
+        if records:
+            index = _append(sport, year, records)
+    print(f"[PACK] packed {sport}/{year}: {len(records)} loose weeks")
+    return {"sport": sport, "year": int(year), "packed": len(records),
+            "weeks": len((index or {}).get("weeks") or {}), "data_bytes": (index or {}).get("data_bytes")}
+
+
+def unpack_season(sport: str, year: int) -> Dict[str, Any]:
+    """Write a packed season back out as loose files and remove the pack."""
+    n = 0
+    with _locked(sport, year):
+        index = _read_index(sport, year)
+        if index is None:
+            return {"sport": sport, "year": int(year), "unpacked": 0}
+        for yyww in sorted(index.get("weeks") or {}):
+            body = read_week(sport, year, yyww)
+            if body is None:
+                raise OSError(f"{sport}/{year}/{yyww}: pack record unreadable")
+            meta = load_meta(sport, year, yyww)
+            atomic_write(_loose(sport, year, yyww), body)
+            if isinstance(meta, dict):
+                atomic_write(_loose_meta(sport, year, yyww), jsonio.dumps(meta, indent=True))
+            n += 1
+        os.remove(index_path(sport, year))   # loose files are complete: switch readers over
+        try:
+            os.remove(os.path.join(year_dir(sport, year), index["data"]))
+        except OSError:
+            pass
+    print(f"[PACK] unpacked {sport}/{year}: {n} weeks")
+    return {"sport": sport, "year": int(year), "unpacked": n}
+
+
+def seasons(sport: Optional[str] = None, year: Optional[int] = None) -> List[Tuple[str, int]]:
+    """(sport, year) of every processed season directory, optionally filtered."""
+    out = []
+    base = os.path.join(settings.DATA_ROOT, "processed")
+    for sp in ([sport] if sport else ["nfl", "cfb"]):
+        sdir = os.path.join(base, sp)
+        if not os.path.isdir(sdir):
+            continue
+        for y in sorted(int(d) for d in os.listdir(sdir) if d.isdigit()):
+            if year is None or y == int(year):
+                out.append((sp, y))
+    return out
+
+
+def stats(sport: Optional[str] = None, year: Optional[int] = None) -> Dict[str, Any]:
+    out = []
+    for sp, y in seasons(sport, year):
+        s = _season(sp, y)
+        loose = sum(1 for w in week_names(sp, y) if os.path.isfile(_loose(sp, y, w)))
+        if s is None:
+            out.append({"sport": sp, "year": y, "packed": False, "loose_weeks": loose})
+            continue
+        data_bytes = s.index.get("data_bytes", 0)
+        live = _live_bytes(s.index)
+        out.append({
+            "sport": sp, "year": y, "packed": True, "weeks": len(s.weeks), "loose_weeks": loose,
+            "generation": s.index.get("generation"), "data_bytes": data_bytes,
+            "live_bytes": live, "dead_bytes": data_bytes - live, "mapped": s.mm is not None,
+        })
+    return {"enabled": settings.SEASON_PACKS, "seasons": out}
@@ -0,0 +1,441 @@
+# app/sharedmem.py
+import os, mmap, struct, time, threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .config import settings
+from .util import ensure_dir
+from . import jsonio
+
+
+# Read-only pack files shared by every uvicorn worker through mmap.
+#
+# {DATA_ROOT}/cache/shm/{name}.pack:
+#   header  "<8sQQQ"  magic, generation, index offset, index length
+#   blobs   raw bytes, 8-byte aligned
+#   index   compact JSON describing the blobs
+#
+# A pack is rebuilt into a temp file and renamed over the old one, with
+# generation = old + 1. Workers re-stat the path at most every SHM_CHECK_S
+# and remap when the inode changes; the kernel backs every worker's mapping
+# with the same page-cache pages, so N workers cost ~1x memory. Old
+# mappings stay valid until the last reference drops.
+#
+# Packs:
+#   ref_players, ref_teams_{sport}  sorted-key tables (SharedMap) for the
+#                                   processor's reference maps
+#   weeks                           hottest processed weeks (body, gzip,
+#                                   etag, file stamp) + the /manifest body
+
+_HEADER = struct.Struct("<8sQQQ")
+_MAGIC = b"SFBPACK1"
+_U32 = struct.Struct("<I")
+_MISS = object()
+
+_lock = threading.Lock()
+_packs: Dict[str, "_Pack"] = {}
+_checked: Dict[str, float] = {}
+_stats = {"week_hits": 0, "week_stale": 0, "manifest_hits": 0, "remaps": 0, "published": 0}
+
+
+def shm_dir() -> str:
+    return os.path.join(settings.DATA_ROOT, "cache", "shm")
+
+
+def pack_path(name: str) -> str:
+    return os.path.join(shm_dir(), f"{name}.pack")
+
+
+# ---------- Reading ----------
+
+class _Pack:
+    __slots__ = ("name", "mm", "generation", "index", "stamp", "size")
+
+    def __init__(self, name: str, path: str):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, gen, ioff, ilen = _HEADER.unpack_from(self.mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"bad pack header: {path}")
+        self.name = name
+        self.generation = gen
+        self.index = jsonio.loads(self.mm[ioff:ioff + ilen])
+        self.stamp = (st.st_ino, st.st_mtime_ns)
+        self.size = st.st_size
+
+    def blob(self, span: List[int]) -> bytes:
+        off, n = span
+        return self.mm[off:off + n]
+
+
+def _current(name: str, force: bool = False) -> Optional[_Pack]:
+    """Mapped pack for `name`, remapped if a newer generation was published."""
+    now = time.monotonic()
+    with _lock:
+        p = _packs.get(name)
+        if not force and p is not None and now - _checked.get(name, 0.0) < settings.SHM_CHECK_S:
+            return p
+        _checked[name] = now
+    path = pack_path(name)
+    try:
+        st = os.stat(path)
+    except OSError:
+        with _lock:
+            _packs.pop(name, None)
+        return None
+    if p is not None and p.stamp == (st.st_ino, st.st_mtime_ns):
+        return p
+    try:
+        p = _Pack(name, path)
+    except (OSError, ValueError) as e:
+        print(f"[SHM] cannot map {path}: {e}")
+        return None
+    with _lock:
+        _packs[name] = p
+        _stats["remaps"] += 1
+    return p
+
+
+class SharedMap(Mapping):
+    """
+    Read-only str-keyed mapping over a ref_* pack. Keys are sorted bytes
+    looked up by binary search; values are compact JSON decoded on first
+    access and memoized in this worker (`_memo` hits, `_absent` misses), so
+    a worker only holds decoded copies of the entries it has actually used.
+    A pack never changes under a SharedMap (republishing maps a new one),
+    so the memo needs no invalidation.
+
+    Hot loops call resolve(keys) once and then use the returned plain dict:
+    per-row dict.get instead of a Python-level method call per row (see
+    bench/bench_shm.py). Non-str keys are looked up as str(key).
+    """
+
+    def __init__(self, pack: _Pack):
+        idx = pack.index
+        self._mm = pack.mm
+        self._n = idx["n"]
+        self._keys = idx["keys"]
+        self._koffs = idx["koffs"]
+        self._vals = idx["vals"]
+        self._voffs = idx["voffs"]
+        self.sha256 = idx.get("sha256")
+        self.stamp = idx.get("stamp")
+        self.generation = pack.generation
+        self._memo: Dict[str, Any] = {}
+        self._absent: Set[str] = set()
+
+    def _off(self, table: int, i: int) -> int:
+        return _U32.unpack_from(self._mm, table + 4 * i)[0]
+
+    def _key_at(self, i: int) -> bytes:
+        a, b = self._off(self._koffs, i), self._off(self._koffs, i + 1)
+        return self._mm[self._keys + a:self._keys + b]
+
+    def _find(self, key: Any) -> int:
+        k = (key if isinstance(key, str) else str(key)).encode("utf-8")
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < k:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._n and self._key_at(lo) == k else -1
+
+    def _lookup(self, k: str) -> Any:
+        """Decode the value for `k` (or _MISS) and memoize it."""
+        i = self._find(k)
+        if i < 0:
+            self._absent.add(k)
+            return _MISS
+        a, b = self._off(self._voffs, i), self._off(self._voffs, i + 1)
+        v = self._memo[k] = jsonio.loads(self._mm[self._vals + a:self._vals + b])
+        return v
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        k = key if isinstance(key, str) else str(key)
+        v = self._memo.get(k, _MISS)
+        if v is _MISS and k not in self._absent:
+            v = self._lookup(k)
+        return default if v is _MISS else v
+
+    def resolve(self, keys: Iterable[Optional[str]]) -> Dict[str, Any]:
+        """Decode every str key in `keys` (None skipped) not seen yet; returns the memo (hits only) as a plain dict."""
+        todo = set(keys).difference(self._memo, self._absent)
+        todo.discard(None)
+        for k in todo:
+            self._lookup(k)
+        return self._memo
+
+    def __getitem__(self, key: Any) -> Any:
+        v = self.get(key, _MISS)
+        if v is _MISS:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISS) is not _MISS
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._n):
+            yield self._key_at(i).decode("utf-8")
+
+
+# ---------- Writing ----------
+
+@contextmanager
+def _publish_lock(name: str, wait: bool):
+    """fcntl lock so only one process rebuilds a pack at a time; yields False if busy."""
+    import fcntl
+    ensure_dir(shm_dir())
+    fd = os.open(os.path.join(shm_dir(), f".{name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+class _PackWriter:
+    def __init__(self, name: str):
+        self.name = name
+        self.path = pack_path(name)
+        self.tmp = os.path.join(shm_dir(), f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self.f = open(self.tmp, "wb")
+        self.f.write(b"\0" * _HEADER.size)
+        self.pos = _HEADER.size
+
+    def add(self, data: bytes) -> List[int]:
+        pad = -self.pos % 8
+        if pad:
+            self.f.write(b"\0" * pad)
+            self.pos += pad
+        off = self.pos
+        self.f.write(data)
+        self.pos += len(data)
+        return [off, len(data)]
+
+    def finish(self, index: Dict[str, Any]) -> int:
+        prev = 0
+        try:
+            with open(self.path, "rb") as f:
+                magic, prev, _, _ = _HEADER.unpack(f.read(_HEADER.size))
+        except (OSError, struct.error):
+            pass
+        gen = prev + 1
+        ioff, ilen = self.add(jsonio.dumps(index))
+        self.f.seek(0)
+        self.f.write(_HEADER.pack(_MAGIC, gen, ioff, ilen))
+        self.f.close()
+        os.replace(self.tmp, self.path)
+        with _lock:
+            _stats["published"] += 1
+        return gen
+
+    def abort(self) -> None:
+        try:
+            self.f.close()
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+def _table(w: _PackWriter, items: List[bytes]) -> Tuple[int, int]:
+    """Write a blob heap and its (n+1) u32 offset table; returns (heap, table) offsets."""
+    offs = [0]
+    for b in items:
+        offs.append(offs[-1] + len(b))
+    heap = w.add(b"".join(items))[0]
+    table = w.add(struct.pack(f"<{len(offs)}I", *offs))[0]
+    return heap, table
+
+
+# ---------- Reference maps ----------
+
+def refmap(kind: str, stamp: Optional[Dict[str, Any]]) -> Optional[SharedMap]:
+    """Shared view of ref_{kind} if its source stamp still matches, else None."""
+    if stamp is None:
+        return None
+    p = _current(f"ref_{kind}")
+    if p is None or p.index.get("stamp") != stamp:
+        return None
+    return SharedMap(p)
+
+
+def publish_refmap(kind: str, stamp: Optional[Dict[str, Any]], sha: Optional[str], mapping: Dict[str, Any]) -> Optional[SharedMap]:
+    """Write ref_{kind} from a str-keyed dict; None if another process is publishing."""
+    if stamp is None:
+        return None
+    name = f"ref_{kind}"
+    with _publish_lock(name, wait=False) as ok:
+        if not ok:
+            return None
+        items = sorted((k.encode("utf-8"), jsonio.dumps(v)) for k, v in mapping.items())
+        w = _PackWriter(name)
+        try:
+            keys, koffs = _table(w, [k for k, _ in items])
+            vals, voffs = _table(w, [v for _, v in items])
+            gen = w.finish({"kind": "refmap", "n": len(items), "stamp": stamp, "sha256": sha,
+                            "keys": keys, "koffs": koffs, "vals": vals, "voffs": voffs})
+        except Exception:
+            w.abort()
+            raise
+    print(f"[SHM] published {name} gen={gen} entries={len(items)}")
+    p = _current(name, force=True)
+    return SharedMap(p) if p is not None else None
+
+
+# ---------- Hot weeks + manifest ----------
+
+def _hot_weeks(budget: int) -> List[Tuple[str, int, str]]:
+    """Newest weeks first (latest season of each sport, then older), up to ~budget bytes on disk."""
+    from . import bundle, seasonpack
+    cands: List[Tuple[int, int, str, str]] = []
+    base = os.path.join(settings.DATA_ROOT, "processed")
+    for sport in ("nfl", "cfb"):
+        sdir = os.path.join(base, sport)
+        if not os.path.isdir(sdir):
+            continue
+        for y in os.listdir(sdir):
+            if y.isdigit():
+                cands.extend((int(y), week, sport, yyww) for week, yyww in bundle.season_weeks(sport, int(y)))
+    cands.sort(reverse=True)
+    out, used = [], 0
+    for year, _, sport, yyww in cands:
+        stamp = seasonpack.week_stamp(sport, year, yyww)
+        if stamp is None:
+            continue
+        size = stamp[2]
+        if used + size > budget:
+            continue
+        used += size
+        out.append((sport, year, yyww))
+    return out
+
+
+def publish_weeks(wait: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild the `weeks` pack from disk. Returns a summary, or None when
+    disabled / another process is already publishing.
+    """
+    if not settings.SHM_ENABLED:
+        return None
+    from . import weekcache, changes
+    from .manifest import api_manifest, MANIFEST_FORMAT
+
+    with _publish_lock("weeks", wait=wait) as ok:
+        if not ok:
+            return None
+        t0 = time.monotonic()
+        version = changes.latest_version()  # before the scan: a later change invalidates
+        w = _PackWriter("weeks")
+        try:
+            weeks: Dict[str, Any] = {}
+            raw_bytes = 0
+            for sport, year, yyww in _hot_weeks(settings.SHM_WEEKS_BYTES):
+                e = weekcache.read_entry(sport, year, yyww)
+                if e is None:
+                    continue
+                weeks[f"{sport}/{year}/{yyww}"] = {
+                    "body": w.add(e.body), "gz": w.add(e.gz), "etag": e.etag, "stamp": list(e.stamp),
+                }
+                raw_bytes += len(e.body)
+            manifest = w.add(jsonio.dumps(api_manifest(settings.DATA_ROOT)))
+            gen = w.finish({"kind": "weeks", "changes_version": version, "weeks": weeks,
+                            "manifest": manifest, "manifest_format": MANIFEST_FORMAT})
+        except Exception:
+            w.abort()
+            raise
+    summary = {
+        "generation": gen,
+        "weeks": len(weeks),
+        "body_bytes": raw_bytes,
+        "changes_version": version,
+        "ms": round((time.monotonic() - t0) * 1000.0, 1),
+    }
+    print(f"[SHM] published weeks {summary}")
+    _current("weeks", force=True)
+    return summary
+
+
+def publish_weeks_async() -> None:
+    """
+    Startup hook: (re)build the week pack in the background if it is missing
+    or predates the latest change. The first worker builds, the rest skip.
+    """
+    if not settings.SHM_ENABLED:
+        return
+    from . import changes
+    from .manifest import MANIFEST_FORMAT
+    p = _current("weeks")
+    if (p is not None and p.index.get("changes_version") == changes.latest_version()
+            and p.index.get("manifest_format") == MANIFEST_FORMAT):
+        return
+    threading.Thread(target=publish_weeks, name="shm-publish", daemon=True).start()
+
+
+def week(sport: str, year: int, yyww: str, stamp: Tuple[int, int, int]) -> Optional[Tuple[bytes, bytes, str]]:
+    """(body, gz, etag) from the shared pack if present and still matching the file's stamp."""
+    if not settings.SHM_ENABLED:
+        return None
+    p = _current("weeks")
+    if p is None:
+        return None
+    ent = p.index["weeks"].get(f"{sport}/{year}/{yyww}")
+    if ent is None:
+        return None
+    if tuple(ent["stamp"]) != stamp:
+        with _lock:
+            _stats["week_stale"] += 1
+        return None
+    with _lock:
+        _stats["week_hits"] += 1
+    return p.blob(ent["body"]), p.blob(ent["gz"]), ent["etag"]
+
+
+def manifest_bytes() -> Optional[bytes]:
+    """Published /manifest body, valid while no week has changed since it was built."""
+    if not settings.SHM_ENABLED:
+        return None
+    p = _current("weeks")
+    if p is None or p.index.get("manifest") is None:
+        return None
+    from . import changes
+    from .manifest import MANIFEST_FORMAT
+    if changes.latest_version() != p.index.get("changes_version") or p.index.get("manifest_format") != MANIFEST_FORMAT:
+        return None
+    with _lock:
+        _stats["manifest_hits"] += 1
+    return p.blob(p.index["manifest"])
+
+
+def stats() -> Dict[str, Any]:
+    packs = {}
+    for fname in sorted(os.listdir(shm_dir())) if os.path.isdir(shm_dir()) else []:
+        if not fname.endswith(".pack"):
+            continue
+        name = fname[:-5]
+        p = _current(name)
+        if p is None:
+            continue
+        info = {"generation": p.generation, "bytes": p.size}
+        if p.index.get("kind") == "weeks":
+            info["weeks"] = len(p.index.get("weeks") or {})
+            info["changes_version"] = p.index.get("changes_version")
+        else:
+            info["entries"] = p.index.get("n")
+        packs[name] = info
+    with _lock:
+        return {"enabled": settings.SHM_ENABLED, "pid": os.getpid(), **_stats, "packs": packs}
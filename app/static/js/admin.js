@@ -102,7 +102,7 @@
           }
 
           if (reOutEl) reOutEl.textContent = JSON.stringify(data, null, 2);
-          alert(`Reprocess done. Processed: ${data.processed}, Unchanged: ${data.unchanged}, Errors: ${data.errors}`);
+          alert(`Reprocess done. Processed: ${data.processed}, Identical: ${data.identical}, Unchanged: ${data.unchanged}, Errors: ${data.errors}`);
         } catch (err) {
           console.error(err);
           if (reOutEl) reOutEl.textContent = 'Network error during reprocess.';
@@ -0,0 +1,381 @@
+// Viewer data prep, off the main thread.
+//
+// The worker owns the rows of the loaded week: it fetches and parses the
+// file, applies the scoring below, and answers filter/sort queries with a
+// row count; the filtered order stays here and the viewer asks for the
+// cell text of the rows it is about to draw, so a week switch or a live
+// diff never structured-clones the whole week to the page. Sort orders are
+// built once per column and direction from typed keys (Float64Array for
+// numeric columns, strings otherwise) and cached until the rows change, so
+// a query is one linear pass over a cached permutation.
+//
+// Week files are cached at two levels, both keyed by URL and validated
+// against the ETag the manifest lists for that week: a few parsed weeks in
+// memory (so switching Team/Player or stepping back is free) and every
+// recently seen week in IndexedDB (survives reloads). A missing or
+// different manifest ETag means a conditional fetch (If-None-Match), so
+// an unchanged week costs a 304. Idle-time prefetch fills both levels.
+//
+// Messages: {id, type, ...} -> {id, ok, ...}
+//   load     {url, etag, sport, view, types} -> {status, etag, from, total, keys} or {stale}
+//   prefetch {items: [{url, etag}]}          -> {fetched}
+//   diff     {diff}                          -> {total, keys}
+//
+// `types` is {column: type} from the season schema catalog in the manifest;
+// with it, numeric columns skip type detection and keys aren't sampled.
+//   query    {q, idKey, positions, sortKey, sortDir} -> {count, ms}
+//   slice    {first, last, cols}                     -> {cells: [[text per col] per row]}
+
+(function () {
+  const ARRAYS = {
+    nfl: { team: 'NFLTeamGameStats', player: 'NFLPlayerGameStats' },
+    cfb: { team: 'CFBTeamGameStats', player: 'CFBPlayerGameStats' }
+  };
+
+  let rows = [];
+  let order = new Uint32Array(0);   // result of the last query (indices into rows)
+  let view = 'team';
+  let orders = new Map();   // 'col|dir' -> Uint32Array
+  let idLower = null;       // [idKey, string[]]
+  let posCol = null;        // string[]
+  let types = null;         // column -> catalog type, when the manifest has one
+  let loadGen = 0;          // latest load wins when switches overlap
+  let prefetchGen = 0;      // a newer prefetch list cancels the rest of an older one
+
+  const MEM_WEEKS = 6;
+  const IDB_MAX_WEEKS = 64;
+  const DB_NAME = 'simfba-viewer', STORE = 'weeks';
+  const mem = new Map();    // url -> {etag, doc}, insertion order = LRU
+  const inflight = new Map();  // url|etag -> Promise (prefetch and a click share one request)
+
+  // ---------- Calculations (edit freely; mirrored server-side in app/scoring.py) ----------
+  function computePlayer(row) {
+    // Read from both NFL/CFB naming variants you’ve seen
+    const pyds = Number(row.PassingYards ?? row.PassingYds ?? 0);
+    const ptd  = Number(row.PassingTDs ?? row.PassingTouchdowns ?? 0);
+    const pint = Number(row.Interceptions ?? row.PassingInterceptions ?? 0);
+
+    const ryds = Number(row.RushingYards ?? 0);
+    const rtd  = Number(row.RushingTDs ?? row.RushingTouchdowns ?? 0);
+    const rff  = Number(row.Fumbles ?? row.RushingFumbles ?? 0);
+
+    const rec   = Number(row.Catches ?? row.ReceivingCatches ?? 0);
+    const recyd = Number(row.ReceivingYards ?? 0);
+    const rectd = Number(row.ReceivingTDs ?? row.ReceivingTouchdowns ?? 0);
+    const recff = Number(row.ReceivingFumbles ?? 0);
+
+    const fg = Number(row.FGMade ?? 0);
+    const xp = Number(row.ExtraPointsMade ?? 0);
+
+
+    row.Calc_PassingPoints   = Math.round((pyds/25), 1) + (ptd * 4) + (pint * -2);
+    row.Calc_RushingPoints   = Math.round((ryds/10), 1) + (rtd * 6) + (rff * -2);
+    row.Calc_KickingPoints = (fg * 3) + (xp * 1)
+    row.Calc_ReceivingPoints = rec + Math.round((recyd/10), 1) + (rectd * 6) + (recff * -2);
+    row.Calc_TotalPoints = row.Calc_PassingPoints + row.Calc_RushingPoints + row.Calc_ReceivingPoints + row.Calc_KickingPoints;
+    return row;
+  }
+
+  function computeTeam(row) {
+    const sacks = Number(row.SacksMade ?? 0);
+    const ints  = Number(row.InterceptionsCaught ?? 0);
+    const fRec  = Number(row.RecoveredFumbles ?? 0);
+    const saf   = Number(row.Safeties ?? 0);
+    const dtd   = Number(row.DefensiveTDs ?? 0);
+    const ktd   = Number(row.KickReturnTDs ?? 0);
+    const ptd   = Number(row.PuntReturnTDs ?? 0);
+
+    const q1 = Number(row.Score1Q ?? 0), q2 = Number(row.Score2Q ?? 0),
+          q3 = Number(row.Score3Q ?? 0), q4 = Number(row.Score4Q ?? 0),
+          q5 = Number(row.Score5Q ?? 0), q6 = Number(row.Score6Q ?? 0),
+          q7 = Number(row.Score7Q ?? 0), ot = Number(row.ScoreOT ?? 0);
+
+    const ptsAllowed = q1+q2+q3+q4+q5+q6+q7+ot;
+
+    let pointsScore = 0;
+    if (ptsAllowed === 0) pointsScore = 10;
+    else if (ptsAllowed <= 6) pointsScore = 7;
+    else if (ptsAllowed <= 13) pointsScore = 4;
+    else if (ptsAllowed <= 20) pointsScore = 1;
+    else if (ptsAllowed <= 27) pointsScore = 0;
+    else if (ptsAllowed <= 34) pointsScore = -1;
+    else if (ptsAllowed >= 35) pointsScore = -4;
+
+    row.Calc_DefensiveScore = (sacks*1) + (ints*2) + (fRec*2) + (saf*2) + (dtd*6);
+    row.Calc_ReturnScore    = (ktd + ptd) * 6;
+    row.Calc_PointsScore    = pointsScore;
+    row.Calc_TotalTeamScore = row.Calc_DefensiveScore + row.Calc_ReturnScore + row.Calc_PointsScore;
+    return row;
+  }
+  // ---------- /Calculations ----------
+
+  function compute(row) { return view === 'player' ? computePlayer(row) : computeTeam(row); }
+
+  function reset(newRows) {
+    rows = newRows;
+    order = new Uint32Array(0);
+    orders = new Map();
+    idLower = null;
+    posCol = null;
+  }
+
+  function sampleKeys() {
+    if (types) return null;   // the viewer takes columns from the catalog
+    const set = new Set();
+    rows.slice(0, 200).forEach(r => Object.keys(r).forEach(k => set.add(k)));
+    return Array.from(set).sort();
+  }
+
+  // ---------- Sort keys ----------
+  // Numeric column: every non-blank value parses as a number. Blanks sort
+  // last in both directions; ties keep file order.
+  function orderFor(col, dir) {
+    const ck = col + '|' + dir;
+    let ord = orders.get(ck);
+    if (ord) return ord;
+
+    const n = rows.length;
+    const num = new Float64Array(n);
+    const t = types && types[col];
+    let numeric = true;
+    if (t === 'int' || t === 'float') {
+      for (let i = 0; i < n; i++) {
+        const v = rows[i]?.[col];
+        num[i] = (typeof v === 'number') ? v : NaN;
+      }
+    } else {
+      for (let i = 0; i < n; i++) {
+        const v = rows[i]?.[col];
+        if (v == null || v === '') { num[i] = NaN; continue; }
+        const f = (typeof v === 'number') ? v : Number(v);
+        if (Number.isNaN(f)) { numeric = false; break; }
+        num[i] = f;
+      }
+    }
+    ord = new Uint32Array(n);
+    for (let i = 0; i < n; i++) ord[i] = i;
+    const sign = (dir === 'desc') ? -1 : 1;
+
+    if (numeric) {
+      ord.sort((a, b) => {
+        const A = num[a], B = num[b];
+        const na = A !== A, nb = B !== B;   // NaN = blank
+        if (na || nb) return (na === nb) ? a - b : (na ? 1 : -1);
+        return (A < B) ? -sign : (A > B) ? sign : a - b;
+      });
+    } else {
+      const str = new Array(n);
+      const blank = new Uint8Array(n);
+      for (let i = 0; i < n; i++) {
+        const v = rows[i]?.[col];
+        blank[i] = (v == null || v === '') ? 1 : 0;
+        str[i] = blank[i] ? '' : String(v);
+      }
+      ord.sort((a, b) => {
+        if (blank[a] || blank[b]) return (blank[a] === blank[b]) ? a - b : (blank[a] ? 1 : -1);
+        const A = str[a], B = str[b];
+        return (A < B) ? -sign : (A > B) ? sign : a - b;
+      });
+    }
+    orders.set(ck, ord);
+    return ord;
+  }
+
+  function query(msg) {
+    const t0 = performance.now();
+    const n = rows.length;
+    const q = String(msg.q || '').trim().toLowerCase();
+    const posSet = (msg.positions && msg.positions.length) ? new Set(msg.positions.map(String)) : null;
+
+    if (q && (!idLower || idLower[0] !== msg.idKey)) {
+      const k = msg.idKey;
+      idLower = [k, rows.map(r => String(r?.[k] ?? '').toLowerCase())];
+    }
+    if (posSet && !posCol) {
+      posCol = rows.map(r => { const p = r?.Position || r?.position || null; return p ? String(p) : null; });
+    }
+
+    const ord = msg.sortKey ? orderFor(msg.sortKey, msg.sortDir === 'desc' ? 'desc' : 'asc') : null;
+    const ids = q ? idLower[1] : null;
+    const out = new Uint32Array(n);
+    let k = 0;
+    for (let j = 0; j < n; j++) {
+      const i = ord ? ord[j] : j;
+      if (ids && !ids[i].includes(q)) continue;
+      if (posSet && !(posCol[i] && posSet.has(posCol[i]))) continue;
+      out[k++] = i;
+    }
+    order = out.slice(0, k);
+    return { count: k, ms: performance.now() - t0 };
+  }
+
+  function cellText(v) {
+    return (v == null) ? '' : (typeof v === 'object' ? JSON.stringify(v) : String(v));
+  }
+
+  // Cell text for order[first..last) and the given columns: only the rows
+  // the viewer is drawing cross the thread boundary.
+  function slice(msg) {
+    const first = Math.max(0, msg.first | 0), last = Math.min(order.length, msg.last | 0);
+    const cols = msg.cols || [];
+    const cells = [];
+    for (let j = first; j < last; j++) {
+      const r = rows[order[j]];
+      cells.push(cols.map(c => cellText(r?.[c])));
+    }
+    return { cells };
+  }
+
+  // ---------- Live row diffs ----------
+  function rowKey(r, key) { return String(r?.[key] ?? '') + '|' + String(r?.GameID ?? ''); }
+
+  function applyRowDiff(d) {
+    // d = { key, added:[rows], changed:[rows], removed:[[id, gameId]] }
+    let data = rows.slice();
+    const idx = new Map();
+    data.forEach((r, i) => idx.set(rowKey(r, d.key), i));
+    (d.changed || []).forEach(r => {
+      const i = idx.get(rowKey(r, d.key));
+      if (i != null) data[i] = compute(r); else data.push(compute(r));
+    });
+    (d.added || []).forEach(r => data.push(compute(r)));
+    if ((d.removed || []).length) {
+      const gone = new Set(d.removed.map(k => String(k[0] ?? '') + '|' + String(k[1] ?? '')));
+      data = data.filter(r => !gone.has(rowKey(r, d.key)));
+    }
+    reset(data);
+  }
+
+  // ---------- Week cache (memory + IndexedDB) ----------
+  let dbp = null;
+  function db() {
+    if (!dbp) {
+      dbp = new Promise((resolve) => {
+        if (!self.indexedDB) return resolve(null);
+        try {
+          const rq = indexedDB.open(DB_NAME, 1);
+          rq.onupgradeneeded = () => rq.result.createObjectStore(STORE, { keyPath: 'url' }).createIndex('at', 'at');
+          rq.onsuccess = () => resolve(rq.result);
+          rq.onerror = rq.onblocked = () => resolve(null);
+        } catch { resolve(null); }
+      });
+    }
+    return dbp;
+  }
+
+  // Run fn(store) in one transaction; resolves with the request's result
+  // (or undefined on any failure: the cache is best-effort).
+  async function idb(mode, fn) {
+    const d = await db();
+    if (!d) return undefined;
+    return new Promise((resolve) => {
+      try {
+        const tx = d.transaction(STORE, mode);
+        const rq = fn(tx.objectStore(STORE));
+        tx.oncomplete = () => resolve(rq ? rq.result : undefined);
+        tx.onerror = tx.onabort = () => resolve(undefined);
+      } catch { resolve(undefined); }
+    });
+  }
+
+  function idbPut(url, etag, doc) {
+    return idb('readwrite', (s) => {
+      s.put({ url, etag, doc, at: Date.now() });
+      const c = s.count();
+      c.onsuccess = () => {
+        let extra = c.result - IDB_MAX_WEEKS;
+        if (extra <= 0) return;
+        s.index('at').openCursor().onsuccess = (e) => {
+          const cur = e.target.result;
+          if (cur && extra-- > 0) { cur.delete(); cur.continue(); }
+        };
+      };
+      return null;
+    });
+  }
+
+  function remember(url, etag, doc) {
+    mem.delete(url);
+    mem.set(url, { etag, doc });
+    while (mem.size > MEM_WEEKS) mem.delete(mem.keys().next().value);
+  }
+
+  function getWeek(url, etag) {
+    const k = url + '|' + (etag || '');
+    let p = inflight.get(k);
+    if (!p) {
+      p = fetchWeek(url, etag).finally(() => inflight.delete(k));
+      inflight.set(k, p);
+    }
+    return p;
+  }
+
+  async function fetchWeek(url, etag) {
+    const m = mem.get(url);
+    if (m && etag && m.etag === etag) { remember(url, m.etag, m.doc); return { status: 200, etag, doc: m.doc, from: 'memory' }; }
+    const c = m ? null : await idb('readonly', (s) => s.get(url));
+    if (c && etag && c.etag === etag) { remember(url, c.etag, c.doc); return { status: 200, etag, doc: c.doc, from: 'idb' }; }
+
+    const have = m || c;
+    const headers = (have && have.etag) ? { 'If-None-Match': have.etag } : {};
+    const r = await fetch(url, { cache: 'no-store', headers });
+    if (r.status === 304 && have) {
+      remember(url, have.etag, have.doc);
+      return { status: 200, etag: have.etag, doc: have.doc, from: 'revalidated' };
+    }
+    if (!r.ok) return { status: r.status };
+    const doc = await r.json();
+    const et = r.headers.get('ETag');
+    if (et) idbPut(url, et, doc);   // cloned at put(); scoring below doesn't leak in
+    remember(url, et, doc);
+    return { status: r.status, etag: et, doc, from: 'network' };
+  }
+
+  async function load(msg) {
+    const gen = ++loadGen;
+    const w = await getWeek(msg.url, msg.etag);
+    if (gen !== loadGen) return { stale: true };
+    if (!w.doc) { reset([]); return { status: w.status }; }
+    view = msg.view;
+    types = msg.types || null;
+    let data = w.doc[ARRAYS[msg.sport][msg.view]] || [];
+    if (!Array.isArray(data)) data = [];
+    reset(data.map(compute));
+    return { status: w.status, etag: w.etag, from: w.from, total: rows.length, keys: sampleKeys() };
+  }
+
+  async function prefetch(msg) {
+    const gen = ++prefetchGen;
+    let fetched = 0;
+    for (const it of (msg.items || [])) {
+      if (gen !== prefetchGen) break;
+      const m = mem.get(it.url);
+      if (m && it.etag && m.etag === it.etag) continue;
+      try {
+        const w = await getWeek(it.url, it.etag);
+        if (w.from === 'network') fetched++;
+      } catch {}
+    }
+    return { fetched };
+  }
+
+  const handlers = {
+    load,
+    prefetch,
+    diff(msg) { applyRowDiff(msg.diff); return { total: rows.length, keys: sampleKeys() }; },
+    query,
+    slice
+  };
+
+  self.onmessage = async (e) => {
+    const msg = e.data || {};
+    try {
+      const res = await handlers[msg.type](msg);
+      const transfer = res.transfer || [];
+      delete res.transfer;
+      self.postMessage(Object.assign({ id: msg.id, ok: true }, res), transfer);
+    } catch (err) {
+      self.postMessage({ id: msg.id, ok: false, error: String(err && err.message || err) });
+    }
+  };
+})();
@@ -1,5 +1,5 @@
 (function () {
-  const PAGE_SIZE = 50;
+  const ROW_OVERSCAN = 10;   // rows rendered above/below the visible window
   const ARRAYS = {
     nfl: { team: 'NFLTeamGameStats', player: 'NFLPlayerGameStats' },
     cfb: { team: 'CFBTeamGameStats', player: 'CFBPlayerGameStats' }
@@ -23,6 +23,7 @@
   const thead    = $('thead');
   const tbody    = $('tbody');
   const tbl      = $('.sv-table');
+  const wrap     = $('.sv-table-wrap');
   const emptyMsg = $('.sv-empty');
   const pagePrev = $('.sv-page-prev');
   const pageNext = $('.sv-page-next');
@@ -34,14 +35,37 @@
     year: null,
     week: null,
     view: 'team',
-    data: [],
-    filtered: [],
+    total: 0,                    // rows of the loaded week (held by the worker)
+    keys: [],                    // column names seen in the first rows
+    count: 0,                    // rows left after filtering (order held by the worker)
+    cols: [],
     sortKey: null,
     sortDir: 'asc',
-    page: 1,
-    idKey: null
+    idKey: null,
+    etag: null
   };
 
+  // ---------- Worker (fetch, scoring, sort keys, filtering) ----------
+  // Rows live in viewer-worker.js; a query comes back as a row count and
+  // the table asks for the cell text of just the rows it draws, so neither
+  // a sort/keystroke nor a week switch moves the whole week to this thread.
+  const worker = new Worker(el.dataset.worker || '/static/js/viewer-worker.js');
+  const pending = new Map();
+  let callSeq = 0, querySeq = 0;
+  worker.onmessage = (e) => {
+    const m = e.data, p = pending.get(m.id);
+    if (!p) return;
+    pending.delete(m.id);
+    m.ok ? p.resolve(m) : p.reject(new Error(m.error));
+  };
+  function call(type, msg) {
+    const id = ++callSeq;
+    return new Promise((resolve, reject) => {
+      pending.set(id, { resolve, reject });
+      worker.postMessage(Object.assign({ id, type }, msg || {}));
+    });
+  }
+
   // Positions UI state
   const PositionState = {
     selected: new Set(),
@@ -129,10 +153,21 @@
   }
 
   function yyww(y, w) { return String(y % 100).padStart(2,'0') + String(w).padStart(2,'0'); }
-  function fileUrl() {
+  function fileUrl(year = state.year, week = state.week) {
     if (!M) return null;
-    const map = (M.files[state.sport] && M.files[state.sport][state.year]) || {};
-    return map[yyww(state.year, state.week)] || null;
+    const map = (M.files[state.sport] && M.files[state.sport][year]) || {};
+    return map[yyww(year, week)] || null;
+  }
+  // Season schema catalog for the current view (columns, types, ID key),
+  // computed at processing time and served in the manifest
+  function catalog() {
+    const s = M && M.schema && M.schema[state.sport] && M.schema[state.sport][state.year];
+    const a = s && s.arrays && s.arrays[ARRAYS[state.sport][state.view]];
+    return (a && Array.isArray(a.columns)) ? a : null;
+  }
+  function fileEtag(year = state.year, week = state.week) {
+    const map = (M && M.etags && M.etags[state.sport] && M.etags[state.sport][year]) || {};
+    return map[yyww(year, week)] || null;
   }
 
   async function fetchManifest() {
@@ -168,36 +203,60 @@
     weekSel.value = String(state.week);
   }
 
-  async function loadData() {
+  async function loadData(keepPage) {
     const url = fileUrl();
     if (!url) return showEmpty('No data for this selection.');
-    const r = await fetch(url, { cache: 'no-store' });
-    if (!r.ok) return showEmpty('Failed to load data.');
-    const json = await r.json();
-    const arrName = ARRAYS[state.sport][state.view];
-    let rows = json[arrName] || [];
-    if (!Array.isArray(rows)) rows = [];
-    // compute columns (player/team)
-    rows = rows.map(row => state.view === 'player' ? computePlayer(row) : computeTeam(row));
-    state.data = rows;
-    state.page = 1;
-    state.idKey = (state.view === 'team') ? 'TeamID' : 'ID';
-    const cols = deriveColumns(rows);
-    applyFilterAndRender(cols);
+    const cat = catalog();
+    let res;
+    try {
+      res = await call('load', {
+        url: new URL(url, location.href).href, etag: fileEtag(),
+        sport: state.sport, view: state.view,
+        types: cat ? Object.fromEntries(cat.columns.map(c => [c.name, c.type])) : null
+      });
+    } catch (err) {
+      return showEmpty('Failed to load data.');
+    }
+    if (res.stale) return;   // superseded by a later week/view switch
+    if (res.status < 200 || res.status >= 300) return showEmpty('Failed to load data.');
+    state.etag = res.etag;
+    state.total = res.total;
+    state.keys = cat ? cat.columns.map(c => c.name).sort() : res.keys;
+    if (!keepPage) wrap.scrollTop = 0;
+    state.idKey = (cat && cat.id_key) || ((state.view === 'team') ? 'TeamID' : 'ID');
+    const cols = deriveColumns(state.keys);
+    await applyFilterAndRender(cols);
+    schedulePrefetch();
+  }
+
+  // Warm the worker's week cache with the weeks prev/next would open
+  // (the other view is the same file, already held in memory).
+  function schedulePrefetch() {
+    const idle = window.requestIdleCallback || ((cb) => setTimeout(cb, 200));
+    idle(() => {
+      const items = [];
+      for (const d of [1, -1]) {
+        const n = stepWeek(state.year, state.week, d);
+        if (!n || (n.year === state.year && n.week === state.week)) continue;
+        const url = fileUrl(n.year, n.week);
+        if (url) items.push({ url: new URL(url, location.href).href, etag: fileEtag(n.year, n.week) });
+      }
+      if (items.length) call('prefetch', { items }).catch(() => {});
+    });
   }
 
   function showEmpty(msg) {
-    thead.innerHTML = ''; tbody.innerHTML = '';
+    state.total = 0; state.count = 0; state.cols = [];
+    thead.innerHTML = ''; headSig = ''; resetBody();
     tbl.style.display = 'none';
     emptyMsg.textContent = msg || 'No data'; emptyMsg.style.display = 'block';
     pageInfo.textContent = '';
   }
 
-function deriveColumns(rows) {
-  // Start with auto
-  const set = new Set();
-  rows.slice(0, 200).forEach(r => Object.keys(r).forEach(k => set.add(k)));
-  let cols = Array.from(set).sort();
+function deriveColumns(keys) {
+  // Start with auto (catalog columns, or keys of the first rows when the
+  // manifest has no catalog for this season)
+  let cols = keys.slice();
 
   // id first
   cols = ensureIdFirst(cols, state.idKey);
@@ -216,146 +275,145 @@ function deriveColumns(rows) {
   }
   return cols;
 }
-  // ---------- Calculations (edit freely) ----------
-  function computePlayer(row) {
-    // Read from both NFL/CFB naming variants you’ve seen
-    const pyds = Number(row.PassingYards ?? row.PassingYds ?? 0);
-    const ptd  = Number(row.PassingTDs ?? row.PassingTouchdowns ?? 0);
-    const pint = Number(row.Interceptions ?? row.PassingInterceptions ?? 0);
-
-    const ryds = Number(row.RushingYards ?? 0);
-    const rtd  = Number(row.RushingTDs ?? row.RushingTouchdowns ?? 0);
-    const rff  = Number(row.Fumbles ?? row.RushingFumbles ?? 0);
-
-    const rec   = Number(row.Catches ?? row.ReceivingCatches ?? 0);
-    const recyd = Number(row.ReceivingYards ?? 0);
-    const rectd = Number(row.ReceivingTDs ?? row.ReceivingTouchdowns ?? 0);
-    const recff = Number(row.ReceivingFumbles ?? 0);
-
-    const fg = Number(row.FGMade ?? 0);
-    const xp = Number(row.ExtraPointsMade ?? 0);
-
-
-    row.Calc_PassingPoints   = Math.round((pyds/25), 1) + (ptd * 4) + (pint * -2);
-    row.Calc_RushingPoints   = Math.round((ryds/10), 1) + (rtd * 6) + (rff * -2);
-    row.Calc_KickingPoints = (fg * 3) + (xp * 1)
-    row.Calc_ReceivingPoints = rec + Math.round((recyd/10), 1) + (rectd * 6) + (recff * -2);
-    row.Calc_TotalPoints = row.Calc_PassingPoints + row.Calc_RushingPoints + row.Calc_ReceivingPoints + row.Calc_KickingPoints;
-    return row;
-  }
-
-  function computeTeam(row) {
-    const sacks = Number(row.SacksMade ?? 0);
-    const ints  = Number(row.InterceptionsCaught ?? 0);
-    const fRec  = Number(row.RecoveredFumbles ?? 0);
-    const saf   = Number(row.Safeties ?? 0);
-    const dtd   = Number(row.DefensiveTDs ?? 0);
-    const ktd   = Number(row.KickReturnTDs ?? 0);
-    const ptd   = Number(row.PuntReturnTDs ?? 0);
-
-    const q1 = Number(row.Score1Q ?? 0), q2 = Number(row.Score2Q ?? 0),
-          q3 = Number(row.Score3Q ?? 0), q4 = Number(row.Score4Q ?? 0),
-          q5 = Number(row.Score5Q ?? 0), q6 = Number(row.Score6Q ?? 0),
-          q7 = Number(row.Score7Q ?? 0), ot = Number(row.ScoreOT ?? 0);
-
-    const ptsAllowed = q1+q2+q3+q4+q5+q6+q7+ot;
-
-    let pointsScore = 0;
-    if (ptsAllowed === 0) pointsScore = 10;
-    else if (ptsAllowed <= 6) pointsScore = 7;
-    else if (ptsAllowed <= 13) pointsScore = 4;
-    else if (ptsAllowed <= 20) pointsScore = 1;
-    else if (ptsAllowed <= 27) pointsScore = 0;
-    else if (ptsAllowed <= 34) pointsScore = -1;
-    else if (ptsAllowed >= 35) pointsScore = -4;
-
-    row.Calc_DefensiveScore = (sacks*1) + (ints*2) + (fRec*2) + (saf*2) + (dtd*6);
-    row.Calc_ReturnScore    = (ktd + ptd) * 6;
-    row.Calc_PointsScore    = pointsScore;
-    row.Calc_TotalTeamScore = row.Calc_DefensiveScore + row.Calc_ReturnScore + row.Calc_PointsScore;
-    return row;
-  }
-  // ---------- /Calculations ----------
-
-  function applyFilterAndRender(cols) {
-    const q = (searchIn.value || '').trim().toLowerCase();
-    if (q) {
-      const k = state.idKey;
-      state.filtered = state.data.filter(r => String(r?.[k] ?? '').toLowerCase().includes(q));
-    } else {
-      state.filtered = state.data.slice();
-    }
-    // filter by position (player view only)
-    if (state.view === 'player' && PositionState.selected.size > 0) {
-      state.filtered = state.filtered.filter(r => {
-        const p = r?.Position || r?.position || null;
-        return p && PositionState.selected.has(String(p));
-      });
-    }
-    // sort
-    if (state.sortKey) {
-      const k = state.sortKey, dir = (state.sortDir === 'desc') ? -1 : 1;
-      state.filtered.sort((a,b)=>{
-        const A = a?.[k], B = b?.[k];
-        const na = (typeof A === 'number') || (!isNaN(parseFloat(A)) && A !== '' && A != null);
-        const nb = (typeof B === 'number') || (!isNaN(parseFloat(B)) && B !== '' && B != null);
-        const va = na ? parseFloat(A) : String(A ?? '');
-        const vb = nb ? parseFloat(B) : String(B ?? '');
-        if (va < vb) return -1*dir;
-        if (va > vb) return  1*dir;
-        return 0;
-      });
-    }
-    renderTable(cols, pageRows());
-    renderPager();
-  }
-
-  function renderTable(cols, rows) {
-    emptyMsg.style.display = rows.length ? 'none' : 'block';
-    tbl.style.display = rows.length ? 'table' : 'none';
-    thead.innerHTML = '';
-    const trh = document.createElement('tr');
-    cols.forEach(c => {
-      const th = document.createElement('th');
-      th.textContent = c; th.dataset.key = c;
-      th.className = 'sv-sortable' + (state.sortKey === c ? (' ' + state.sortDir) : '');
-      th.addEventListener('click', () => {
-        if (state.sortKey === c) state.sortDir = (state.sortDir === 'asc') ? 'desc' : 'asc';
-        else { state.sortKey = c; state.sortDir = 'asc'; }
-        applyFilterAndRender(cols);
-      });
-      trh.appendChild(th);
+  // Scoring (computePlayer/computeTeam) runs in viewer-worker.js.
+
+  async function applyFilterAndRender(cols) {
+    state.cols = cols;
+    const seq = ++querySeq;
+    const positions = (state.view === 'player') ? Array.from(PositionState.selected) : [];
+    const res = await call('query', {
+      q: searchIn.value || '',
+      idKey: state.idKey,
+      positions,
+      sortKey: state.sortKey,
+      sortDir: state.sortDir
     });
-    thead.appendChild(trh);
+    if (seq !== querySeq) return;   // a newer keystroke/sort already went out
+    state.count = res.count;
+    renderHead(cols);
+    renderRows();
+  }
 
-    tbody.innerHTML = '';
-    const frag = document.createDocumentFragment();
-    rows.forEach(r => {
-      const tr = document.createElement('tr');
+  // ---------- Virtualized table ----------
+  // Only the rows in view (plus overscan) exist in the DOM. Spacer rows keep
+  // the scroll height; row and cell nodes are pooled and only their text is
+  // rewritten as the window moves. Rows are one line (nowrap) so every row
+  // has the same measured height.
+  const topPad = document.createElement('tr');
+  const botPad = document.createElement('tr');
+  topPad.className = botPad.className = 'sv-pad';
+  topPad.appendChild(document.createElement('td'));
+  botPad.appendChild(document.createElement('td'));
+  const pool = [];
+  let rowH = 0, headSig = '', rafPending = false, sliceSeq = 0;
+
+  function resetBody() {
+    tbody.textContent = '';
+    pool.length = 0;
+    tbody.appendChild(topPad);
+    tbody.appendChild(botPad);
+  }
+  resetBody();
+
+  function renderHead(cols) {
+    const sig = cols.join('\u0000');
+    if (sig !== headSig) {
+      headSig = sig;
+      thead.textContent = '';
+      const trh = document.createElement('tr');
       cols.forEach(c => {
-        const td = document.createElement('td');
-        const v = r?.[c];
-        td.textContent = (v == null) ? '' : (typeof v === 'object' ? JSON.stringify(v) : String(v));
-        tr.appendChild(td);
+        const th = document.createElement('th');
+        th.textContent = c; th.dataset.key = c;
+        trh.appendChild(th);
       });
-      frag.appendChild(tr);
+      thead.appendChild(trh);
+      // column set changed: pooled rows have the wrong cell count
+      resetBody();
+      topPad.firstChild.colSpan = botPad.firstChild.colSpan = Math.max(1, cols.length);
+    }
+    thead.querySelectorAll('th').forEach(th => {
+      const c = th.dataset.key;
+      th.className = 'sv-sortable' + (state.sortKey === c ? (' ' + state.sortDir) : '');
     });
-    tbody.appendChild(frag);
   }
 
-  function pageRows() {
-    const start = (state.page - 1) * PAGE_SIZE;
-    return state.filtered.slice(start, start + PAGE_SIZE);
+  function poolRow(j, ncols) {
+    let tr = pool[j];
+    if (!tr) {
+      tr = document.createElement('tr');
+      for (let c = 0; c < ncols; c++) tr.appendChild(document.createElement('td'));
+      tbody.insertBefore(tr, botPad);
+      pool[j] = tr;
+    }
+    return tr;
+  }
+
+  async function renderRows() {
+    const n = state.count, cols = state.cols;
+    const seq = ++sliceSeq;
+    emptyMsg.style.display = n ? 'none' : 'block';
+    tbl.style.display = n ? 'table' : 'none';
+    if (!n) { emptyMsg.textContent = 'No data for this selection.'; renderPager(0, 0); return; }
+
+    if (!rowH) {
+      // measure once with a real row
+      const tr = poolRow(0, cols.length);
+      tr.firstChild.textContent = 'x';
+      rowH = tr.getBoundingClientRect().height || 32;
+    }
+    const viewH = wrap.clientHeight || 600;
+    const first = Math.max(0, Math.floor(wrap.scrollTop / rowH) - ROW_OVERSCAN);
+    const last = Math.min(n, first + Math.ceil(viewH / rowH) + 2 * ROW_OVERSCAN);
+    const { cells } = await call('slice', { first, last, cols });
+    if (seq !== sliceSeq || cols !== state.cols) return;   // a newer scroll/query already went out
+
+    topPad.firstChild.style.height = (first * rowH) + 'px';
+    botPad.firstChild.style.height = ((n - last) * rowH) + 'px';
+    topPad.style.display = first ? '' : 'none';
+    botPad.style.display = (last < n) ? '' : 'none';
+
+    for (let j = 0; j < cells.length; j++) {
+      const tr = poolRow(j, cols.length);
+      const row = cells[j];
+      tr.style.display = '';
+      let td = tr.firstChild;
+      for (let c = 0; c < cols.length; c++, td = td.nextSibling) {
+        const t = row[c];
+        if (td.textContent !== t) td.textContent = t;
+      }
+    }
+    for (let j = cells.length; j < pool.length; j++) pool[j].style.display = 'none';
+    renderPager(first, last, n);
   }
-  function renderPager() {
-    const total = state.filtered.length;
-    const pages = Math.max(1, Math.ceil(total / PAGE_SIZE));
-    if (state.page > pages) state.page = pages;
-    pageInfo.textContent = `Page ${state.page} of ${pages} • ${total} row(s)`;
-    pagePrev.disabled = (state.page <= 1);
-    pageNext.disabled = (state.page >= pages);
+
+  function renderPager(first, last, total) {
+    if (!total) {
+      pageInfo.textContent = '0 row(s)';
+      pagePrev.disabled = pageNext.disabled = true;
+      return;
+    }
+    const top = Math.min(total, Math.floor(wrap.scrollTop / rowH) + 1);
+    const bottom = Math.min(total, Math.floor((wrap.scrollTop + wrap.clientHeight) / rowH));
+    pageInfo.textContent = `Rows ${top}–${Math.max(top, bottom)} of ${total}`;
+    pagePrev.disabled = (wrap.scrollTop <= 0);
+    pageNext.disabled = (wrap.scrollTop + wrap.clientHeight >= wrap.scrollHeight - 1);
   }
 
+  wrap.addEventListener('scroll', () => {
+    if (rafPending) return;
+    rafPending = true;
+    requestAnimationFrame(() => { rafPending = false; renderRows(); });
+  }, { passive: true });
+
+  thead.addEventListener('click', (e) => {
+    const th = e.target.closest('th');
+    if (!th) return;
+    const c = th.dataset.key;
+    if (state.sortKey === c) state.sortDir = (state.sortDir === 'asc') ? 'desc' : 'asc';
+    else { state.sortKey = c; state.sortDir = 'asc'; }
+    applyFilterAndRender(state.cols);
+  });
+
   function syncButtons() {
     btnSport.forEach(b => b.classList.toggle('active', b.dataset.sport === state.sport));
     btnView.forEach(b => b.classList.toggle('active', b.dataset.view === state.view));
@@ -378,34 +436,90 @@ function deriveColumns(rows) {
       state.week = (ge != null ? ge : avail[avail.length-1]);
     }
   }
-  function nextWeek(delta) {
-    const avail = (M.weeks[state.sport][state.year] || []).slice().sort((a,b)=>a-b);
-    if (!avail.length) return;
-    let i = avail.indexOf(state.week);
-    if (i === -1) { state.week = avail[avail.length-1]; return; }
+  // {year, week} one step from (year, week), hopping across season ends
+  function stepWeek(year, week, delta) {
+    const avail = (M.weeks[state.sport][year] || []).slice().sort((a,b)=>a-b);
+    if (!avail.length) return null;
+    let i = avail.indexOf(week);
+    if (i === -1) return { year, week: avail[avail.length-1] };
     i += delta;
     if (i < 0) {
       // hop to prev year end
       const ys = (M.years[state.sport] || []).slice().sort((a,b)=>a-b);
-      const j = Math.max(0, ys.indexOf(state.year) - 1);
-      state.year = ys[j];
-      const av = (M.weeks[state.sport][state.year] || []).slice().sort((a,b)=>a-b);
-      state.week = av.length ? av[av.length-1] : null;
+      const y = ys[Math.max(0, ys.indexOf(year) - 1)];
+      const av = (M.weeks[state.sport][y] || []).slice().sort((a,b)=>a-b);
+      return { year: y, week: av.length ? av[av.length-1] : null };
     } else if (i >= avail.length) {
       // hop to next year start
       const ys = (M.years[state.sport] || []).slice().sort((a,b)=>a-b);
-      const j = Math.min(ys.length-1, ys.indexOf(state.year) + 1);
-      state.year = ys[j];
-      const av = (M.weeks[state.sport][state.year] || []).slice().sort((a,b)=>a-b);
-      state.week = av.length ? av[0] : null;
-    } else {
-      state.week = avail[i];
+      const y = ys[Math.min(ys.length-1, ys.indexOf(year) + 1)];
+      const av = (M.weeks[state.sport][y] || []).slice().sort((a,b)=>a-b);
+      return { year: y, week: av.length ? av[0] : null };
+    }
+    return { year, week: avail[i] };
+  }
+  function nextWeek(delta) {
+    const n = stepWeek(state.year, state.week, delta);
+    if (n) { state.year = n.year; state.week = n.week; }
+  }
+
+  // ---------- Live updates (SSE from /live) ----------
+  async function applyRowDiff(d) {
+    // d = { key, added:[rows], changed:[rows], removed:[[id, gameId]] }; applied in the worker
+    const res = await call('diff', { diff: d });
+    state.total = res.total;
+    if (res.keys) state.keys = res.keys;
+  }
+
+  function noteNewWeek(ev) {
+    // a week we have never seen: extend the manifest so selects/nav include it
+    const wk = parseInt(String(ev.yyww).slice(2), 10);
+    M.etags = M.etags || {};
+    M.etags[ev.sport] = M.etags[ev.sport] || {};
+    M.etags[ev.sport][ev.year] = M.etags[ev.sport][ev.year] || {};
+    if (ev.etag) M.etags[ev.sport][ev.year][ev.yyww] = ev.etag;
+    M.files[ev.sport] = M.files[ev.sport] || {};
+    M.files[ev.sport][ev.year] = M.files[ev.sport][ev.year] || {};
+    if (M.files[ev.sport][ev.year][ev.yyww]) return;
+    M.files[ev.sport][ev.year][ev.yyww] = `/data/processed/${ev.sport}/${ev.year}/${ev.yyww}.json`;
+    M.years[ev.sport] = M.years[ev.sport] || [];
+    if (!M.years[ev.sport].includes(ev.year)) M.years[ev.sport].push(ev.year);
+    M.weeks[ev.sport] = M.weeks[ev.sport] || {};
+    M.weeks[ev.sport][ev.year] = M.weeks[ev.sport][ev.year] || [];
+    if (!M.weeks[ev.sport][ev.year].includes(wk)) M.weeks[ev.sport][ev.year].push(wk);
+    if (ev.sport === state.sport) {
+      const y = state.year, w = state.week;
+      populateYearsWeeks();
+      state.year = y; state.week = w; syncButtons();
     }
   }
 
+  async function onWeekEvent(ev) {
+    if (!M) return;
+    noteNewWeek(ev);
+    const current = ev.sport === state.sport && ev.year === state.year && ev.yyww === yyww(state.year, state.week);
+    if (!current || ev.etag === state.etag) return;
+    const d = ev.rows && ev.rows[ARRAYS[state.sport][state.view]];
+    if (!d || !state.total) return loadData(true);
+    await applyRowDiff(d);
+    state.etag = ev.etag;
+    applyFilterAndRender(currentColumns());
+  }
+
+  function subscribeLive() {
+    if (!window.EventSource) return;
+    const es = new EventSource('/live?rows=1');
+    es.addEventListener('week', e => {
+      try { onWeekEvent(JSON.parse(e.data)); } catch (err) { console.warn('[viewer] live event', err); }
+    });
+    es.addEventListener('resync', async () => {
+      try { await fetchManifest(); populateYearsWeeks(); syncButtons(); await loadData(true); } catch {}
+    });
+  }
+
   function currentColumns() {
     // derive from current data or position preset
-    const columns = deriveColumns(state.data || []);
+    const columns = deriveColumns(state.keys || []);
     return columns;
   }
 
@@ -447,11 +561,8 @@ function deriveColumns(rows) {
   yearSel.addEventListener('change', async () => { state.year = parseInt(yearSel.value,10); populateWeeksForYear(); syncButtons(); await loadData(); });
   weekSel.addEventListener('change', async () => { state.week = parseInt(weekSel.value,10); syncButtons(); await loadData(); });
   searchIn.addEventListener('input', () => applyFilterAndRender(currentColumns()));
-  pagePrev.addEventListener('click', () => { if (state.page>1){ state.page--; renderPager(); renderTable(currentColumns(), pageRows()); }});
-  pageNext.addEventListener('click', () => {
-    const total = state.filtered.length; const pages = Math.max(1, Math.ceil(total/50));
-    if (state.page < pages){ state.page++; renderPager(); renderTable(currentColumns(), pageRows()); }
-  });
+  pagePrev.addEventListener('click', () => { wrap.scrollTop -= Math.max(rowH, wrap.clientHeight - rowH); });
+  pageNext.addEventListener('click', () => { wrap.scrollTop += Math.max(rowH, wrap.clientHeight - rowH); });
 
   // Init
   (async function init(){
@@ -464,5 +575,6 @@ function deriveColumns(rows) {
     populateYearsWeeks();
     syncButtons();
     await loadData();
+    subscribeLive();
   })();
 })();
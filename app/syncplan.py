@@ -0,0 +1,450 @@
+# app/syncplan.py
+import os, time, uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import settings
+from .util import ensure_dir, atomic_write
+from . import jsonio, workqueue
+
+try:
+    import fcntl  # POSIX only
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+# Durable work plan for run_sync, so an interrupted backfill resumes where
+# it stopped instead of starting over from the first NFL week.
+#
+#   {DATA_ROOT}/sync/plan.json            {id, created, params, items: [[sport, year, week], ...]}
+#   {DATA_ROOT}/sync/journal.jsonl        one line per finished item, plus segment start/end lines
+#   {DATA_ROOT}/sync/cancel               cooperative cancel flag (POST /admin/sync/cancel)
+#   {DATA_ROOT}/sync/.lock                flock held while a segment runs (shared for distributed workers)
+#   {DATA_ROOT}/sync/.plan.lock           flock around plan creation / segment numbering
+#   {DATA_ROOT}/sync/history/{id}.json    merged summary of each finished plan
+#
+# A "segment" is one run_sync call working through the plan. Every item
+# outcome is appended (and fsync'd) before the next item starts, so a
+# killed container loses at most the item in flight. The next run_sync
+# with the same parameters replays the journal and continues with what is
+# left; items that failed transiently (timeouts, 429/5xx, open circuit)
+# count as not done and are retried, up to SYNC_ITEM_MAX_ATTEMPTS real
+# attempts (an open circuit doesn't fetch, so it doesn't count). After
+# that the item is given up, so one week that keeps failing upstream
+# can't hold the plan open and pin every scheduled sync to it; the next
+# plan tries it again. The summary is rebuilt from the journal, so it
+# covers every segment of the plan.
+#
+# Distributed runs (run_sync(distributed=True) on several workers sharing
+# the volume) hold the segment lock shared instead of exclusive and claim
+# each item through a workqueue lease named after the plan, so every
+# worker appends to the same journal without duplicating items.
+
+TRANSIENT_REASONS = ("timeout", "connection_error", "http_429", "http_5", "circuit_open", "write_error")
+
+
+class SyncBusy(RuntimeError):
+    """Another process is already running a segment of the plan."""
+
+
+def _dir(root: Optional[str] = None) -> str:
+    return os.path.join(root or settings.DATA_ROOT, "sync")
+
+
+def _now() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def item_key(sport: str, year: int, yyww: str) -> str:
+    return f"{sport}/{year}/{yyww}"
+
+
+def is_transient(reason: Optional[str]) -> bool:
+    return bool(reason) and any(reason.startswith(t) for t in TRANSIENT_REASONS)
+
+
+def is_done(entry: Dict[str, Any]) -> bool:
+    """Finished, or failed transiently SYNC_ITEM_MAX_ATTEMPTS times (given up)."""
+    return not is_transient(entry.get("reason")) or gave_up(entry)
+
+
+def gave_up(entry: Dict[str, Any]) -> bool:
+    return is_transient(entry.get("reason")) and entry.get("attempts", 0) >= _max_attempts()
+
+
+def _max_attempts() -> int:
+    return max(1, settings.SYNC_ITEM_MAX_ATTEMPTS)
+
+
+def _counts(reason: Optional[str]) -> bool:
+    """A transient failure that used an attempt (an open circuit never fetched)."""
+    return is_transient(reason) and not reason.startswith("circuit_open")
+
+
+# ---------- Plan files ----------
+
+def load(root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    plan = jsonio.load_file(os.path.join(_dir(root), "plan.json"))
+    return plan if isinstance(plan, dict) and plan.get("items") is not None else None
+
+
+def journal(root: Optional[str] = None) -> List[Dict[str, Any]]:
+    out = []
+    try:
+        with open(os.path.join(_dir(root), "journal.jsonl"), "rb") as f:
+            for line in f:
+                try:
+                    out.append(jsonio.loads(line))
+                except Exception:
+                    continue   # torn last line after a crash
+    except OSError:
+        pass
+    return out
+
+
+def _append(root: Optional[str], entry: Dict[str, Any]) -> None:
+    d = _dir(root)
+    ensure_dir(d)
+    with open(os.path.join(d, "journal.jsonl"), "ab") as f:
+        f.write(jsonio.dumps(entry) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _state(entries: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]], bool]:
+    """
+    (last outcome per item key, segments, complete) from journal entries.
+    Each outcome carries "attempts": transient failures of that item so far.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    attempts: Dict[str, int] = {}
+    segments: List[Dict[str, Any]] = []
+    complete = False
+    for e in entries:
+        ev = e.get("event")
+        if ev == "item":
+            if _counts(e.get("reason")):
+                attempts[e["key"]] = attempts.get(e["key"], 0) + 1
+            results[e["key"]] = dict(e, attempts=attempts.get(e["key"], 0))
+        elif ev == "segment_start":
+            segments.append({"segment": e.get("segment"), "started": e.get("t"), "pid": e.get("pid"),
+                             "host": e.get("host"), "shared": bool(e.get("shared"))})
+        elif ev == "segment_end":
+            for seg in reversed(segments):
+                if seg["segment"] == e.get("segment"):
+                    seg.update({k: v for k, v in e.items() if k not in ("event", "t")}, ended=e.get("t"))
+                    break
+        elif ev == "complete":
+            complete = True
+    return results, segments, complete
+
+
+@contextmanager
+def _plan_lock(root: Optional[str]) -> Iterator[None]:
+    d = _dir(root)
+    ensure_dir(d)
+    fd = os.open(os.path.join(d, ".plan.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def queue_name(plan: Dict[str, Any]) -> str:
+    return f"sync-{plan['id']}"
+
+
+def open_plan(
+    params: Dict[str, Any],
+    items: Sequence[Tuple[str, int, int]],
+    fresh: bool = False,
+    root: Optional[str] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    The plan to work on: the unfinished one on disk when its params match
+    (resumed=True), else a new plan (the old one is archived first).
+    While a run is active a matching plan is always joined, so distributed
+    workers started with fresh=True don't each start their own plan.
+    """
+    with _plan_lock(root):
+        plan = load(root)
+        if plan is not None and (not fresh or running(root)) and plan.get("params") == params:
+            _, _, complete = _state(journal(root))
+            if not complete:
+                return plan, True
+        return _new_plan(plan, params, items, root), False
+
+
+def _new_plan(
+    plan: Optional[Dict[str, Any]],
+    params: Dict[str, Any],
+    items: Sequence[Tuple[str, int, int]],
+    root: Optional[str],
+) -> Dict[str, Any]:
+    if plan is not None:
+        _archive(plan, root)
+    plan = {
+        "id": f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}",
+        "created": _now(),
+        "params": params,
+        "items": [[s, int(y), int(w)] for s, y, w in items],
+    }
+    d = _dir(root)
+    ensure_dir(d)
+    try:
+        os.remove(os.path.join(d, "journal.jsonl"))
+    except OSError:
+        pass
+    atomic_write(os.path.join(d, "plan.json"), jsonio.dumps(plan, indent=True))
+    return plan
+
+
+def _archive(plan: Dict[str, Any], root: Optional[str]) -> None:
+    hist = os.path.join(_dir(root), "history")
+    ensure_dir(hist)
+    try:
+        atomic_write(os.path.join(hist, f"{plan['id']}.json"), jsonio.dumps(summary(plan, root), indent=True))
+    except Exception as e:
+        print(f"[SYNC] could not archive plan {plan.get('id')}: {e}")
+    workqueue.drop(queue_name(plan), root)
+
+
+def pending(plan: Dict[str, Any], root: Optional[str] = None) -> List[Tuple[str, int, int]]:
+    """Plan items (in order) without a finished outcome in the journal."""
+    results, _, _ = _state(journal(root))
+    out = []
+    for sport, year, week in plan["items"]:
+        r = results.get(item_key(sport, year, f"{year % 100:02d}{week:02d}"))
+        if r is None or not is_done(r):
+            out.append((sport, year, week))
+    return out
+
+
+# ---------- Cancel + running ----------
+
+def request_cancel(root: Optional[str] = None) -> bool:
+    """Ask the running segment to stop after its current item; False if nothing runs."""
+    if not running(root):
+        return False
+    d = _dir(root)
+    ensure_dir(d)
+    atomic_write(os.path.join(d, "cancel"), _now().encode())
+    return True
+
+
+def cancel_requested(root: Optional[str] = None) -> bool:
+    return os.path.exists(os.path.join(_dir(root), "cancel"))
+
+
+def _clear_cancel(root: Optional[str]) -> None:
+    try:
+        os.remove(os.path.join(_dir(root), "cancel"))
+    except OSError:
+        pass
+
+
+def running(root: Optional[str] = None) -> bool:
+    """True while some process (any container on this volume) holds the segment lock."""
+    if fcntl is None:
+        return False
+    path = os.path.join(_dir(root), ".lock")
+    if not os.path.exists(path):
+        return False
+    fd = os.open(path, os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(fd)
+
+
+class Segment:
+    """One run_sync pass over the plan's pending items."""
+
+    def __init__(self, plan: Dict[str, Any], number: int, root: Optional[str],
+                 attempts: Optional[Dict[str, int]] = None):
+        self.plan = plan
+        self.number = number
+        self.root = root
+        self.attempts = attempts or {}   # transient attempts per item key, replayed once at start
+        self.recorded = 0
+        self.outcome: Dict[str, Any] = {"status": "interrupted"}
+
+    def cancelled(self) -> bool:
+        return cancel_requested(self.root)
+
+    def record(self, sport: str, year: int, yyww: str, raw: Optional[str], processed: Optional[str], reason: Optional[str]) -> bool:
+        """Journal an item outcome; True if the item is finished (done or given up)."""
+        key = item_key(sport, year, yyww)
+        _append(self.root, {
+            "event": "item", "key": key, "segment": self.number,
+            "raw": raw, "processed": processed, "reason": reason, "t": time.time(),
+        })
+        self.recorded += 1
+        if not is_transient(reason):
+            return True
+        if _counts(reason):
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+        if self.attempts.get(key, 0) >= _max_attempts():
+            print(f"[SYNC] giving up on {key} after {self.attempts[key]} attempts ({reason})")
+            return True
+        return False
+
+
+@contextmanager
+def segment(plan: Dict[str, Any], root: Optional[str] = None, shared: bool = False) -> Iterator[Segment]:
+    """
+    Hold the segment lock (SyncBusy if another run holds it) and bracket
+    the pass with start/end journal lines. The caller sets seg.outcome
+    (status, abort reason, rate/circuit stats) before leaving.
+    shared=True lets distributed workers run segments side by side (still
+    excluding a plain run); they must claim items via workqueue leases.
+    """
+    d = _dir(root)
+    ensure_dir(d)
+    fd = os.open(os.path.join(d, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with _plan_lock(root):
+            alone = _try_flock(fd, exclusive=True)
+            if not alone and not (shared and _try_flock(fd, exclusive=False)):
+                raise SyncBusy("a sync run is already in progress")
+            if alone:
+                _clear_cancel(root)   # a stale flag must not stop this run
+                if shared and fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_SH)   # let other workers join
+            results, segments, _ = _state(journal(root))
+            seg = Segment(plan, len(segments) + 1, root,
+                          attempts={k: r["attempts"] for k, r in results.items() if r.get("attempts")})
+            _append(root, {"event": "segment_start", "segment": seg.number, "pid": os.getpid(),
+                           "host": workqueue.owner_id(), "shared": shared, "t": _now()})
+        try:
+            yield seg
+        finally:
+            with _plan_lock(root):
+                _append(root, {"event": "segment_end", "segment": seg.number, "items": seg.recorded, "t": _now(), **seg.outcome})
+                _, _, complete = _state(journal(root))
+                if not complete and not pending(plan, root):
+                    _append(root, {"event": "complete", "t": _now()})
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                if _try_flock(fd, exclusive=True):   # last worker out
+                    _clear_cancel(root)
+    finally:
+        os.close(fd)
+
+
+def _try_flock(fd: int, exclusive: bool) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+# ---------- Summary ----------
+
+def summary(plan: Dict[str, Any], root: Optional[str] = None) -> Dict[str, Any]:
+    """
+    run_sync-shaped counters merged over every segment of the plan (each
+    item counted once, by its latest outcome), plus plan progress.
+    """
+    results, segments, complete = _state(journal(root))
+    new = updated = unchanged = 0
+    proc_new = proc_identical = proc_unchanged = proc_err = 0
+    touched: List[str] = []
+    skipped: List[Dict[str, Any]] = []
+    reasons: Dict[str, int] = {}
+    done = given_up = 0
+    for sport, year, week in plan["items"]:
+        yyww = f"{year % 100:02d}{week:02d}"
+        r = results.get(item_key(sport, year, yyww))
+        if r is None:
+            continue
+        done += 1 if is_done(r) else 0
+        given_up += 1 if gave_up(r) else 0
+        url = f"/{sport}/{year}/{yyww}/WEEK/2"
+        if r.get("reason"):
+            skipped.append({"url": url, "reason": r["reason"]})
+            reasons[r["reason"]] = reasons.get(r["reason"], 0) + 1
+        raw = r.get("raw")
+        if raw == "new":
+            new += 1
+            touched.append(url)
+        elif raw == "updated":
+            updated += 1
+            touched.append(url)
+        elif raw == "unchanged":
+            unchanged += 1
+        else:
+            continue
+        pst = r.get("processed")
+        if pst == "processed":
+            proc_new += 1
+        elif pst == "identical":
+            proc_identical += 1
+        elif pst == "unchanged":
+            proc_unchanged += 1
+        else:
+            proc_err += 1
+
+    last = segments[-1] if segments else {}
+    status = "complete" if complete else ("running" if running(root) else last.get("status", "pending"))
+    return {
+        "new": new,
+        "updated": updated,
+        "unchanged": unchanged,
+        "processed_new": proc_new,
+        "processed_identical": proc_identical,
+        "processed_unchanged": proc_unchanged,
+        "processed_error": proc_err,
+        "updated_endpoints": touched,
+        "skipped": skipped,
+        "skipped_reasons": reasons,
+        "plan": {
+            "id": plan["id"],
+            "created": plan.get("created"),
+            "params": plan.get("params"),
+            "status": status,
+            "items": len(plan["items"]),
+            "done": done,
+            "given_up": given_up,
+            "remaining": len(plan["items"]) - done,
+            "segments": segments,
+        },
+    }
+
+
+def status(root: Optional[str] = None) -> Dict[str, Any]:
+    """Current plan progress for GET /admin/sync/plan."""
+    plan = load(root)
+    out: Dict[str, Any] = {"running": running(root), "cancel_requested": cancel_requested(root)}
+    if plan is None:
+        out["plan"] = None
+        return out
+    s = summary(plan, root)
+    out["plan"] = s["plan"]
+    out["skipped_reasons"] = s["skipped_reasons"]
+    return out
+
+
+def history(limit: int = 20, root: Optional[str] = None) -> List[Dict[str, Any]]:
+    hist = os.path.join(_dir(root), "history")
+    if not os.path.isdir(hist):
+        return []
+    out = []
+    for fname in sorted(os.listdir(hist), reverse=True)[:limit]:
+        s = jsonio.load_file(os.path.join(hist, fname))
+        if isinstance(s, dict):
+            out.append(s.get("plan") or {})
+    return out
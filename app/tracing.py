@@ -0,0 +1,177 @@
+# app/tracing.py
+import os, json, time, threading, uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+
+
+# ---------- State ----------
+# Spans are plain dicts kept in a bounded ring buffer (newest last) and,
+# optionally, appended to a JSONL file. When tracing is disabled, span()
+# hands back a shared no-op context manager so the hot path costs one
+# attribute check.
+
+_enabled: bool = bool(settings.TRACE_ENABLED)
+_buffer: deque = deque(maxlen=max(100, int(settings.TRACE_BUFFER_SIZE)))
+_lock = threading.Lock()
+
+_current_trace: ContextVar[Optional[str]] = ContextVar("simfba_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("simfba_span", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "trace_id", "_t0", "_tok")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent_id = _current_span.get()
+        self.trace_id = _current_trace.get() or self.span_id
+        self._t0 = 0.0
+        self._tok = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._tok = _current_span.set(self.span_id)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur = time.perf_counter() - self._t0
+        _current_span.reset(self._tok)
+        rec = {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "ts": time.time() - dur,
+            "dur_ms": round(dur * 1000.0, 3),
+            "attrs": self.attrs,
+        }
+        if exc_type is not None:
+            rec["error"] = exc_type.__name__
+        _emit(rec)
+        return False
+
+
+def _emit(rec: Dict[str, Any]) -> None:
+    with _lock:
+        _buffer.append(rec)
+        path = settings.TRACE_FILE
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec, default=str) + "\n")
+            except Exception:
+                pass
+
+
+# ---------- Public API ----------
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(on: bool) -> None:
+    global _enabled
+    _enabled = bool(on)
+
+
+def span(name: str, **attrs):
+    """
+    Context manager timing one phase:
+        with span("process.load", sport=sport, yyww=yyww):
+            ...
+    Nested spans record their parent. Returns a no-op when tracing is off.
+    """
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """
+    Start a new trace (e.g. one run_sync call) so every span opened inside
+    shares the same trace id and can be grouped later.
+    """
+    if not _enabled:
+        yield _NOOP
+        return
+    tok = _current_trace.set(uuid.uuid4().hex[:12])
+    try:
+        with _Span(name, attrs) as s:
+            yield s
+    finally:
+        _current_trace.reset(tok)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(); span name defaults to the function name."""
+    def deco(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def recent(limit: int = 500, trace_id: Optional[str] = None, name: Optional[str] = None) -> List[Dict[str, Any]]:
+    with _lock:
+        items = list(_buffer)
+    if trace_id:
+        items = [s for s in items if s.get("trace") == trace_id]
+    if name:
+        items = [s for s in items if str(s.get("name", "")).startswith(name)]
+    return items[-limit:] if limit > 0 else items
+
+
+def summarize(trace_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Aggregate recent spans by name: count / total / max, plus the slowest
+    individual spans with their attrs (which week, which phase).
+    """
+    items = recent(limit=0, trace_id=trace_id)
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for s in items:
+        agg = by_name.setdefault(s["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        agg["count"] += 1
+        agg["total_ms"] = round(agg["total_ms"] + s["dur_ms"], 3)
+        if s["dur_ms"] > agg["max_ms"]:
+            agg["max_ms"] = s["dur_ms"]
+    slowest = sorted(items, key=lambda s: s["dur_ms"], reverse=True)[:20]
+    return {"enabled": _enabled, "spans": len(items), "by_name": by_name, "slowest": slowest}
+
+
+def clear() -> None:
+    with _lock:
+        _buffer.clear()
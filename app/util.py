@@ -1,5 +1,5 @@
 # util.py
-import os, hashlib
+import os, hashlib, threading
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
@@ -40,3 +40,23 @@ def write_if_changed(json_path: str, payload: bytes) -> tuple[str, str]:
         return ("updated" if old_hash else "new"), new_hash
     except Exception:
         return "error", ""
+
+
+def atomic_write(path: str, payload: bytes) -> None:
+    """
+    Write bytes to path via a temp file in the same directory + os.replace,
+    so readers see either the old file or the new one, never a partial write.
+    """
+    d = os.path.dirname(path) or "."
+    ensure_dir(d)
+    tmp = os.path.join(d, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
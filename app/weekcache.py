@@ -0,0 +1,151 @@
+# app/weekcache.py
+import os, gzip, hashlib, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from . import sharedmem, seasonpack
+
+
+# Size-bounded LRU of processed weeks, held as ready-to-send bytes:
+# the JSON body, a gzip'd copy and the strong ETag: sha256 of the body,
+# i.e. the week's meta output_sha256. It is hashed from the bytes actually
+# cached rather than read from meta, since loose weeks write the body
+# before the meta and a read in between would pair the new body with the
+# old ETag (a false 304 for clients holding the old one).
+#
+# Each uvicorn worker has its own cache. Entries are validated against the
+# week's stamp on every lookup: the file's (inode, mtime, size), or for a
+# packed season (seasonpack.py) the record's (pack inode, offset, length).
+# process_one replaces weeks by atomic rename / index swap, so a rewrite
+# from any process (another worker, a sync container) is picked up without
+# IPC. process_one also calls invalidate() for an immediate in-process drop.
+#
+# Weeks published in the shared mmap pack (sharedmem.py) are served from
+# there first, so hot weeks aren't duplicated in every worker's LRU.
+
+
+class WeekEntry:
+    __slots__ = ("body", "gz", "etag", "stamp", "size")
+
+    def __init__(self, body: bytes, gz: bytes, etag: str, stamp: Tuple[int, int, int]):
+        self.body = body
+        self.gz = gz
+        self.etag = etag
+        self.stamp = stamp
+        self.size = len(body) + len(gz)
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[Tuple[str, int, str], WeekEntry]" = OrderedDict()
+_bytes = 0
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "stale": 0, "uncacheable": 0}
+
+
+def processed_path(sport: str, year: int, yyww: str) -> str:
+    return os.path.join(settings.DATA_ROOT, "processed", sport, str(year), f"{yyww}.json")
+
+
+def _etag_for(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()}"'
+
+
+def _evict_locked() -> None:
+    global _bytes
+    budget = settings.WEEK_CACHE_BYTES
+    while _bytes > budget and _entries:
+        _, old = _entries.popitem(last=False)
+        _bytes -= old.size
+        _stats["evictions"] += 1
+
+
+def _load(sport: str, year: int, yyww: str, stamp: Tuple[int, int, int]) -> Optional[WeekEntry]:
+    body = seasonpack.read_week(sport, year, yyww)
+    if body is None:
+        return None
+    return WeekEntry(body, gzip.compress(body, compresslevel=settings.WEEK_CACHE_GZIP_LEVEL, mtime=0),
+                     _etag_for(body), stamp)
+
+
+def read_entry(sport: str, year: int, yyww: str) -> Optional[WeekEntry]:
+    """Build an entry straight from disk without touching the LRU (used to publish packs)."""
+    stamp = seasonpack.week_stamp(sport, year, yyww)
+    if stamp is None:
+        return None
+    return _load(sport, year, yyww, stamp)
+
+
+def get(sport: str, year: int, yyww: str) -> Optional[WeekEntry]:
+    """Cached week (loading it on miss), or None if the week doesn't exist."""
+    global _bytes
+    stamp = seasonpack.week_stamp(sport, year, yyww)
+    if stamp is None:
+        invalidate(sport, year, yyww)
+        return None
+    key = (sport, int(year), yyww)
+
+    shared = sharedmem.week(sport, int(year), yyww, stamp)
+    if shared is not None:
+        with _lock:
+            _stats["shared_hits"] += 1
+        return WeekEntry(shared[0], shared[1], shared[2], stamp)
+
+    with _lock:
+        e = _entries.get(key)
+        if e is not None:
+            if e.stamp == stamp:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return e
+            _entries.pop(key)
+            _bytes -= e.size
+            _stats["stale"] += 1
+        _stats["misses"] += 1
+
+    e = _load(sport, year, yyww, stamp)
+    if e is None:
+        return None
+
+    if settings.WEEK_CACHE_BYTES <= 0 or e.size > settings.WEEK_CACHE_BYTES // 4:
+        with _lock:
+            _stats["uncacheable"] += 1
+        return e
+
+    with _lock:
+        prev = _entries.pop(key, None)
+        if prev is not None:
+            _bytes -= prev.size
+        _entries[key] = e
+        _bytes += e.size
+        _evict_locked()
+    return e
+
+
+def invalidate(sport: str, year: int, yyww: str) -> None:
+    global _bytes
+    with _lock:
+        e = _entries.pop((sport, int(year), yyww), None)
+        if e is not None:
+            _bytes -= e.size
+            _stats["invalidations"] += 1
+
+
+def clear() -> None:
+    global _bytes
+    with _lock:
+        _entries.clear()
+        _bytes = 0
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        total = _stats["hits"] + _stats["shared_hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_ratio": round((_stats["hits"] + _stats["shared_hits"]) / total, 4) if total else None,
+            "entries": len(_entries),
+            "bytes": _bytes,
+            "budget_bytes": settings.WEEK_CACHE_BYTES,
+            "pid": os.getpid(),
+            "hot": [f"{s}/{y}/{w}" for (s, y, w) in reversed(_entries.keys())][:20],
+        }
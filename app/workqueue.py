@@ -0,0 +1,267 @@
+# app/workqueue.py
+import os, shutil, socket, threading, time, uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+from .util import ensure_dir, atomic_write
+from . import jsonio
+
+try:
+    import fcntl  # POSIX only
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+# Lease-based work queue over a shared DATA_ROOT, so several worker
+# containers can split a sync / reprocess run without two of them fetching
+# or writing the same week.
+#
+#   {DATA_ROOT}/queue/{name}/.lock          flock serializing steal / renew / complete
+#   {DATA_ROOT}/queue/{name}/{key}.lease    {"owner", "token", "expires", "state": "leased"|"done", ...}
+#
+# Claiming an item creates its lease file atomically (temp file + link(),
+# which fails if the file exists), so a free item goes to exactly one
+# worker without taking the queue lock. A lease past its expiry (the
+# holder died or stalled) is stolen under the queue lock with a new token.
+# A heartbeat thread renews the worker's leases every QUEUE_HEARTBEAT_S;
+# when the token on disk is no longer ours the lease is marked lost, and
+# complete() refuses to mark the item done, so the thief's outcome is the
+# one that counts. Done leases stay as markers, so a worker joining later
+# skips finished items.
+#
+# Expiry compares wall clocks across nodes; keep QUEUE_LEASE_TTL_S well
+# above heartbeat interval + expected clock skew.
+
+_KEY_SAFE = str.maketrans({"/": "_", "\\": "_", ":": "_"})
+
+
+def _dir(name: str, root: Optional[str] = None) -> str:
+    return os.path.join(root or settings.DATA_ROOT, "queue", name)
+
+
+def owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Lease:
+    __slots__ = ("queue", "key", "path", "token", "lost")
+
+    def __init__(self, queue: "WorkQueue", key: str, path: str, token: str):
+        self.queue = queue
+        self.key = key
+        self.path = path
+        self.token = token
+        self.lost = False
+
+    def complete(self, outcome: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark the item done; False when the lease was stolen meanwhile."""
+        return self.queue._finish(self, done=True, outcome=outcome)
+
+    def release(self) -> bool:
+        """Give the item back (e.g. transient failure) for another worker / run."""
+        return self.queue._finish(self, done=False, outcome=None)
+
+
+class WorkQueue:
+    """One named queue of string item keys shared by every worker on the volume."""
+
+    def __init__(self, name: str, root: Optional[str] = None, ttl_s: Optional[float] = None,
+                 heartbeat_s: Optional[float] = None):
+        self.name = name
+        self.dir = _dir(name, root)
+        self.ttl_s = float(ttl_s if ttl_s is not None else settings.QUEUE_LEASE_TTL_S)
+        self.heartbeat_s = float(heartbeat_s if heartbeat_s is not None else settings.QUEUE_HEARTBEAT_S)
+        self.owner = owner_id()
+        self._held: Dict[str, Lease] = {}
+        self._mu = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counts = {"claimed": 0, "stolen": 0, "busy": 0, "done_elsewhere": 0,
+                       "completed": 0, "released": 0, "lost": 0}
+        ensure_dir(self.dir)
+
+    # ---- files ----
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, key.translate(_KEY_SAFE) + ".lease")
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        doc = jsonio.load_file(path)
+        return doc if isinstance(doc, dict) else None
+
+    def _doc(self, key: str, token: str, **extra: Any) -> Dict[str, Any]:
+        now = time.time()
+        return {"key": key, "owner": self.owner, "token": token, "state": "leased",
+                "claimed": now, "expires": now + self.ttl_s, **extra}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fd = os.open(os.path.join(self.dir, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    # ---- claim ----
+
+    def claim(self, key: str) -> Optional[Lease]:
+        """Lease `key` for this worker, or None if it is done or leased by a live worker."""
+        path = self._path(key)
+        token = uuid.uuid4().hex
+        tmp = f"{path}.{token}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(jsonio.dumps(self._doc(key, token)))
+        try:
+            os.link(tmp, path)   # atomic create-if-absent, with full content
+            return self._hold(key, path, token, "claimed")
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+        cur = self._read(path)
+        if cur is not None:
+            if cur.get("state") == "done":
+                self.counts["done_elsewhere"] += 1
+                return None
+            if float(cur.get("expires") or 0) > time.time():
+                self.counts["busy"] += 1
+                return None
+        elif time.time() - _mtime(path) < self.ttl_s:
+            self.counts["busy"] += 1   # unreadable: being replaced right now
+            return None
+
+        # expired: steal under the queue lock, unless someone beat us to it
+        with self._locked():
+            again = self._read(path)
+            if again is not None and (again.get("state") == "done"
+                                      or again.get("token") != (cur or {}).get("token")
+                                      or float(again.get("expires") or 0) > time.time()):
+                self.counts["busy"] += 1
+                return None
+            atomic_write(path, jsonio.dumps(self._doc(
+                key, token, stolen_from=(again or {}).get("owner"),
+            )))
+        print(f"[QUEUE] {self.name}: took expired lease {key} from {(again or {}).get('owner')}")
+        return self._hold(key, path, token, "stolen")
+
+    def _hold(self, key: str, path: str, token: str, counter: str) -> Lease:
+        lease = Lease(self, key, path, token)
+        with self._mu:
+            self._held[key] = lease
+            self.counts[counter] += 1
+        return lease
+
+    # ---- renew / finish ----
+
+    def _finish(self, lease: Lease, done: bool, outcome: Optional[Dict[str, Any]]) -> bool:
+        with self._mu:
+            self._held.pop(lease.key, None)
+        with self._locked():
+            cur = self._read(lease.path)
+            if lease.lost or cur is None or cur.get("token") != lease.token:
+                lease.lost = True
+                self.counts["lost"] += 1
+                print(f"[QUEUE] {self.name}: lease {lease.key} was stolen; dropping our result")
+                return False
+            if done:
+                cur.update(state="done", finished=time.time(), outcome=outcome)
+                atomic_write(lease.path, jsonio.dumps(cur))
+                self.counts["completed"] += 1
+            else:
+                os.remove(lease.path)
+                self.counts["released"] += 1
+        return True
+
+    def renew(self) -> int:
+        """Extend every lease we hold; flags the ones another worker stole. Returns live count."""
+        with self._mu:
+            held = list(self._held.values())
+        if not held:
+            return 0
+        live = 0
+        with self._locked():
+            for lease in held:
+                cur = self._read(lease.path)
+                if cur is None or cur.get("token") != lease.token:
+                    lease.lost = True
+                    continue
+                cur["expires"] = time.time() + self.ttl_s
+                atomic_write(lease.path, jsonio.dumps(cur))
+                live += 1
+        return live
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.heartbeat_s):
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"[QUEUE] {self.name}: heartbeat failed: {e}")
+
+    @contextmanager
+    def worker(self) -> Iterator["WorkQueue"]:
+        """Run the heartbeat for the duration of a worker's pass; releases leftovers on exit."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._beat, name=f"lease-heartbeat-{self.name}", daemon=True)
+        self._thread.start()
+        try:
+            yield self
+        finally:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            with self._mu:
+                left = list(self._held.values())
+            for lease in left:
+                lease.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queue": self.name, "owner": self.owner, **self.counts}
+
+
+# ---------- Inspection ----------
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def status(name: str, root: Optional[str] = None) -> Dict[str, Any]:
+    """Counts of done / leased / expired items and the live owners of one queue."""
+    d = _dir(name, root)
+    done = leased = expired = 0
+    owners: Dict[str, int] = {}
+    now = time.time()
+    if os.path.isdir(d):
+        for fname in os.listdir(d):
+            if not fname.endswith(".lease"):
+                continue
+            doc = jsonio.load_file(os.path.join(d, fname))
+            if not isinstance(doc, dict):
+                continue
+            if doc.get("state") == "done":
+                done += 1
+            elif float(doc.get("expires") or 0) > now:
+                leased += 1
+                owners[doc.get("owner") or "?"] = owners.get(doc.get("owner") or "?", 0) + 1
+            else:
+                expired += 1
+    return {"queue": name, "done": done, "leased": leased, "expired": expired, "owners": owners}
+
+
+def queues(root: Optional[str] = None) -> List[Dict[str, Any]]:
+    base = os.path.join(root or settings.DATA_ROOT, "queue")
+    if not os.path.isdir(base):
+        return []
+    return [status(n, root) for n in sorted(os.listdir(base)) if os.path.isdir(os.path.join(base, n))]
+
+
+def drop(name: str, root: Optional[str] = None) -> None:
+    shutil.rmtree(_dir(name, root), ignore_errors=True)
@@ -0,0 +1,101 @@
+# bench/bench_json.py
+"""
+JSON parse/dump throughput: stdlib json vs the backend app.jsonio picks
+(orjson / msgspec when installed).
+
+    python -m bench.bench_json [--players 6000] [--teams 260] [--repeat 5]
+
+Uses a synthetic CFB-sized week (shape of a processed week: team rows +
+player rows with the enrichment fields), so no data directory is needed.
+"""
+import argparse, importlib, json, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_week(n_players: int, n_teams: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    teams = []
+    for i in range(n_teams):
+        teams.append({
+            "ID": 100000 + i, "TeamID": i + 1, "GameID": 5000 + i // 2,
+            "TeamName": f"Team {i}", "Mascot": "Mascots", "Conference": f"Conf {i % 12}",
+            "PassingYards": rnd.randint(80, 450), "RushingYards": rnd.randint(20, 320),
+            "PointsScored": rnd.randint(0, 63), "PointsAgainst": rnd.randint(0, 63),
+            "Turnovers": rnd.randint(0, 5), "TimeOfPossession": round(rnd.uniform(20, 40), 2),
+        })
+    positions = ["QB", "RB", "WR", "TE", "K", "P", "OL", "DL", "LB", "CB", "S"]
+    players = []
+    for i in range(n_players):
+        players.append({
+            "ID": 900000 + i, "PlayerID": 20000 + i, "TeamID": rnd.randint(1, n_teams),
+            "GameID": 5000 + rnd.randint(0, n_teams // 2),
+            "FirstName": f"First{i}", "LastName": f"Last{i}", "Position": rnd.choice(positions),
+            "TeamAbbr": f"T{rnd.randint(1, n_teams)}",
+            "PassAttempts": rnd.randint(0, 45), "PassCompletions": rnd.randint(0, 30),
+            "PassingYards": rnd.randint(0, 400), "PassingTDs": rnd.randint(0, 5),
+            "RushAttempts": rnd.randint(0, 30), "RushingYards": rnd.randint(-5, 220),
+            "Catches": rnd.randint(0, 12), "ReceivingYards": rnd.randint(0, 200),
+            "Tackles": round(rnd.uniform(0, 12), 1), "Sacks": round(rnd.uniform(0, 3), 1),
+            "Interceptions": rnd.randint(0, 2), "Fumbles": rnd.randint(0, 2),
+            "Snaps": rnd.randint(0, 80), "WasInjured": rnd.random() < 0.02,
+        })
+    return {"CFBTeamGameStats": teams, "CFBPlayerGameStats": players}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(backend: str, doc: dict, raw: bytes, repeat: int) -> dict:
+    os.environ["SIMFBA_JSON"] = backend
+    import app.jsonio as jsonio
+    jsonio = importlib.reload(jsonio)
+    if jsonio.BACKEND != backend:
+        return {"backend": backend, "available": False}
+    mb = len(raw) / 1e6
+    t_load = _best(lambda: jsonio.loads(raw), repeat)
+    t_dump = _best(lambda: jsonio.dumps(doc), repeat)
+    t_dump_i = _best(lambda: jsonio.dumps(doc, indent=True), repeat)
+    return {
+        "backend": backend,
+        "available": True,
+        "loads_mb_s": round(mb / t_load, 1),
+        "dumps_mb_s": round(mb / t_dump, 1),
+        "dumps_indent_mb_s": round(mb / t_dump_i, 1),
+        "loads_ms": round(t_load * 1000, 2),
+        "dumps_indent_ms": round(t_dump_i * 1000, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=6000)
+    ap.add_argument("--teams", type=int, default=260)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    doc = synthetic_week(args.players, args.teams)
+    raw = json.dumps(doc, ensure_ascii=False, indent=2).encode("utf-8")
+    print(f"[bench] synthetic week: {len(raw) / 1e6:.2f} MB, {args.players} players, {args.teams} teams")
+
+    results = [run(b, doc, raw, args.repeat) for b in ("stdlib", "orjson", "msgspec")]
+    base = results[0]
+    for r in results:
+        if not r["available"]:
+            print(f"[bench] {r['backend']:8s} not installed")
+            continue
+        print(
+            f"[bench] {r['backend']:8s} loads {r['loads_mb_s']:8.1f} MB/s  "
+            f"dumps {r['dumps_mb_s']:8.1f} MB/s  dumps(indent) {r['dumps_indent_mb_s']:8.1f} MB/s  "
+            f"(x{r['loads_mb_s'] / base['loads_mb_s']:.1f} / x{r['dumps_indent_mb_s'] / base['dumps_indent_mb_s']:.1f} vs stdlib)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+# bench/bench_load.py
+"""
+Load test of the public read path: C concurrent virtual viewers replay
+the viewer's request mix against a locally started app (or --url) and
+the run reports p50/p95/p99 latency, throughput and error rate per
+request kind.
+
+    python -m bench.bench_load --data-root /path/to/data [--concurrency 50] [--duration 20]
+        [--config NAME:KEY=VAL,...]... [--url http://host:port]
+
+A session: page + viewer scripts, /manifest, the latest week of a sport
+(gzip, If-None-Match when the viewer has it cached), the idle prefetch of
+the neighbouring weeks, a few Prev/Next steps, sometimes a sport toggle
+and sometimes the raw week. Returning viewers (--returning) keep their
+ETags, like the viewer's IndexedDB cache, so their weeks come back 304.
+
+Each --config starts its own server; KEY=VAL pairs are environment
+variables for the app (e.g. WEEK_CACHE_BYTES=0, SHM_ENABLED=0) except:
+  workers=N   uvicorn --workers
+  gzip=0      clients don't send Accept-Encoding: gzip
+e.g.  --config base --config nocache:WEEK_CACHE_BYTES=0 --config w4:workers=4 --config plain:gzip=0
+
+The client is a minimal asyncio HTTP/1.1 keep-alive client (one
+connection per viewer), so client overhead stays small and no extra
+dependency is needed.
+"""
+import argparse, asyncio, json, os, random, socket, subprocess, sys, time, urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---------- HTTP client ----------
+
+class _Conn:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _open(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], int]:
+        """(status, lower-cased headers, body bytes); reconnects once if keep-alive was dropped."""
+        for attempt in (0, 1):
+            if self.writer is None:
+                await self._open()
+            try:
+                return await asyncio.wait_for(self._roundtrip(path, headers), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if attempt:
+                    raise
+            except BaseException:
+                self.close()
+                raise
+        raise ConnectionError("unreachable")
+
+    async def _roundtrip(self, path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], int]:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        await self.writer.drain()
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        hdrs: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            hdrs[k.strip().lower()] = v.strip()
+        n = 0
+        if hdrs.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                await self.reader.readexactly(size + 2)
+                n += size
+        elif status != 304 and "content-length" in hdrs:
+            n = int(hdrs["content-length"])
+            await self.reader.readexactly(n)
+        if hdrs.get("connection", "").lower() == "close":
+            self.close()
+        return status, hdrs, n
+
+
+# ---------- Viewer sessions ----------
+
+class _Stats:
+    def __init__(self):
+        self.lat: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.bytes = 0
+        self.sessions = 0
+
+    def add(self, kind: str, dt: float, ok: bool, n: int) -> None:
+        self.lat.setdefault(kind, []).append(dt)
+        if not ok:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+        self.bytes += n
+
+
+class _Viewer:
+    def __init__(self, conn: _Conn, stats: _Stats, args, gzip: bool, rng: random.Random, manifest: dict):
+        self.conn, self.stats, self.args, self.gzip, self.rng = conn, stats, args, gzip, rng
+        self.manifest = manifest   # files map; fetched once, the session still requests /manifest
+        self.etags: Dict[str, str] = {}
+        self.mem: set = set()   # weeks the viewer's worker holds in memory this session
+        self.recording = False
+
+    async def _get(self, kind: str, path: str, conditional: bool = False) -> Optional[Tuple[int, Dict[str, str]]]:
+        headers = {"Accept-Encoding": "gzip"} if self.gzip else {}
+        if conditional and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        t0 = time.perf_counter()
+        try:
+            status, hdrs, n = await self.conn.get(path, headers)
+        except Exception:
+            if self.recording:
+                self.stats.add(kind, time.perf_counter() - t0, False, 0)
+            return None
+        dt = time.perf_counter() - t0
+        if status == 304:
+            kind += "_304"
+        if self.recording:
+            self.stats.add(kind, dt, status in (200, 304), n)
+        if status == 200 and "etag" in hdrs:
+            self.etags[path] = hdrs["etag"]
+        return status, hdrs
+
+    async def _week(self, files: Dict[str, str], weeks: List[str], i: int) -> None:
+        url = files[weeks[i]]
+        if url in self.mem:
+            return
+        await self._get("week", url, conditional=True)
+        self.mem.add(url)
+
+    async def _think(self) -> None:
+        if self.args.think_ms:
+            await asyncio.sleep(self.rng.expovariate(1000.0 / self.args.think_ms))
+
+    async def session(self) -> None:
+        a, rng = self.args, self.rng
+        if rng.random() >= a.returning:
+            self.etags.clear()
+        self.mem.clear()
+        await self._get("page", "/")
+        await self._get("static", "/static/js/viewer.js")
+        await self._get("static", "/static/js/viewer-worker.js")
+        if await self._get("manifest", "/manifest") is None:
+            return
+        manifest = self.manifest
+        sports = [s for s in ("nfl", "cfb") if manifest.get(s)]
+        if not sports:
+            return
+        sport = rng.choice(sports)
+        for _ in range(1 + (1 if rng.random() < a.p_toggle and len(sports) > 1 else 0)):
+            years = sorted(manifest[sport], key=int)
+            files = manifest[sport][years[-1]]
+            weeks = sorted(files)
+            i = len(weeks) - 1
+            await self._week(files, weeks, i)
+            for j in (i - 1, i + 1):   # idle prefetch of the neighbours
+                if 0 <= j < len(weeks):
+                    await self._week(files, weeks, j)
+            for _ in range(rng.randint(0, a.nav_steps)):
+                await self._think()
+                i = max(0, min(len(weeks) - 1, i + rng.choice((-1, 1))))
+                await self._week(files, weeks, i)
+                if rng.random() < a.p_raw:
+                    await self._get("raw", files[weeks[i]].replace("/data/processed/", "/data/raw/"))
+            sport = [s for s in sports if s != sport][0] if len(sports) > 1 else sport
+            await self._think()
+        if self.recording:
+            self.stats.sessions += 1
+
+
+async def _fetch_manifest(host: str, port: int) -> Optional[dict]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /manifest HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    raw = await reader.read()
+    writer.close()
+    _, _, body = raw.partition(b"\r\n\r\n")
+    try:
+        doc = json.loads(body)
+    except ValueError:
+        return None
+    return doc.get("files") if isinstance(doc, dict) else None
+
+
+async def _drive(host: str, port: int, args, gzip: bool) -> Tuple[_Stats, float]:
+    manifest = await _fetch_manifest(host, port)
+    if not manifest:
+        raise SystemExit(f"[bench] no processed weeks in the manifest at {host}:{port}")
+    stats = _Stats()
+    stop_at = [0.0]
+    viewers = []
+    for k in range(args.concurrency):
+        viewers.append(_Viewer(_Conn(host, port, args.timeout), stats, args, gzip, random.Random(args.seed + k), manifest))
+
+    async def _loop(v: _Viewer) -> None:
+        while time.perf_counter() < stop_at[0]:
+            await v.session()
+        v.conn.close()
+
+    t0 = time.perf_counter()
+    stop_at[0] = t0 + args.warmup + args.duration
+    tasks = [asyncio.create_task(_loop(v)) for v in viewers]
+    await asyncio.sleep(args.warmup)
+    for v in viewers:
+        v.recording = True
+    t1 = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - t1
+
+
+# ---------- Server per config ----------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(data_root: str, env_over: Dict[str, str], workers: int) -> Tuple[subprocess.Popen, int]:
+    port = _free_port()
+    env = dict(os.environ, DATA_ROOT=data_root, **env_over)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"[bench] server exited with {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5) as s:
+                s.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+                if b" 200 " in s.recv(64):
+                    return proc, port
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("[bench] server did not come up")
+
+
+def _parse_config(spec: str) -> Tuple[str, Dict[str, str], int, bool]:
+    name, _, rest = spec.partition(":")
+    env: Dict[str, str] = {}
+    workers, gzip = 1, True
+    for kv in filter(None, rest.split(",")):
+        k, _, v = kv.partition("=")
+        if k == "workers":
+            workers = int(v)
+        elif k == "gzip":
+            gzip = v not in ("0", "false", "no")
+        else:
+            env[k] = v
+    return name, env, workers, gzip
+
+
+# ---------- Report ----------
+
+def _pct(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    return xs[min(len(xs) - 1, max(0, int(round(p / 100.0 * len(xs) + 0.5)) - 1))]
+
+
+def _report(name: str, stats: _Stats, secs: float) -> Dict[str, float]:
+    total = sum(len(v) for v in stats.lat.values())
+    errors = sum(stats.errors.values())
+    print(f"[bench] {name}: {total} requests in {secs:.1f} s = {total / secs:.0f} req/s, "
+          f"{stats.sessions / secs:.1f} sessions/s, {stats.bytes / secs / 1e6:.1f} MB/s, errors {errors} ({100.0 * errors / max(total, 1):.2f}%)")
+    print(f"[bench]   {'kind':12s} {'count':>7s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'err':>5s}")
+    all_lat: List[float] = []
+    for kind in sorted(stats.lat):
+        xs = sorted(stats.lat[kind])
+        all_lat += xs
+        print(f"[bench]   {kind:12s} {len(xs):7d} {len(xs) / secs:8.0f} {_pct(xs, 50) * 1e3:8.2f} "
+              f"{_pct(xs, 95) * 1e3:8.2f} {_pct(xs, 99) * 1e3:8.2f} {stats.errors.get(kind, 0):5d}")
+    all_lat.sort()
+    return {"rps": total / secs, "p50": _pct(all_lat, 50) * 1e3, "p95": _pct(all_lat, 95) * 1e3,
+            "p99": _pct(all_lat, 99) * 1e3, "err_pct": 100.0 * errors / max(total, 1)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data-root", default=None, help="DATA_ROOT for the started servers (default: settings)")
+    ap.add_argument("--url", default=None, help="load an already running server instead of starting one")
+    ap.add_argument("--config", action="append", default=[], help="NAME[:KEY=VAL,...] (repeatable)")
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--warmup", type=float, default=3.0)
+    ap.add_argument("--think-ms", type=float, default=0.0, help="mean pause between viewer actions")
+    ap.add_argument("--nav-steps", type=int, default=4, help="max Prev/Next steps per sport")
+    ap.add_argument("--returning", type=float, default=0.5, help="share of sessions with a warm ETag cache")
+    ap.add_argument("--p-toggle", type=float, default=0.3, help="chance of a sport toggle per session")
+    ap.add_argument("--p-raw", type=float, default=0.05, help="chance of opening the raw week per step")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    results: List[Tuple[str, Dict[str, float]]] = []
+    if args.url:
+        u = urllib.parse.urlsplit(args.url)
+        stats, secs = asyncio.run(_drive(u.hostname or "127.0.0.1", u.port or 80, args, True))
+        results.append((args.url, _report(args.url, stats, secs)))
+    else:
+        sys.path.insert(0, ROOT)
+        from app.config import settings
+        data_root = args.data_root or settings.DATA_ROOT
+        for spec in args.config or ["base"]:
+            name, env, workers, gzip = _parse_config(spec)
+            proc, port = _start(data_root, env, workers)
+            try:
+                stats, secs = asyncio.run(_drive("127.0.0.1", port, args, gzip))
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            results.append((name, _report(f"{name} (workers={workers}, gzip={int(gzip)})", stats, secs)))
+
+    if len(results) > 1:
+        print(f"[bench] {'config':16s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'err %':>6s}")
+        for name, r in results:
+            print(f"[bench] {name:16s} {r['rps']:8.0f} {r['p50']:8.2f} {r['p95']:8.2f} {r['p99']:8.2f} {r['err_pct']:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
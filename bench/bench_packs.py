@@ -0,0 +1,110 @@
+# bench/bench_packs.py
+"""
+Loose week files vs season packfiles: file count, manifest build, reading
+every week (body + meta) and random single-week reads, each measured in a
+fresh interpreter (no warm in-process caches; the OS page cache is warm
+for both layouts).
+
+    python -m bench.bench_packs --data-root /path/to/data [--seasons 20] [--reads 2000]
+
+The processed tree is copied and each season is cloned into --seasons
+fake years per sport so small trees show the per-file cost.
+"""
+import argparse, json, os, shutil, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, random, time
+from app import seasonpack
+from app.config import settings
+from app.manifest import api_manifest
+t0 = time.perf_counter()
+m = api_manifest(settings.DATA_ROOT)
+t_manifest = time.perf_counter() - t0
+keys = [(sp, int(y), w) for sp, ys in m["files"].items() for y, ws in ys.items() for w in ws]
+t0 = time.perf_counter()
+nbytes = 0
+for sp, y, w in keys:
+    nbytes += len(seasonpack.read_week(sp, y, w))
+    seasonpack.load_meta(sp, y, w)
+t_all = time.perf_counter() - t0
+rnd = random.Random(7)
+t0 = time.perf_counter()
+for _ in range(%d):
+    sp, y, w = rnd.choice(keys)
+    seasonpack.week_stamp(sp, y, w)
+    seasonpack.read_week(sp, y, w)
+t_rand = time.perf_counter() - t0
+print(json.dumps({"weeks": len(keys), "bytes": nbytes, "manifest_ms": t_manifest * 1000,
+                  "all_ms": t_all * 1000, "random_us": t_rand / %d * 1e6}))
+"""
+
+_PACK = """
+from app import seasonpack
+for sp, y in seasonpack.seasons():
+    seasonpack.pack_season(sp, y)
+"""
+
+
+def _run(code: str, env: dict) -> str:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise SystemExit(out.stderr)
+    return out.stdout
+
+
+def _files(data_root: str) -> int:
+    return sum(len(fs) for _, _, fs in os.walk(os.path.join(data_root, "processed")))
+
+
+def _clone(data_root: str, seasons: int) -> None:
+    base = os.path.join(data_root, "processed")
+    for sp in ("nfl", "cfb"):
+        sdir = os.path.join(base, sp)
+        if not os.path.isdir(sdir):
+            continue
+        years = sorted(int(y) for y in os.listdir(sdir) if y.isdigit())
+        if not years:
+            continue
+        src = os.path.join(sdir, str(years[-1]))
+        for i in range(1, seasons):
+            dst = os.path.join(sdir, str(years[0] - i))
+            if not os.path.exists(dst):
+                shutil.copytree(src, dst)
+
+
+def _report(label: str, data_root: str, res: dict) -> None:
+    print(f"[bench] {label:6s} files={_files(data_root):6d} weeks={res['weeks']:5d} "
+          f"manifest {res['manifest_ms']:8.1f} ms  all weeks+meta {res['all_ms']:8.1f} ms  "
+          f"random read {res['random_us']:7.1f} us")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data-root", required=True, help="DATA_ROOT with processed weeks (copied, not modified)")
+    ap.add_argument("--seasons", type=int, default=20)
+    ap.add_argument("--reads", type=int, default=2000)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-packs-")
+    try:
+        data_root = os.path.join(tmp, "data")
+        shutil.copytree(os.path.join(args.data_root, "processed"), os.path.join(data_root, "processed"))
+        _clone(data_root, args.seasons)
+        env = dict(os.environ, DATA_ROOT=data_root, SHM_ENABLED="0", SEASON_PACKS="0")
+        probe = _PROBE % (args.reads, args.reads)
+
+        loose = json.loads(_run(probe, env).splitlines()[-1])
+        _report("loose", data_root, loose)
+        _run(_PACK, env)
+        packed = json.loads(_run(probe, env).splitlines()[-1])
+        _report("packed", data_root, packed)
+        if loose["bytes"] != packed["bytes"]:
+            print(f"[bench] WARNING: bytes differ (loose {loose['bytes']} vs packed {packed['bytes']})")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
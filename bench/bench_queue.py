@@ -0,0 +1,141 @@
+# bench/bench_queue.py
+"""
+Multi-worker reprocess over the lease queue: N local processes run
+reprocess_raw(queue=...) against one copy of a DATA_ROOT, like N worker
+containers sharing the volume. Reports wall time per worker count and
+checks every raw week was processed exactly once.
+
+    python -m bench.bench_queue --data-root /path/to/data [--workers 1,2,4] [--slow-ms 50] [--kill]
+
+--slow-ms adds a sleep per week inside the workers, to emulate the
+network-bound weeks of a sync (small trees process too fast to show
+scaling). --kill SIGKILLs one worker mid-run with a short lease TTL and
+checks a follow-up worker takes over its expired leases.
+"""
+import argparse, json, os, shutil, signal, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WORKER = """
+import json, sys, time
+from app import processor
+slow = %f
+done = []
+_orig = processor.process_one
+def _wrapped(sport, year, yyww, *a, **kw):
+    if slow:
+        time.sleep(slow)
+    done.append(f"{sport}/{year}/{yyww}")
+    return _orig(sport, year, yyww, *a, **kw)
+processor.process_one = _wrapped
+res = processor.reprocess_raw(queue=%r, force=True)
+print(json.dumps({"done": done, "queue": res["queue"]}))
+"""
+
+
+def _spawn(env: dict, queue: str, slow_s: float) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", _WORKER % (slow_s, queue)], cwd=ROOT, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+
+
+def _collect(procs) -> list:
+    out = []
+    for p in procs:
+        stdout, _ = p.communicate()
+        lines = [l for l in stdout.splitlines() if l.startswith("{")]
+        out.append(json.loads(lines[-1]) if lines else None)
+    return out
+
+
+def _weeks(data_root: str) -> int:
+    sys.path.insert(0, ROOT)
+    from app import rawstore
+    raw_root = os.path.join(data_root, "raw")
+    n = 0
+    for sp in ("nfl", "cfb"):
+        d = os.path.join(raw_root, sp)
+        if not os.path.isdir(d):
+            continue
+        for y in os.listdir(d):
+            if y.isdigit():
+                n += sum(1 for _ in rawstore.iter_weeks(raw_root, sp, int(y)))
+    return n
+
+
+def _check(label: str, results: list, total: int) -> None:
+    seen = {}
+    for r in results:
+        for k in (r or {}).get("done", []):
+            seen[k] = seen.get(k, 0) + 1
+    dupes = {k: n for k, n in seen.items() if n > 1}
+    missing = total - len(seen)
+    print(f"[bench] {label}: weeks={total} processed={sum(seen.values())} duplicates={len(dupes)} missing={missing}")
+
+
+def run(data_root: str, workers: int, slow_s: float, env: dict, total: int) -> None:
+    queue = f"bench-{workers}-{int(time.time() * 1000)}"
+    t0 = time.perf_counter()
+    results = _collect([_spawn(env, queue, slow_s) for _ in range(workers)])
+    dt = time.perf_counter() - t0
+    split = [len((r or {}).get("done", [])) for r in results]
+    print(f"[bench] workers={workers:2d} wall {dt * 1000:8.1f} ms  split={split}")
+    _check(f"workers={workers}", results, total)
+
+
+def run_kill(data_root: str, workers: int, slow_s: float, env: dict, total: int) -> None:
+    env = dict(env, QUEUE_LEASE_TTL_S="1.5", QUEUE_HEARTBEAT_S="0.3")
+    queue = f"bench-kill-{int(time.time() * 1000)}"
+    procs = [_spawn(env, queue, slow_s) for _ in range(max(2, workers))]
+    victim = f":{procs[0].pid}"
+    qdir = os.path.join(data_root, "queue", f"reprocess-{queue}")
+    deadline = time.time() + 30
+    while time.time() < deadline:   # kill once the victim holds a lease
+        held = False
+        for fname in (os.listdir(qdir) if os.path.isdir(qdir) else []):
+            try:
+                with open(os.path.join(qdir, fname)) as f:
+                    doc = json.load(f)
+            except (OSError, ValueError):
+                continue
+            held = held or (doc.get("state") == "leased" and str(doc.get("owner", "")).endswith(victim))
+        if held:
+            break
+        time.sleep(0.02)
+    procs[0].send_signal(signal.SIGKILL)
+    procs[0].wait()
+    results = _collect(procs[1:])
+    time.sleep(1.6)   # let the dead worker's leases expire
+    results += _collect([_spawn(env, queue, slow_s)])
+    stolen = sum((r or {}).get("queue", {}).get("stolen", 0) for r in results)
+    print(f"[bench] kill: expired leases taken over from the killed worker: {stolen}")
+    seen = set(k for r in results for k in (r or {}).get("done", []))
+    print(f"[bench] kill: {len(seen)}/{total} weeks finished by surviving workers (the killed worker's completed weeks are not counted)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data-root", required=True, help="DATA_ROOT with raw weeks (copied, not modified)")
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--slow-ms", type=float, default=0.0)
+    ap.add_argument("--kill", action="store_true")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-queue-")
+    try:
+        data_root = os.path.join(tmp, "data")
+        shutil.copytree(args.data_root, data_root)
+        env = dict(os.environ, DATA_ROOT=data_root, SHM_ENABLED="0")
+        total = _weeks(data_root)
+        slow_s = args.slow_ms / 1000.0
+        for n in [int(x) for x in args.workers.split(",") if x.strip()]:
+            run(data_root, n, slow_s, env, total)
+        if args.kill:
+            run_kill(data_root, max(int(x) for x in args.workers.split(",")), slow_s, env, total)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench/bench_shm.py
+"""
+Player-row enrichment (processor._enrich_players: FullName/Position by
+player id, Team by TeamID) over plain dict reference maps vs the SharedMap
+views of the mmap'd ref_players / ref_teams packs that SHM_ENABLED=1 uses.
+
+    python -m bench.bench_shm [--players 30000] [--teams 260] [--rows 6000] [--weeks 40] [--repeat 5]
+
+Each repeat starts from fresh maps and enriches every week twice: "cold"
+is the first pass (a SharedMap decodes each entry the first time this
+worker sees it), "warm" the second (everything served from its memo, the
+state a long-running worker is in). No data directory is needed: the packs
+are published under a temp DATA_ROOT.
+"""
+import argparse, os, random, shutil, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_maps(n_players: int, n_teams: int, seed: int = 7) -> tuple:
+    rnd = random.Random(seed)
+    positions = ["QB", "RB", "WR", "TE", "K", "P", "OL", "DL", "LB", "CB", "S"]
+    players = {str(20000 + i): {"FullName": f"First{i} Last{i}", "Position": rnd.choice(positions)} for i in range(n_players)}
+    teams = {str(i + 1): f"Team {i}" for i in range(n_teams)}
+    return players, teams
+
+
+def synthetic_weeks(players: dict, n_teams: int, rows: int, weeks: int, seed: int = 11) -> list:
+    """Player rows per week, ~2% with ids missing from the CSV (the same unknowns recur)."""
+    rnd = random.Random(seed)
+    roster = rnd.sample(list(players), min(len(players), rows * 2))
+    unknown = [10 ** 7 + i for i in range(max(1, rows // 50))]
+    out = []
+    for _ in range(weeks):
+        out.append([
+            {"PlayerID": int(rnd.choice(roster)) if rnd.random() > 0.02 else rnd.choice(unknown),
+             "TeamID": rnd.randint(1, n_teams + 2), "PassingYards": rnd.randint(0, 400)}
+            for _ in range(rows)
+        ])
+    return out
+
+
+def _pass(players, teams, weeks: list) -> float:
+    from app.processor import _enrich_players
+    t0 = time.perf_counter()
+    for rows in weeks:
+        _enrich_players(rows, "PlayerID", players, teams)
+    return time.perf_counter() - t0
+
+
+def _time(make, weeks: list, repeat: int) -> dict:
+    """Best-of-`repeat` cold and warm per-row cost; `make()` gives fresh maps."""
+    cold, warm = float("inf"), float("inf")
+    for _ in range(repeat):
+        players, teams = make()
+        cold = min(cold, _pass(players, teams, weeks))
+        warm = min(warm, _pass(players, teams, weeks))
+    n = sum(len(rows) for rows in weeks)
+    return {"cold_us": cold / n * 1e6, "warm_us": warm / n * 1e6}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=30000)
+    ap.add_argument("--teams", type=int, default=260)
+    ap.add_argument("--rows", type=int, default=6000)
+    ap.add_argument("--weeks", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    from app.config import settings
+    from app import sharedmem
+
+    tmp = tempfile.mkdtemp(prefix="bench-shm-")
+    settings.DATA_ROOT = tmp
+    try:
+        players, teams = synthetic_maps(args.players, args.teams)
+        weeks = synthetic_weeks(players, args.teams, args.rows, args.weeks)
+        stamp = {"size": 0, "mtime_ns": 0}
+        if sharedmem.publish_refmap("players", stamp, None, players) is None or \
+           sharedmem.publish_refmap("teams_bench", stamp, None, teams) is None:
+            raise SystemExit("[bench] could not publish the ref packs")
+        print(f"[bench] {args.players} players, {args.teams} teams, {args.weeks} weeks x {args.rows} rows")
+
+        res = {
+            "dict": _time(lambda: (dict(players), dict(teams)), weeks, args.repeat),
+            "shm": _time(lambda: (sharedmem.refmap("players", stamp), sharedmem.refmap("teams_bench", stamp)), weeks, args.repeat),
+        }
+        base = res["dict"]
+        for label, r in res.items():
+            print(
+                f"[bench] {label:5s} cold {r['cold_us']:7.3f} us/row  warm {r['warm_us']:7.3f} us/row  "
+                f"(warm x{r['warm_us'] / base['warm_us']:.2f} vs dict)"
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bench/bench_startup.py
+"""
+Cold-start cost of a worker: wall time to `import app.main` in a fresh
+interpreter (median of N), which heavy modules that import dragged in, and
+the first reference-map load from CSV vs from the cached snapshot.
+
+    python -m bench.bench_startup [--runs 7] [--compare <git-rev>]
+
+--compare checks <git-rev> out into a temporary worktree and measures it
+the same way, e.g. `--compare HEAD~1` for before/after numbers.
+"""
+import argparse, os, shutil, statistics, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("requests", "numpy", "app.processor", "pyarrow")
+
+_IMPORT_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import app.main
+dt = time.perf_counter() - t0
+print(json.dumps({"s": dt, "loaded": [m for m in %r if m in sys.modules], "modules": len(sys.modules)}))
+"""
+
+_REFMAP_PROBE = """
+import time, json
+from app import processor
+t0 = time.perf_counter()
+p, _ = processor._load_players_map()
+processor._load_team_map("nfl"); processor._load_team_map("cfb")
+print(json.dumps({"s": time.perf_counter() - t0, "players": len(p)}))
+"""
+
+
+def _probe(tree: str, code: str, env: dict) -> dict:
+    import json
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=tree, env=env,
+        capture_output=True, text=True,
+    )
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if out.returncode != 0 or not lines:
+        err = (out.stderr.strip().splitlines() or ["?"])[-1]
+        return {"error": err}
+    return json.loads(lines[-1])
+
+
+def measure(tree: str, runs: int, data_root: str) -> dict:
+    env = dict(os.environ, DATA_ROOT=data_root, PYTHONDONTWRITEBYTECODE="0")
+    times, last = [], {}
+    _probe(tree, _IMPORT_PROBE % (HEAVY,), env)  # warm .pyc
+    for _ in range(runs):
+        last = _probe(tree, _IMPORT_PROBE % (HEAVY,), env)
+        if "error" in last:
+            break
+        times.append(last["s"])
+    res = {"tree": tree}
+    if times:
+        res.update(import_ms=round(statistics.median(times) * 1000, 1), heavy_loaded=last["loaded"], modules=last["modules"])
+    else:
+        res["import_error"] = last.get("error")
+
+    snap_dir = os.path.join(data_root, "cache", "refmaps")
+    shutil.rmtree(snap_dir, ignore_errors=True)
+    cold = _probe(tree, _REFMAP_PROBE, env)
+    warm = _probe(tree, _REFMAP_PROBE, env)
+    if "error" not in cold:
+        res["refmaps_csv_ms"] = round(cold["s"] * 1000, 1)
+        res["refmaps_second_ms"] = round(warm.get("s", 0) * 1000, 1)
+        res["players"] = cold["players"]
+    else:
+        res["refmaps_error"] = cold["error"]
+    return res
+
+
+def _print(label: str, r: dict) -> None:
+    if "import_ms" in r:
+        print(f"[bench] {label:8s} import app.main {r['import_ms']:8.1f} ms  modules={r['modules']}  heavy={r['heavy_loaded'] or '-'}")
+    else:
+        print(f"[bench] {label:8s} import app.main failed: {r['import_error']}")
+    if "refmaps_csv_ms" in r:
+        print(f"[bench] {label:8s} ref maps: first load {r['refmaps_csv_ms']:8.1f} ms, next worker {r['refmaps_second_ms']:8.1f} ms ({r['players']} players)")
+    else:
+        print(f"[bench] {label:8s} ref maps failed: {r['refmaps_error']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--compare", default=None, help="git rev to measure as the baseline")
+    ap.add_argument("--data-root", default=None, help="DATA_ROOT to use (default: temp copy of reference CSVs)")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-startup-")
+    try:
+        data_root = args.data_root or os.path.join(tmp, "data")
+        if not args.data_root:
+            sys.path.insert(0, ROOT)
+            from app.startup import seed_reference_files
+            seed_reference_files(data_root, os.path.join(ROOT, "app"))
+
+        if args.compare:
+            base = os.path.join(tmp, "base")
+            subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", base, args.compare],
+                           check=True, capture_output=True)
+            try:
+                _print("base", measure(base, args.runs, data_root))
+            finally:
+                subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", base], capture_output=True)
+        _print("current", measure(ROOT, args.runs, data_root))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
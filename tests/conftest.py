@@ -0,0 +1,38 @@
+# tests/conftest.py
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app import projections, seasonpack  # noqa: E402
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    """A throwaway DATA_ROOT; module caches keyed by path are cleared around each test."""
+    monkeypatch.setattr(settings, "DATA_ROOT", str(tmp_path))
+    monkeypatch.setattr(settings, "SEASON_PACKS", False)
+    seasonpack._seasons.clear()
+    projections._seasons.clear()
+    yield str(tmp_path)
+    seasonpack._seasons.clear()
+    projections._seasons.clear()
+
+
+@pytest.fixture
+def put_week(data_root):
+    """Write a loose processed week: put_week(sport, year, week, players, teams=())."""
+    from app import bundle, jsonio
+    from app.util import atomic_write
+
+    def put(sport, year, week, players, teams=()):
+        arrays = bundle.ARRAYS[sport]
+        doc = {arrays["team"]: list(teams), arrays["player"]: list(players)}
+        yyww = f"{year % 100:02d}{week:02d}"
+        path = os.path.join(seasonpack.year_dir(sport, year), f"{yyww}.json")
+        atomic_write(path, jsonio.dumps(doc, indent=True))
+        return yyww
+
+    return put
@@ -0,0 +1,25 @@
+# tests/test_bundle.py
+import os
+
+from app import bundle, jsonio, seasonpack, weekcache
+from app.util import atomic_write
+
+
+def _week(year, yyww, rows):
+    doc = {"NFLTeamGameStats": rows, "NFLPlayerGameStats": []}
+    atomic_write(os.path.join(seasonpack.year_dir("nfl", year), f"{yyww}.json"), jsonio.dumps(doc, indent=True))
+
+
+def test_bundle_streams_weeks_without_touching_weekcache(data_root):
+    for w in range(1, 4):
+        _week(2025, f"25{w:02d}", [{"TeamID": 1, "Week": w}])
+    weekcache.clear()
+    before = weekcache.stats()
+
+    out = b"".join(bundle.stream_bundle("nfl", 2025, view="team", fmt="ndjson"))
+    rows = [jsonio.loads(line) for line in out.splitlines()]
+    assert [r["Week"] for r in rows] == [1, 2, 3]
+
+    after = weekcache.stats()
+    assert after["entries"] == 0
+    assert after["misses"] == before["misses"]
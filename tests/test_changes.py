@@ -0,0 +1,57 @@
+# tests/test_changes.py
+import os
+
+from app import changes
+from app.config import settings
+
+
+def _log(n, diff=None):
+    return [changes.record("nfl", 2025, "2501", None, f"s{i}", diff=diff) for i in range(n)]
+
+
+def test_since_pages_across_segments(data_root, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGES_SEGMENT_ENTRIES", 3)
+    monkeypatch.setattr(settings, "CHANGES_KEEP_SEGMENTS", 10)
+    assert _log(8) == list(range(1, 9))
+    d = os.path.join(data_root, "changes")
+    assert sorted(f for f in os.listdir(d) if f.startswith("log.")) == ["log.3.jsonl", "log.6.jsonl", "log.jsonl"]
+
+    res = changes.since(0)
+    assert [e["version"] for e in res["changes"]] == list(range(1, 9)) and not res["reset"]
+    assert [e["version"] for e in changes.since(5)["changes"]] == [6, 7, 8]
+
+    page = changes.since(2, limit=3)
+    assert [e["version"] for e in page["changes"]] == [3, 4, 5] and page["more"]
+    assert changes.since(8)["changes"] == []
+    assert changes.since(9)["reset"]
+
+
+def test_retention_drops_old_segments_and_diffs(data_root, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGES_SEGMENT_ENTRIES", 2)
+    monkeypatch.setattr(settings, "CHANGES_KEEP_SEGMENTS", 2)
+    diff = {"NFLTeamGameStats": {"key": "TeamID", "added": [{"TeamID": 1}], "changed": [], "removed": []}}
+    _log(7, diff=diff)
+
+    assert changes.pruned_version() == 2
+    assert changes.load_diff(2) is None and changes.load_diff(3) == diff
+    res = changes.since(0, rows=True)
+    assert res["reset"] and res["changes"][0]["version"] == 3
+    assert res["changes"][0]["diff"] == diff
+    assert not changes.since(2)["reset"]
+
+
+def test_diff_rows():
+    old = {"P": [{"ID": 1, "GameID": 10, "Y": 5}, {"ID": 2, "GameID": 10, "Y": 7}, {"ID": 3, "GameID": 10}]}
+    new = {"P": [{"ID": 1, "GameID": 10, "Y": 5}, {"ID": 2, "GameID": 10, "Y": 9}, {"ID": 4, "GameID": 10}]}
+    d = changes.diff_rows(old, new, {"P": "ID"})["P"]
+    assert d["key"] == "ID"
+    assert d["added"] == [{"ID": 4, "GameID": 10}]
+    assert d["changed"] == [{"ID": 2, "GameID": 10, "Y": 9}]
+    assert d["removed"] == [[3, 10]]
+
+
+def test_diff_rows_same_player_two_games():
+    old = {"P": [{"ID": 1, "GameID": 10, "Y": 1}]}
+    new = {"P": [{"ID": 1, "GameID": 10, "Y": 1}, {"ID": 1, "GameID": 11, "Y": 2}]}
+    d = changes.diff_rows(old, new, {"P": "ID"})["P"]
+    assert d["added"] == [{"ID": 1, "GameID": 11, "Y": 2}] and d["changed"] == [] and d["removed"] == []
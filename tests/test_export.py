@@ -0,0 +1,24 @@
+# tests/test_export.py
+import os
+import tempfile
+
+import pytest
+
+from app import export
+
+
+def test_write_parquet_removes_temp_file_on_error(data_root, put_week, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    put_week("nfl", 2025, 1, [{"NFLPlayerID": "P1", "Position": "WR", "Catches": 3}])
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(spool))
+
+    def boom(*a, **kw):
+        raise RuntimeError("row source failed")
+        yield
+
+    monkeypatch.setattr(export, "iter_export_rows", boom)
+    with pytest.raises(RuntimeError):
+        export.write_parquet("nfl", 2025, "player", [(1, "2501")], ["NFLPlayerID"])
+    assert os.listdir(spool) == []
@@ -0,0 +1,115 @@
+# tests/test_lineup.py
+import itertools
+
+import numpy as np
+import pytest
+
+from app import lineup
+
+SLOTS = {"QB": 1, "RB": 2, "WR": 2, "FLEX": 1}
+COUNTS = {"QB": 4, "RB": 7, "WR": 8, "TE": 3}
+
+
+def _players(rng, counts):
+    out = []
+    for pos, n in counts.items():
+        for i in range(n):
+            pts = int(rng.integers(0, 30))
+            out.append({"NFLPlayerID": f"{pos}{i}", "Position": pos, "Team": "T%d" % (i % 4), "Catches": pts})
+    return out
+
+
+def _salaries(rng, players):
+    return {p["NFLPlayerID"]: float(3000 + 150 * p["Catches"] + int(rng.integers(0, 1500))) for p in players}
+
+
+def _brute(players, cap=None, salaries=None, top_n=5):
+    """Every distinct (QB, 2 RB, 2 WR, FLEX) player set, best totals first."""
+    by = {}
+    for p in players:
+        by.setdefault(p["Position"], []).append(p)
+    sets = set()
+    for qb in by["QB"]:
+        for rbs in itertools.combinations(by["RB"], 2):
+            for wrs in itertools.combinations(by["WR"], 2):
+                used = {qb["NFLPlayerID"]} | {p["NFLPlayerID"] for p in rbs + wrs}
+                for fx in by["RB"] + by["WR"] + by.get("TE", []):
+                    if fx["NFLPlayerID"] in used:
+                        continue
+                    ids = frozenset(used | {fx["NFLPlayerID"]})
+                    if cap is not None and sum(salaries[i] for i in ids) > cap:
+                        continue
+                    sets.add(ids)
+    pts = {p["NFLPlayerID"]: p["Catches"] for p in players}
+    return sorted((sum(pts[i] for i in s) for s in sets), reverse=True)[:top_n]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_branch_and_bound_matches_brute_force(data_root, put_week, seed):
+    rng = np.random.default_rng(seed)
+    players = _players(rng, COUNTS)
+    put_week("nfl", 2025, 1, players)
+    res = lineup.optimize("nfl", 2025, week=1, slots=SLOTS, source="actual", top_n=5)
+    assert [l["total"] for l in res["lineups"]] == _brute(players)
+    ids = [frozenset(p["id"] for p in l["players"]) for l in res["lineups"]]
+    assert len(set(ids)) == len(ids)
+
+
+@pytest.mark.parametrize("seed", [4, 5, 6])
+def test_salary_capped_search_matches_brute_force(data_root, put_week, seed):
+    rng = np.random.default_rng(seed)
+    players = _players(rng, COUNTS)
+    sal = _salaries(rng, players)
+    cap = 0.8 * sum(sorted(sal.values(), reverse=True)[:6])
+    put_week("nfl", 2025, 1, players)
+    res = lineup.optimize("nfl", 2025, week=1, slots=SLOTS, source="actual", top_n=5,
+                          salaries=sal, salary_cap=cap)
+    assert [l["total"] for l in res["lineups"]] == _brute(players, cap, sal)
+    assert all(l["salary"] <= cap for l in res["lineups"])
+
+
+def test_salary_capped_pools_stay_searchable(data_root, put_week):
+    # a realistic slate: salaries track points, so few players are dominated
+    rng = np.random.default_rng(7)
+    counts = {"QB": 32, "RB": 70, "WR": 100, "TE": 40, "K": 32}
+    players = _players(rng, counts)
+    sal = _salaries(rng, players)
+    put_week("nfl", 2025, 1, players, [{"TeamID": t, "Team": f"T{t}"} for t in range(32)])
+    slots = {"QB": 1, "RB": 2, "WR": 3, "TE": 1, "FLEX": 1, "K": 1}
+    cap = 50000.0
+    res = lineup.optimize("nfl", 2025, week=1, slots=slots, source="actual", top_n=5,
+                          salaries=sal, salary_cap=cap)
+    assert len(res["lineups"]) == 5
+    assert all(l["salary"] <= cap for l in res["lineups"])
+    totals = [l["total"] for l in res["lineups"]]
+    assert totals == sorted(totals, reverse=True)
+    assert res["pool_sizes"]["WR"] < counts["WR"]
+    assert res["nodes"] < 50_000, res["nodes"]
+
+
+def test_lock_exclude_and_teams(data_root, put_week):
+    rng = np.random.default_rng(8)
+    players = _players(rng, COUNTS)
+    put_week("nfl", 2025, 1, players)
+    worst_qb = min((p for p in players if p["Position"] == "QB"), key=lambda p: p["Catches"])
+    best_rb = max((p for p in players if p["Position"] == "RB"), key=lambda p: p["Catches"])
+
+    res = lineup.optimize("nfl", 2025, week=1, slots=SLOTS, source="actual", top_n=3,
+                          lock=[worst_qb["NFLPlayerID"]], exclude=[best_rb["NFLPlayerID"]])
+    for l in res["lineups"]:
+        ids = {p["id"] for p in l["players"]}
+        assert worst_qb["NFLPlayerID"] in ids and best_rb["NFLPlayerID"] not in ids
+
+    res = lineup.optimize("nfl", 2025, week=1, slots={"WR": 2}, source="actual", teams=["T1"])
+    assert all(p["team"] == "T1" for l in res["lineups"] for p in l["players"])
+
+
+def test_errors(data_root, put_week):
+    put_week("nfl", 2025, 1, _players(np.random.default_rng(9), COUNTS))
+    with pytest.raises(lineup.LineupError):
+        lineup.optimize("nfl", 2025, window="last3")
+    with pytest.raises(lineup.LineupError):
+        lineup.optimize("nfl", 2025, week=2, source="actual")
+    with pytest.raises(lineup.LineupError):
+        lineup.optimize("nfl", 2025, week=1, source="actual", slots={"QB": 5})
+    assert lineup.optimize("nfl", 2030) is None
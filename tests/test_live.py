@@ -0,0 +1,28 @@
+# tests/test_live.py
+import asyncio
+
+from app import changes, live
+from app.config import settings
+
+DIFF = {"NFLTeamGameStats": {"key": "TeamID", "added": [{"TeamID": 1}], "changed": [], "removed": []}}
+
+
+async def _next_entry(rows):
+    hub = live._Hub()
+    q = hub.subscribe(rows)
+    await asyncio.sleep(0.05)   # hub has read the starting version
+    await asyncio.to_thread(changes.record, "nfl", 2025, "2501", None, "abc", "process", DIFF)
+    try:
+        return await asyncio.wait_for(q.get(), timeout=2)
+    finally:
+        hub.unsubscribe(q)
+        await hub.task
+
+
+def test_hub_loads_row_diffs_only_for_row_subscribers(data_root, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_POLL_S", 0.01)
+    plain = asyncio.run(_next_entry(False))
+    assert plain["version"] == 1 and "diff" not in plain
+
+    with_rows = asyncio.run(_next_entry(True))
+    assert with_rows["version"] == 2 and with_rows["diff"] == DIFF
@@ -0,0 +1,90 @@
+# tests/test_projections.py
+import os
+
+import numpy as np
+
+from app import projections
+
+
+def _naive(games, k=None, alpha=None):
+    """Projection from a plain list of earlier games (None if no games)."""
+    if not games:
+        return None
+    if alpha is not None:
+        num = den = 0.0
+        for g in games:
+            num = g + (1 - alpha) * num
+            den = 1 + (1 - alpha) * den
+        return num / den
+    use = games[-k:] if k else games
+    return sum(use) / len(use)
+
+
+def _random_season(rng, players=12, weeks=9):
+    ids = np.array([f"P{i:02d}" for i in range(players)])
+    week_ids, week_vals = [], []
+    for _ in range(weeks):
+        played = np.sort(rng.choice(ids, size=rng.integers(1, players + 1), replace=False))
+        week_ids.append(played)
+        week_vals.append(rng.integers(0, 40, size=(len(played), 2)).astype(np.float64))
+    return week_ids, week_vals
+
+
+def test_rolling_matches_naive_and_uses_only_earlier_weeks():
+    rng = np.random.default_rng(3)
+    week_ids, week_vals = _random_season(rng)
+    alpha = 0.4
+    ids, games, cubes = projections.rolling(week_ids, week_vals, alpha)
+    W = len(week_ids)
+    assert cubes["l3"].shape == (len(ids), W + 1, 2)
+
+    for p, pid in enumerate(ids):
+        for slot in range(W + 1):
+            earlier = [week_vals[w][np.searchsorted(week_ids[w], pid)]
+                       for w in range(slot) if pid in week_ids[w]]
+            assert games[p, slot] == len(earlier)
+            for m in range(2):
+                hist = [float(v[m]) for v in earlier]
+                for name, want in (("l3", _naive(hist, 3)), ("l5", _naive(hist, 5)),
+                                   ("season", _naive(hist)), ("ewma", _naive(hist, alpha=alpha))):
+                    got = cubes[name][p, slot, m]
+                    if want is None:
+                        assert np.isnan(got), (name, pid, slot)
+                    else:
+                        assert abs(got - want) < 1e-9, (name, pid, slot)
+
+
+def test_changing_a_week_never_moves_earlier_slots():
+    rng = np.random.default_rng(11)
+    week_ids, week_vals = _random_season(rng)
+    _, _, before = projections.rolling(week_ids, week_vals, 0.4)
+    for w in range(len(week_ids)):
+        bumped = [v.copy() for v in week_vals]
+        bumped[w] += 100.0
+        _, _, after = projections.rolling(week_ids, bumped, 0.4)
+        for name in projections.WINDOWS:
+            np.testing.assert_array_equal(after[name][:, :w + 1], before[name][:, :w + 1])
+            assert not np.array_equal(after[name][:, w + 1:], before[name][:, w + 1:])
+
+
+def test_season_and_week_table_from_processed_weeks(data_root, put_week):
+    # Catches = fantasy points (1 per catch); P2 has a bye in week 2
+    for week, pts in ((1, (10, 4)), (2, (20, None)), (3, (30, 8)), (4, (40, 2))):
+        rows = [{"NFLPlayerID": "P1", "FullName": "One", "Position": "WR", "Team": "AAA", "Catches": pts[0]}]
+        if pts[1] is not None:
+            rows.append({"NFLPlayerID": "P2", "FullName": "Two", "Position": "TE", "Team": "BBB", "Catches": pts[1]})
+        put_week("nfl", 2025, week, rows, [{"TeamID": 7, "Team": "AAA"}])
+
+    table = projections.week_table("nfl", 2025, week=4, metric_filter=["Calc_TotalPoints"])
+    assert table["based_on_weeks"] == [1, 2, 3]
+    col = {c: i for i, c in enumerate(table["columns"])}
+    rows = {r[0]: r for r in table["rows"]}
+    assert rows["P1"][col["projected_Calc_TotalPoints_l3"]] == 20.0
+    assert rows["P2"][col["Games"]] == 2
+    assert rows["P2"][col["projected_Calc_TotalPoints_season"]] == 6.0
+    assert "DEF:7" in rows and rows["DEF:7"][col["Position"]] == "DEF"
+
+    nxt = projections.week_table("nfl", 2025, metric_filter=["Calc_TotalPoints"])
+    assert nxt["week"] == 5
+    assert {r[0]: r for r in nxt["rows"]}["P1"][col["projected_Calc_TotalPoints_l3"]] == 30.0
+    assert os.path.isfile(projections.week_path("nfl", 2025, "2501"))
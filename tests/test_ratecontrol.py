@@ -0,0 +1,63 @@
+# tests/test_ratecontrol.py
+import requests
+
+from app import processor
+from app.config import settings
+from app.ratecontrol import AdaptiveRate, CircuitBreaker
+
+
+class _Resp:
+    def __init__(self, status, content=b"{}"):
+        self.status_code = status
+        self.content = content
+        self.headers = {}
+
+
+class _Session:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kw):
+        self.calls += 1
+        o = self.outcomes.pop(0)
+        if isinstance(o, Exception):
+            raise o
+        return o
+
+
+def _rate():
+    return AdaptiveRate(initial_delay_s=0.001, min_delay_s=0.001, max_delay_s=0.01)
+
+
+def test_default_floor_lets_pacing_speed_up():
+    start, floor = 0.35, settings.SYNC_MIN_DELAY_MS / 1000.0
+    assert floor < start
+    rate = AdaptiveRate(initial_delay_s=start, min_delay_s=floor)
+    for _ in range(50):
+        rate.on_success(0.05)
+    assert abs(rate.delay_s - floor) < 1e-9
+
+
+def test_breaker_counts_one_failure_per_week():
+    breaker = CircuitBreaker(threshold=5)
+    session = _Session([requests.Timeout()] * 3)
+    body, reason = processor._fetch_week(session, "u", _rate(), breaker)
+    assert (body, reason) == (None, "timeout") and session.calls == 3
+    assert breaker.failures == 1 and not breaker.open
+
+
+def test_breaker_opens_after_threshold_weeks():
+    breaker = CircuitBreaker(threshold=2)
+    for _ in range(2):
+        processor._fetch_week(_Session([_Resp(503)] * 3), "u", _rate(), breaker)
+    assert breaker.open
+    assert processor._fetch_week(_Session([]), "u", _rate(), breaker) == (None, "circuit_open")
+
+
+def test_retry_success_resets_breaker_and_429_alone_does_not_count():
+    breaker = CircuitBreaker(threshold=5)
+    body, _ = processor._fetch_week(_Session([_Resp(500), _Resp(200, b"ok")]), "u", _rate(), breaker)
+    assert body == b"ok" and breaker.failures == 0
+    processor._fetch_week(_Session([_Resp(429)] * 3), "u", _rate(), breaker)
+    assert breaker.failures == 0
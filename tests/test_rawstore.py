@@ -0,0 +1,72 @@
+# tests/test_rawstore.py
+import os
+
+from app import rawstore
+
+
+def _wp(root, yyww="2501", sport="nfl", year=2025):
+    return rawstore.week_path(root, sport, year, yyww)
+
+
+def test_store_new_unchanged_updated(data_root):
+    wp = _wp(data_root)
+    st, sha = rawstore.store(wp, b'{"a": 1}')
+    assert st == "new" and rawstore.raw_sha(wp) == sha
+    assert rawstore.read_bytes(wp) == b'{"a": 1}'
+    assert os.path.isfile(rawstore.compressed_blob(wp))
+    assert rawstore.store(wp, b'{"a": 1}') == ("unchanged", sha)
+    st, sha2 = rawstore.store(wp, b'{"a": 2}')
+    assert st == "updated" and sha2 != sha
+    assert rawstore.read_bytes(wp) == b'{"a": 2}'
+
+
+def test_identical_payloads_share_one_blob(data_root):
+    rawstore.store(_wp(data_root, "2501"), b"[]")
+    rawstore.store(_wp(data_root, "2502"), b"[]")
+    blobs = [f for _, _, fs in os.walk(os.path.join(data_root, "raw", rawstore.BLOB_DIR)) for f in fs]
+    assert len(blobs) == 1
+
+
+def test_lost_blob_is_rewritten(data_root):
+    wp = _wp(data_root)
+    _, sha = rawstore.store(wp, b'{"a": 1}')
+    os.remove(rawstore.blob_path(os.path.join(data_root, "raw"), sha))
+    assert rawstore.read_bytes(wp) is None
+    assert rawstore.store(wp, b'{"a": 1}') == ("unchanged", sha)
+    assert rawstore.read_bytes(wp) == b'{"a": 1}'
+
+
+def test_migrate_legacy_files(data_root):
+    wp = _wp(data_root)
+    os.makedirs(os.path.dirname(wp))
+    with open(wp, "wb") as f:
+        f.write(b'{"old": true}')
+    assert rawstore.read_bytes(wp) == b'{"old": true}'
+    sha = rawstore.raw_sha(wp)
+
+    assert rawstore.migrate(data_root) == {"migrated": 1, "errors": 0}
+    assert not os.path.exists(wp) and rawstore.read_ref(wp)["sha256"] == sha
+    assert rawstore.read_bytes(wp) == b'{"old": true}'
+    assert rawstore.migrate(data_root) == {"migrated": 0, "errors": 0}
+    assert [y for y, _ in rawstore.iter_weeks(os.path.join(data_root, "raw"), "nfl", 2025)] == ["2501"]
+
+
+def test_store_over_legacy_file_reports_update(data_root):
+    wp = _wp(data_root)
+    os.makedirs(os.path.dirname(wp))
+    with open(wp, "wb") as f:
+        f.write(b"v1")
+    assert rawstore.store(wp, b"v1")[0] == "unchanged"
+    assert not os.path.exists(wp)
+    assert rawstore.store(wp, b"v2")[0] == "updated"
+
+
+def test_gc_removes_unreferenced_blobs(data_root):
+    wp = _wp(data_root)
+    _, old = rawstore.store(wp, b"v1")
+    _, new = rawstore.store(wp, b"v2")
+    raw_root = os.path.join(data_root, "raw")
+    res = rawstore.gc(data_root)
+    assert (res["blobs_kept"], res["blobs_removed"]) == (1, 1) and res["bytes_freed"] > 0
+    assert not os.path.exists(rawstore.blob_path(raw_root, old))
+    assert rawstore.read_bytes(wp) == b"v2"
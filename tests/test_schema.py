@@ -0,0 +1,15 @@
+# tests/test_schema.py
+from app import schema
+
+
+def test_id_key_rule():
+    assert schema.id_key("nfl", "team", ["ID", "TeamID"]) == "TeamID"
+    assert schema.id_key("nfl", "player", ["ID", "TeamID", "NFLPlayerID"]) == "NFLPlayerID"
+    assert schema.id_key("cfb", "player", ["GameID", "TeamID", "CollegePlayerID"]) == "CollegePlayerID"
+    assert schema.id_key("nfl", "player", ["GameID", "SeasonID", "TeamID", "PlayerID", "ID"]) == "PlayerID"
+    assert schema.id_key("cfb", "player", ["GameID", "Name"]) == "ID"
+
+
+def test_id_key_uses_every_rows_columns():
+    rows = [{"GameID": 1}, {"GameID": 2, "NFLPlayerID": 9}]
+    assert schema.id_key("nfl", "player", schema.column_names(rows)) == "NFLPlayerID"
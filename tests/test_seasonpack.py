@@ -0,0 +1,67 @@
+# tests/test_seasonpack.py
+import os
+
+from app import jsonio, seasonpack
+from app.util import atomic_write
+
+
+def _loose_week(sport, year, yyww, body, sha):
+    ydir = seasonpack.year_dir(sport, year)
+    atomic_write(os.path.join(ydir, f"{yyww}.json"), body)
+    atomic_write(os.path.join(ydir, f"{yyww}.meta.json"), jsonio.dumps({"output_sha256": sha}))
+
+
+def test_pack_replace_compact_read(data_root):
+    _loose_week("nfl", 2025, "2501", b'{"w": 1}', "a1")
+    _loose_week("nfl", 2025, "2502", b'{"w": 2}', "a2")
+
+    res = seasonpack.pack_season("nfl", 2025)
+    assert res["packed"] == 2 and seasonpack.is_packed("nfl", 2025)
+    assert not os.path.exists(os.path.join(seasonpack.year_dir("nfl", 2025), "2501.json"))
+    assert seasonpack.week_names("nfl", 2025) == ["2501", "2502"]
+    assert seasonpack.read_week("nfl", 2025, "2501") == b'{"w": 1}'
+
+    before = seasonpack.week_stamp("nfl", 2025, "2501")
+    old = seasonpack._season("nfl", 2025)   # a reader holding the old map
+    seasonpack.write_week("nfl", 2025, "2501", b'{"w": 1, "v": 2}', {"output_sha256": "b1"})
+    assert seasonpack.read_week("nfl", 2025, "2501") == b'{"w": 1, "v": 2}'
+    assert seasonpack.load_meta("nfl", 2025, "2501") == {"output_sha256": "b1"}
+    assert seasonpack.week_stamp("nfl", 2025, "2501") != before
+    assert old.read(old.weeks["2501"]["off"], old.weeks["2501"]["len"]) == b'{"w": 1}'
+
+    st = seasonpack.stats("nfl", 2025)["seasons"][0]
+    assert st["dead_bytes"] > 0
+
+    res = seasonpack.compact("nfl", 2025)
+    assert res["bytes_after"] < res["bytes_before"]
+    st = seasonpack.stats("nfl", 2025)["seasons"][0]
+    assert st["generation"] == 2 and st["dead_bytes"] == 0
+    assert os.listdir(seasonpack.year_dir("nfl", 2025)).count("season-1.pack") == 0
+    # the old map stays readable after its pack file is unlinked
+    assert old.read(old.weeks["2502"]["off"], old.weeks["2502"]["len"]) == b'{"w": 2}'
+
+    assert seasonpack.read_week("nfl", 2025, "2501") == b'{"w": 1, "v": 2}'
+    assert seasonpack.read_week("nfl", 2025, "2502") == b'{"w": 2}'
+    assert seasonpack.load_meta("nfl", 2025, "2502") == {"output_sha256": "a2"}
+
+
+def test_write_meta_keeps_body(data_root):
+    _loose_week("cfb", 2025, "2503", b"[]", "c3")
+    seasonpack.pack_season("cfb", 2025)
+    stamp = seasonpack.week_stamp("cfb", 2025, "2503")
+    seasonpack.write_meta("cfb", 2025, "2503", {"output_sha256": "c3", "note": 1})
+    assert seasonpack.week_stamp("cfb", 2025, "2503") == stamp
+    assert seasonpack.load_meta("cfb", 2025, "2503")["note"] == 1
+
+
+def test_unpack_restores_loose_files(data_root):
+    _loose_week("nfl", 2024, "2401", b'{"x": 1}', "d1")
+    seasonpack.pack_season("nfl", 2024)
+    seasonpack.write_week("nfl", 2024, "2401", b'{"x": 2}', {"output_sha256": "d2"})
+
+    assert seasonpack.unpack_season("nfl", 2024)["unpacked"] == 1
+    assert not seasonpack.is_packed("nfl", 2024)
+    ydir = seasonpack.year_dir("nfl", 2024)
+    assert not [f for f in os.listdir(ydir) if f.endswith(".pack")]
+    assert seasonpack.read_week("nfl", 2024, "2401") == b'{"x": 2}'
+    assert seasonpack.load_meta("nfl", 2024, "2401") == {"output_sha256": "d2"}
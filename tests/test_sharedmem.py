@@ -0,0 +1,39 @@
+# tests/test_sharedmem.py
+import copy
+
+from app import processor, sharedmem
+
+STAMP = {"size": 1, "mtime_ns": 1}
+PLAYERS = {"7": {"FullName": "A B", "Position": "QB"}, "12": {"FullName": "C D", "Position": "WR"}}
+TEAMS = {"1": "Team One", "2": "Team Two"}
+
+
+def test_refmap_lookups_are_memoized(data_root):
+    m = sharedmem.publish_refmap("players", STAMP, "sha", PLAYERS)
+    assert len(m) == 2 and sorted(m) == ["12", "7"] and m.sha256 == "sha"
+    assert m["7"] == PLAYERS["7"] and m.get(12) == PLAYERS["12"]
+    assert m.get("99") is None and "99" not in m and 7 in m
+    assert m.get("7") is m.get("7")              # decoded once per view
+    assert set(m._memo) == {"7", "12"} and m._absent == {"99"}
+    assert sharedmem.refmap("players", dict(STAMP, size=2)) is None
+
+
+def test_resolve_returns_plain_dict_of_hits(data_root):
+    m = sharedmem.publish_refmap("players", STAMP, None, PLAYERS)
+    d = m.resolve(["7", None, "404", "7"])
+    assert type(d) is dict and d == {"7": PLAYERS["7"]}
+    assert m.resolve(["12"]) == PLAYERS and m._absent == {"404"}
+
+
+def test_enrich_players_same_over_shared_maps(data_root):
+    rows = [{"PlayerID": 7, "TeamID": 2}, {"PlayerID": " 12 ", "TeamID": None},
+            {"PlayerID": 404, "TeamID": 9}, {"PlayerID": None}, "junk"]
+    want, got = copy.deepcopy(rows), copy.deepcopy(rows)
+    processor._enrich_players(want, "PlayerID", PLAYERS, TEAMS)
+    processor._enrich_players(got, "PlayerID",
+                              sharedmem.publish_refmap("players", STAMP, None, PLAYERS),
+                              sharedmem.publish_refmap("teams_nfl", STAMP, None, TEAMS))
+    assert got == want
+    assert want[0] == {"PlayerID": 7, "TeamID": 2, "FullName": "A B", "Position": "QB", "Team": "Team Two"}
+    assert want[1]["FullName"] == "C D" and want[1]["Team"] is None
+    assert want[2]["FullName"] is None and want[2]["Team"] is None
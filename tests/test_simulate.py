@@ -0,0 +1,57 @@
+# tests/test_simulate.py
+import numpy as np
+import pytest
+
+from app import simulate
+
+
+def _row(pid, pts):
+    return {"NFLPlayerID": pid, "Position": "WR", "Team": "AAA", "Catches": pts}
+
+
+@pytest.fixture
+def season(put_week):
+    # A1/A2 always outscore B1; B2 scores 0, 0 then 100 in week 3
+    for week, b2 in ((1, 0), (2, 0), (3, 100)):
+        put_week("nfl", 2025, week, [_row("A1", 10), _row("A2", 12), _row("B1", 5), _row("B2", b2)])
+
+
+def test_constant_histories_decide_every_trial(data_root, season):
+    res = simulate.simulate("nfl", 2025, ["A1", "A2"], ["B1"], trials=2000, seed=1, before_week=3)
+    assert res["based_on_weeks"] == [1, 2]
+    assert (res["win_a"], res["win_b"], res["tie"]) == (1.0, 0.0, 0.0)
+    assert res["team_a"]["score"]["mean"] == 22.0 and res["team_a"]["score"]["sd"] == 0.0
+
+
+def test_before_week_hides_later_games(data_root, season):
+    early = simulate.simulate("nfl", 2025, ["B2"], ["B1"], trials=1000, seed=2, before_week=3)
+    assert early["team_a"]["players"][0] == {"id": "B2", "name": None, "games": 2, "mean": 0.0}
+    assert early["win_b"] == 1.0
+
+    full = simulate.simulate("nfl", 2025, ["B2"], ["B1"], trials=30000, seed=2)
+    assert full["team_a"]["players"][0]["games"] == 3
+    assert full["win_a"] == pytest.approx(1 / 3, abs=0.02)
+
+
+def test_empirical_draws_only_observed_values_and_seed_repeats(data_root, season):
+    rng = np.random.default_rng(5)
+    hist = [np.array([0.0, 0.0, 100.0]), np.array([], dtype=np.float64), np.array([7.0])]
+    x = simulate._player_samples(hist, 5000, "empirical", rng)
+    assert x.shape == (5000, 3)
+    assert set(np.unique(x[:, 0])) == {0.0, 100.0}
+    assert not x[:, 1].any() and (x[:, 2] == 7.0).all()
+
+    a = simulate.simulate("nfl", 2025, ["B2"], ["B1"], trials=500, seed=9)
+    b = simulate.simulate("nfl", 2025, ["B2"], ["B1"], trials=500, seed=9)
+    assert a["win_a"] == b["win_a"] and a["margin"] == b["margin"]
+
+
+def test_normal_method_and_missing_players(data_root, season):
+    res = simulate.simulate("nfl", 2025, ["A1", "NOPE"], ["B1"], trials=20000, method="normal", seed=3)
+    assert res["team_a"]["no_history"] == ["NOPE"]
+    # sd is floored at max(25% of the mean, 1pt) for thin / constant histories
+    assert res["team_a"]["score"]["mean"] == pytest.approx(10.0, abs=0.1)
+    assert res["team_a"]["score"]["sd"] == pytest.approx(2.5, abs=0.1)
+    assert simulate.simulate("nfl", 2030, ["A1"], ["B1"]) is None
+    with pytest.raises(ValueError):
+        simulate.simulate("nfl", 2025, ["A1"], ["B1"], metric="Nope")
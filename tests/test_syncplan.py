@@ -0,0 +1,87 @@
+# tests/test_syncplan.py
+import pytest
+
+from app import syncplan
+from app.config import settings
+
+PARAMS = {"start_year": 2025, "max_week": 3}
+ITEMS = [("nfl", 2025, 1), ("nfl", 2025, 2), ("nfl", 2025, 3)]
+
+
+def _run(root, outcomes):
+    """One segment; outcomes maps week -> reason (missing = ok). Returns the plan."""
+    plan, _ = syncplan.open_plan(PARAMS, ITEMS, root=root)
+    with syncplan.segment(plan, root) as seg:
+        for sport, year, week in syncplan.pending(plan, root):
+            seg.record(sport, year, f"{year % 100:02d}{week:02d}", "ok", "ok", outcomes.get(week))
+        seg.outcome = {"status": "ok"}
+    return plan
+
+
+def test_journal_replay_resumes(data_root):
+    plan, resumed = syncplan.open_plan(PARAMS, ITEMS, root=data_root)
+    assert not resumed
+    with syncplan.segment(plan, data_root) as seg:
+        seg.record("nfl", 2025, "2501", "ok", "ok", None)
+        # killed here: no segment outcome, item 2 never started
+
+    again, resumed = syncplan.open_plan(PARAMS, ITEMS, root=data_root)
+    assert resumed and again["id"] == plan["id"]
+    assert syncplan.pending(again, data_root) == [("nfl", 2025, 2), ("nfl", 2025, 3)]
+
+    _run(data_root, {})
+    assert syncplan.pending(plan, data_root) == []
+    s = syncplan.summary(plan, data_root)["plan"]
+    assert s["status"] == "complete" and s["done"] == 3 and len(s["segments"]) == 2
+
+    new, resumed = syncplan.open_plan(PARAMS, ITEMS, root=data_root)
+    assert not resumed and new["id"] != plan["id"]
+
+
+def test_torn_journal_line_is_ignored(data_root):
+    plan = _run(data_root, {2: "http_500"})
+    with open(syncplan.os.path.join(data_root, "sync", "journal.jsonl"), "ab") as f:
+        f.write(b'{"event": "item", "key": "nfl/20')
+    assert syncplan.pending(plan, data_root) == [("nfl", 2025, 2)]
+
+
+def test_transient_item_given_up_after_max_attempts(data_root, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_ITEM_MAX_ATTEMPTS", 2)
+    plan = _run(data_root, {2: "http_503"})
+    assert syncplan.pending(plan, data_root) == [("nfl", 2025, 2)]
+
+    plan2, resumed = syncplan.open_plan(PARAMS, ITEMS, root=data_root)
+    assert resumed
+    with syncplan.segment(plan2, data_root) as seg:
+        # an open circuit never fetched, so it is not an attempt
+        assert seg.record("nfl", 2025, "2502", None, None, "circuit_open") is False
+        assert seg.record("nfl", 2025, "2502", None, None, "http_503") is True
+        seg.outcome = {"status": "ok"}
+    assert syncplan.pending(plan2, data_root) == []
+    s = syncplan.summary(plan2, data_root)
+    assert s["plan"]["given_up"] == 1 and s["plan"]["status"] == "complete"
+    assert s["skipped_reasons"] == {"http_503": 1}
+
+
+def test_second_exclusive_segment_is_busy(data_root):
+    plan, _ = syncplan.open_plan(PARAMS, ITEMS, root=data_root)
+    with syncplan.segment(plan, data_root):
+        assert syncplan.running(data_root)
+        with pytest.raises(syncplan.SyncBusy):
+            with syncplan.segment(plan, data_root):
+                pass
+
+
+def test_record_counts_attempts_without_replaying_journal(data_root, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_ITEM_MAX_ATTEMPTS", 3)
+    _run(data_root, {3: "timeout"})   # attempt 1, from an earlier segment
+    plan, _ = syncplan.open_plan(PARAMS, ITEMS, root=data_root)
+    with syncplan.segment(plan, data_root) as seg:
+        assert seg.attempts == {"nfl/2025/2503": 1}
+        real = syncplan.journal
+        monkeypatch.setattr(syncplan, "journal", lambda root=None: pytest.fail("journal replayed per record"))
+        assert seg.record("nfl", 2025, "2503", None, None, "timeout") is False
+        assert seg.record("nfl", 2025, "2503", None, None, "http_502") is True
+        monkeypatch.setattr(syncplan, "journal", real)
+        seg.outcome = {"status": "ok"}
+    assert syncplan.pending(plan, data_root) == []
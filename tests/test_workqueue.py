@@ -0,0 +1,131 @@
+# tests/test_workqueue.py
+import threading, time
+
+from app import jsonio, workqueue
+
+
+def _queue(root, owner, **kw):
+    q = workqueue.WorkQueue("q", root=root, ttl_s=kw.pop("ttl_s", 60), heartbeat_s=kw.pop("heartbeat_s", 60))
+    q.owner = owner
+    return q
+
+
+def _expire(lease):
+    doc = jsonio.load_file(lease.path)
+    doc["expires"] = time.time() - 1
+    with open(lease.path, "wb") as f:
+        f.write(jsonio.dumps(doc))
+
+
+def test_racing_claims_one_winner(data_root):
+    for key in [f"nfl/2025/25{w:02d}" for w in range(1, 21)]:
+        qs = [_queue(data_root, f"w{i}") for i in range(2)]
+        got = [None, None]
+        go = threading.Barrier(2)
+
+        def take(i):
+            go.wait()
+            got[i] = qs[i].claim(key)
+
+        ts = [threading.Thread(target=take, args=(i,)) for i in range(2)]
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        assert sum(g is not None for g in got) == 1, key
+
+
+def test_done_and_busy_items_are_skipped(data_root):
+    a, b = _queue(data_root, "a"), _queue(data_root, "b")
+    lease = a.claim("k1")
+    assert b.claim("k1") is None and b.counts["busy"] == 1
+    assert lease.complete({"ok": True})
+    assert b.claim("k1") is None and b.counts["done_elsewhere"] == 1
+    assert workqueue.status("q", data_root)["done"] == 1
+
+
+def test_release_frees_item(data_root):
+    a, b = _queue(data_root, "a"), _queue(data_root, "b")
+    assert a.claim("k1").release()
+    assert b.claim("k1") is not None
+
+
+def test_expired_lease_is_stolen_and_loser_is_lost(data_root):
+    a, b = _queue(data_root, "a"), _queue(data_root, "b")
+    la = a.claim("k1")
+    _expire(la)
+
+    lb = b.claim("k1")
+    assert lb is not None and b.counts["stolen"] == 1
+    assert jsonio.load_file(lb.path)["stolen_from"] == "a"
+
+    assert a.renew() == 0 and la.lost
+    assert la.complete({"ok": True}) is False
+    assert a.counts["lost"] == 1
+    assert lb.complete({"ok": True}) is True
+    assert jsonio.load_file(lb.path)["owner"] == "b"
+
+
+def test_renew_extends_expiry(data_root):
+    a = _queue(data_root, "a", ttl_s=5)
+    lease = a.claim("k1")
+    first = jsonio.load_file(lease.path)["expires"]
+    time.sleep(0.01)
+    assert a.renew() == 1
+    assert jsonio.load_file(lease.path)["expires"] > first
+    assert not lease.lost
+
+
+def test_worker_heartbeat_keeps_lease_and_releases_on_exit(data_root):
+    a = _queue(data_root, "a", ttl_s=0.5, heartbeat_s=0.05)
+    b = _queue(data_root, "b")
+    with a.worker():
+        lease = a.claim("k1")
+        time.sleep(0.8)   # longer than the ttl: only the heartbeat keeps it
+        assert b.claim("k1") is None
+        assert not lease.lost
+    assert workqueue.status("q", data_root)["leased"] == 0
+    assert b.claim("k1") is not None
+
+
+def test_two_workers_split_items_without_overlap(data_root):
+    keys = [f"nfl/2025/25{w:02d}" for w in range(1, 31)]
+    done = {"a": [], "b": []}
+
+    def run(owner):
+        q = _queue(data_root, owner)
+        with q.worker():
+            for k in keys:
+                lease = q.claim(k)
+                if lease is not None:
+                    done[owner].append(k)
+                    lease.complete({"by": owner})
+
+    ts = [threading.Thread(target=run, args=(o,)) for o in done]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert sorted(done["a"] + done["b"]) == sorted(keys)
+    assert not set(done["a"]) & set(done["b"])
+    assert workqueue.status("q", data_root)["done"] == len(keys)
+
+
+def test_status_queues_and_drop(data_root):
+    a = _queue(data_root, "a")
+    a.claim("k1").complete()
+    a.claim("k2")
+    _expire(a.claim("k3"))
+    st = workqueue.status("q", data_root)
+    assert (st["done"], st["leased"], st["expired"]) == (1, 1, 1)
+    assert st["owners"] == {"a": 1}
+    assert [s["queue"] for s in workqueue.queues(data_root)] == ["q"]
+    workqueue.drop("q", data_root)
+    assert workqueue.queues(data_root) == []
+
+
+def test_unreadable_fresh_lease_counts_as_busy(data_root):
+    a = _queue(data_root, "a")
+    with open(a._path("k1"), "wb") as f:
+        f.write(b"{half")   # a writer mid-replace
+    assert a.claim("k1") is None and a.counts["busy"] == 1